@@ -1,3 +1,4 @@
+# Superseded by migrations/004_products_featured.sql: run `python migrate.py` instead of this script.
 import psycopg2
 from psycopg2 import sql
 
@@ -1,3 +1,4 @@
+# Superseded by migrations/002_blog.sql: run `python migrate.py` instead of this script.
 import psycopg2
 from psycopg2 import sql
 
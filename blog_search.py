@@ -0,0 +1,97 @@
+# Full-text search over blog posts
+# pip install psycopg2-binary
+#
+# Usage: python blog_search.py search "shipping costs"          ranked results with highlighted snippets
+#        python blog_search.py search 'returns -"gift cards"'   web-search syntax: quotes, OR, -exclusion
+#        python blog_search.py reindex                          recompute search_vector in batches
+#
+# Searches blog_posts.search_vector (migration 011), where a title match outranks an excerpt match,
+# which outranks a match in the content. Queries are parsed with websearch_to_tsquery, so any user
+# input is valid. Snippets are built with ts_headline, which re-parses the whole post, so only the
+# page of results being returned gets one.
+#
+# New and edited posts are indexed by a trigger. reindex is the bulk path: after loading posts with
+# triggers disabled or changing blog_post_search_vector(), it rewrites only the rows whose vector
+# differs, in short batches.
+import argparse
+import collections
+import re
+import sys
+
+import psycopg2
+
+from migrate import MigrationContext, connect_to_db
+
+SEARCH_CONFIG = "english"
+DEFAULT_LIMIT = 10
+# ts_headline options: matches wrapped in START_SEL/STOP_SEL, up to two fragments of about 30 words
+START_SEL = "<b>"
+STOP_SEL = "</b>"
+HEADLINE_OPTIONS = f"StartSel={START_SEL}, StopSel={STOP_SEL}, MaxFragments=2, MaxWords=30, MinWords=10"
+REINDEX_BATCH_SIZE = 500
+
+SearchResult = collections.namedtuple("SearchResult", "post_id title published_at rank snippet")
+
+def search(conn, text, limit=DEFAULT_LIMIT, offset=0):
+    # ts_rank_cd normalisation 32 scales ranks into [0, 1) so they are comparable across queries
+    with conn.cursor() as cursor:
+        cursor.execute(f"""
+            WITH query AS (
+                SELECT websearch_to_tsquery('{SEARCH_CONFIG}', %s) AS q
+            ), matches AS (
+                SELECT p.post_id, p.title, p.content, p.published_at, ts_rank_cd(p.search_vector, query.q, 32) AS rank
+                FROM blog_posts p, query
+                WHERE p.search_vector @@ query.q
+                ORDER BY rank DESC, p.published_at DESC
+                LIMIT %s OFFSET %s
+            )
+            SELECT m.post_id, m.title, m.published_at, m.rank,
+                   ts_headline('{SEARCH_CONFIG}', m.content, query.q, %s)
+            FROM matches m, query
+            ORDER BY m.rank DESC, m.published_at DESC
+        """, (text, limit, offset, HEADLINE_OPTIONS))
+        return [SearchResult(*row) for row in cursor.fetchall()]
+
+def reindex(conn, batch_size=REINDEX_BATCH_SIZE):
+    conn.autocommit = True
+    ctx = MigrationContext(conn)
+    return ctx.backfill("blog_posts", "search_vector = blog_post_search_vector(title, excerpt, content)",
+                        "search_vector IS DISTINCT FROM blog_post_search_vector(title, excerpt, content)",
+                        key="post_id", batch_size=batch_size)
+
+def plain(snippet):
+    # Terminal output: highlight matches with asterisks instead of tags
+    return re.sub(re.escape(START_SEL) + "|" + re.escape(STOP_SEL), "*", " ".join(snippet.split()))
+
+def main():
+    parser = argparse.ArgumentParser(description="Search blog posts or rebuild their search index.")
+    parser.add_argument("--dbname", default=None, help="database to search")
+    commands = parser.add_subparsers(dest="command", required=True)
+    search_parser = commands.add_parser("search", help="search posts")
+    search_parser.add_argument("query")
+    search_parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    search_parser.add_argument("--offset", type=int, default=0)
+    reindex_parser = commands.add_parser("reindex", help="recompute search_vector where it is out of date")
+    reindex_parser.add_argument("--batch-size", type=int, default=REINDEX_BATCH_SIZE)
+    args = parser.parse_args()
+
+    conn = connect_to_db(args.dbname) if args.dbname else connect_to_db()
+    try:
+        if args.command == "reindex":
+            print(f"Reindexed {reindex(conn, args.batch_size)} posts")
+            return
+        results = search(conn, args.query, args.limit, args.offset)
+        for result in results:
+            published = f" ({result.published_at:%Y-%m-%d})" if result.published_at else ""
+            print(f"[{result.rank:.3f}] #{result.post_id} {result.title}{published}")
+            print(f"    {plain(result.snippet)}")
+        if not results:
+            print("No posts found")
+    except psycopg2.Error as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+# Superseded by migrations/001_initial_schema.sql: run `python migrate.py` instead of this script.
 import psycopg2
 from psycopg2 import sql
 
@@ -2,11 +2,30 @@
 # pip install psycopg2-binary faker
 # DB_USER = "your_username"
 # DB_PASSWORD = "your_password"
-import psycopg2
-from psycopg2 import sql
+#
+# Usage: python create_dummy_database_entries.py --scale-factor 1 --seed 42 --workers 4
+# SF=1 loads a few thousand products/customers, 60k orders and ~120k order items (~180k with
+# --distribution uniform); SF=100 loads ~12M order items.
+# Run python migrate.py first: order items carry their order's created_at (order_created_at). When orders
+# is partitioned (partition_manager.py), the months of the generated history are created before loading.
+# --distribution realistic (the default) skews product popularity and customer order counts and spreads
+# created_at over --years with seasonal, weekly and daily peaks; --distribution uniform draws everything flat.
+import argparse
+import bisect
+import datetime
+import io
+import itertools
+import json  # Import json module to handle JSONB data
+import os
 import random
+import time
+from multiprocessing import Pool
+
+import psycopg2
 from faker import Faker
-import json  # Import json module to handle JSONB data
+
+from migrate import MigrationContext
+from partition_manager import ensure_partitions
 
 # Database connection details
 DB_NAME = "ecommerce_db"
@@ -15,146 +34,330 @@ DB_PASSWORD = "admin123"
 DB_HOST = "localhost"
 DB_PORT = "5432"
 
-# Initialize Faker
-fake = Faker()
+# Rows generated per unit of scale factor
+PRODUCTS_PER_SF = 1000
+CUSTOMERS_PER_SF = 5000
+# Realistic orders average ~2 items (ITEM_COUNT_WEIGHTS), uniform ones 3
+ORDERS_PER_SF = 60000
+MAX_ITEMS_PER_ORDER = 5
+# Rows generated and sent in one COPY by a worker
+BATCH_SIZE = 20000
+# Size of the Faker vocabularies rows are assembled from
+VOCABULARY_SIZE = 500
+
+CATEGORIES = ["Electronics", "Clothing", "Home & Kitchen", "Books", "Toys"]
+STATUSES = ["Pending", "Shipped", "Delivered", "Cancelled"]
+
+# Default shape of the realistic workload
+DEFAULT_YEARS = 3
+DEFAULT_PRODUCT_SKEW = 1.0   # Zipf exponent of product popularity
+DEFAULT_CUSTOMER_SKEW = 1.2  # Pareto shape of orders per customer; lower is more skewed
+CUSTOMER_WEIGHT_CAP = 50     # The heaviest customer orders at most this many times as often as a typical one
+ANNUAL_GROWTH = 1.3          # Order volume grows by this factor per year
+# Relative order volume by month (Jan..Dec), weekday (Mon..Sun) and hour of day
+MONTH_WEIGHTS = [0.8, 0.75, 0.85, 0.9, 0.95, 0.9, 0.9, 0.95, 0.95, 1.0, 1.3, 1.6]
+WEEKDAY_WEIGHTS = [1.0, 1.0, 1.0, 1.05, 1.1, 1.2, 1.15]
+HOUR_WEIGHTS = [0.3, 0.2, 0.1, 0.1, 0.1, 0.2, 0.4, 0.7, 1.0, 1.2, 1.3, 1.4,
+                1.5, 1.4, 1.3, 1.3, 1.4, 1.5, 1.7, 1.9, 2.0, 1.8, 1.2, 0.6]
+# Items per order (1..MAX_ITEMS_PER_ORDER) and quantity per item (1..5)
+ITEM_COUNT_WEIGHTS = [45, 25, 15, 10, 5]
+QUANTITY_WEIGHTS = [60, 22, 10, 5, 3]
+# Status mix by order age in days: recent orders are still open, old ones have been delivered
+STATUS_MIX_BY_AGE = [
+    (2, {"Pending": 70, "Shipped": 25, "Delivered": 0, "Cancelled": 5}),
+    (10, {"Pending": 10, "Shipped": 55, "Delivered": 30, "Cancelled": 5}),
+    (None, {"Pending": 0, "Shipped": 1, "Delivered": 94, "Cancelled": 5}),
+]
+
+# Escapes for COPY's text format
+COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+# Per-process state set up by init_worker
+worker_state = {}
 
-# Connect to the ecommerce database
-conn = psycopg2.connect(
-    dbname=DB_NAME,
-    user=DB_USER,
-    password=DB_PASSWORD,
-    host=DB_HOST,
-    port=DB_PORT
-)
-conn.autocommit = True
-cursor = conn.cursor()
+def connect_to_db():
+    return psycopg2.connect(
+        dbname=DB_NAME,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        host=DB_HOST,
+        port=DB_PORT
+    )
+
+# Draw a fixed vocabulary from Faker once; calling Faker per row is far too slow at scale
+def build_vocabulary(seed):
+    fake = Faker()
+    fake.seed_instance(seed)
+    return {
+        "words": [fake.word().capitalize() for _ in range(VOCABULARY_SIZE)],
+        "sentences": [fake.sentence() for _ in range(VOCABULARY_SIZE)],
+        "first_names": [fake.first_name() for _ in range(VOCABULARY_SIZE)],
+        "last_names": [fake.last_name() for _ in range(VOCABULARY_SIZE)],
+        "phones": [fake.phone_number() for _ in range(VOCABULARY_SIZE)],
+        "streets": [fake.street_address() for _ in range(VOCABULARY_SIZE)],
+        "cities": [fake.city() for _ in range(VOCABULARY_SIZE)],
+        "states": [fake.state() for _ in range(VOCABULARY_SIZE)],
+        "zipcodes": [fake.zipcode() for _ in range(VOCABULARY_SIZE)],
+        "domains": [fake.free_email_domain() for _ in range(20)],
+    }
+
+# Every batch gets its own generator derived from the seed, so output does not depend on worker count
+def batch_random(seed, table, first_id):
+    return random.Random(f"{seed}:{table}:{first_id}")
+
+def copy_line(values):
+    return "\t".join("\\N" if value is None else str(value).translate(COPY_ESCAPES) for value in values) + "\n"
+
+def copy_rows(cursor, table, columns, lines):
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", io.StringIO("".join(lines)))
 
 # Function to generate dummy products
-def generate_dummy_products(num_products=10):
-    products = []
-    for _ in range(num_products):
-        product = {
-            "name": fake.word().capitalize() + " " + fake.word().capitalize(),
-            "category": random.choice(["Electronics", "Clothing", "Home & Kitchen", "Books", "Toys"]),
-            "price": round(random.uniform(10, 500), 2),
-            "stock_quantity": random.randint(10, 100),
-            "description": fake.sentence()
-        }
-        products.append(product)
-    return products
+def generate_dummy_products(rng, vocabulary, first_id, count):
+    words = vocabulary["words"]
+    first_words = rng.choices(words, k=count)
+    second_words = rng.choices(words, k=count)
+    categories = rng.choices(CATEGORIES, k=count)
+    descriptions = rng.choices(vocabulary["sentences"], k=count)
+    return [
+        copy_line((first_id + i, f"{first_words[i]} {second_words[i]}", categories[i],
+                   round(rng.uniform(10, 500), 2), rng.randint(10, 100), descriptions[i]))
+        for i in range(count)
+    ]
 
 # Function to generate dummy customers
-def generate_dummy_customers(num_customers=10):
-    customers = []
-    for _ in range(num_customers):
-        customer = {
-            "name": fake.name(),
-            "email": fake.email(),
-            "phone": fake.phone_number(),
-            "address": {
-                "street": fake.street_address(),
-                "city": fake.city(),
-                "state": fake.state(),
-                "zipcode": fake.zipcode()
-            },
-            "newsletter_opt_in": random.choice([True, False])
-        }
-        customers.append(customer)
-    return customers
-
-# Function to generate dummy orders
-def generate_dummy_orders(num_orders=20, num_customers=10, num_products=10):
-    orders = []
-    for _ in range(num_orders):
-        order = {
-            "customer_id": random.randint(1, num_customers),
-            "status": random.choice(["Pending", "Shipped", "Delivered", "Cancelled"]),
-            "total_amount": 0  # Will be calculated based on order items
-        }
-        orders.append(order)
-    return orders
-
-# Function to generate dummy order items
-def generate_dummy_order_items(num_orders=20, num_products=10):
-    order_items = []
-    for order_id in range(1, num_orders + 1):
-        num_items = random.randint(1, 5)
-        for _ in range(num_items):
-            product_id = random.randint(1, num_products)
-            quantity = random.randint(1, 5)
-            price = round(random.uniform(10, 500), 2)
-            order_item = {
-                "order_id": order_id,
-                "product_id": product_id,
-                "quantity": quantity,
-                "price": price
-            }
-            order_items.append(order_item)
-    return order_items
-
-# Insert dummy products into the Products table
-def insert_dummy_products(products):
-    for product in products:
-        cursor.execute("""
-            INSERT INTO Products (name, category, price, stock_quantity, description)
-            VALUES (%s, %s, %s, %s, %s)
-        """, (product["name"], product["category"], product["price"], product["stock_quantity"], product["description"]))
-
-# Insert dummy customers into the Customers table
-def insert_dummy_customers(customers):
-    for customer in customers:
-        # Convert the address dictionary to a JSON string
-        address_json = json.dumps(customer["address"])
-        cursor.execute("""
-            INSERT INTO Customers (name, email, phone, address, newsletter_opt_in)
-            VALUES (%s, %s, %s, %s, %s)
-        """, (customer["name"], customer["email"], customer["phone"], address_json, customer["newsletter_opt_in"]))
+def generate_dummy_customers(rng, vocabulary, first_id, count):
+    first_names = rng.choices(vocabulary["first_names"], k=count)
+    last_names = rng.choices(vocabulary["last_names"], k=count)
+    domains = rng.choices(vocabulary["domains"], k=count)
+    phones = rng.choices(vocabulary["phones"], k=count)
+    streets = rng.choices(vocabulary["streets"], k=count)
+    cities = rng.choices(vocabulary["cities"], k=count)
+    states = rng.choices(vocabulary["states"], k=count)
+    zipcodes = rng.choices(vocabulary["zipcodes"], k=count)
+    lines = []
+    for i in range(count):
+        customer_id = first_id + i
+        address = json.dumps({"street": streets[i], "city": cities[i], "state": states[i], "zipcode": zipcodes[i]})
+        # The id keeps generated emails unique
+        email = f"{first_names[i]}.{last_names[i]}.{customer_id}@{domains[i]}".lower()
+        lines.append(copy_line((customer_id, f"{first_names[i]} {last_names[i]}", email, phones[i], address,
+                                rng.random() < 0.5)))
+    return lines
 
-# Insert dummy orders into the Orders table
-def insert_dummy_orders(orders):
-    for order in orders:
-        cursor.execute("""
-            INSERT INTO Orders (customer_id, status, total_amount)
-            VALUES (%s, %s, %s)
-        """, (order["customer_id"], order["status"], order["total_amount"]))
+# Cumulative Zipf weights over products; ranks are shuffled so the best sellers are not simply the lowest ids
+def product_popularity(seed, count, skew):
+    if skew <= 0:
+        return None
+    ranks = list(range(1, count + 1))
+    random.Random(f"{seed}:product-popularity").shuffle(ranks)
+    return list(itertools.accumulate(1.0 / rank ** skew for rank in ranks))
 
-# Insert dummy order items into the Order_Items table
-def insert_dummy_order_items(order_items):
-    for item in order_items:
-        cursor.execute("""
-            INSERT INTO Order_Items (order_id, product_id, quantity, price)
-            VALUES (%s, %s, %s, %s)
-        """, (item["order_id"], item["product_id"], item["quantity"], item["price"]))
+# Cumulative Pareto weights over customers, giving a few customers most of the orders
+def customer_activity(seed, count, skew):
+    if skew <= 0:
+        return None
+    rng = random.Random(f"{seed}:customer-activity")
+    return list(itertools.accumulate(min(rng.paretovariate(skew), CUSTOMER_WEIGHT_CAP) for _ in range(count)))
 
-# Update order total amounts based on order items
-def update_order_totals(num_orders):
-    for order_id in range(1, num_orders + 1):
-        cursor.execute("""
-            SELECT SUM(price * quantity) FROM Order_Items WHERE order_id = %s
-        """, (order_id,))
-        total_amount = cursor.fetchone()[0]
+# Cumulative order volume per day of the window; uniform workloads get a flat calendar
+def calendar(start, days, realistic):
+    weights = []
+    for offset in range(days):
+        day = start + datetime.timedelta(days=offset)
+        if realistic:
+            weights.append(MONTH_WEIGHTS[day.month - 1] * WEEKDAY_WEIGHTS[day.weekday()]
+                           * ANNUAL_GROWTH ** (offset / 365))
+        else:
+            weights.append(1.0)
+    return list(itertools.accumulate(weights))
+
+# Orders are dated from start up to, but excluding, end
+def order_window(settings):
+    end = datetime.datetime.combine(settings["end_date"], datetime.time())
+    days = max(1, round(settings["years"] * 365))
+    return end - datetime.timedelta(days=days), end, days
+
+def build_workload(settings, customer_ids, product_ids, num_orders):
+    start, end, days = order_window(settings)
+    realistic = settings["distribution"] == "realistic"
+    return {
+        "realistic": realistic,
+        "start": start,
+        "end": end,
+        "first_order": settings["first_order"],
+        "num_orders": num_orders,
+        "day_weights": calendar(start.date(), days, realistic),
+        "hour_weights": list(itertools.accumulate(HOUR_WEIGHTS if realistic else [1] * 24)),
+        "customers": range(customer_ids[0], customer_ids[1] + 1),
+        "customer_weights": customer_activity(settings["seed"], customer_ids[1] - customer_ids[0] + 1,
+                                              settings["customer_skew"] if realistic else 0),
+        "products": range(product_ids[0], product_ids[1] + 1),
+        "product_weights": product_popularity(settings["seed"], product_ids[1] - product_ids[0] + 1,
+                                              settings["product_skew"] if realistic else 0),
+    }
+
+# Orders are spread over the window in id order, so ids and created_at rise together as they do in production
+def order_timestamp(rng, workload, order_id):
+    day_weights = workload["day_weights"]
+    position = (order_id - workload["first_order"] + rng.random()) / workload["num_orders"]
+    day = min(bisect.bisect(day_weights, position * day_weights[-1]), len(day_weights) - 1)
+    hour = rng.choices(range(24), cum_weights=workload["hour_weights"])[0]
+    moment = workload["start"] + datetime.timedelta(days=day, hours=hour, seconds=rng.randrange(3600))
+    return min(moment, workload["end"] - datetime.timedelta(seconds=1))
+
+def order_status(rng, workload, created_at):
+    if not workload["realistic"]:
+        return rng.choice(STATUSES)
+    age = (workload["end"] - created_at).days
+    for max_age, mix in STATUS_MIX_BY_AGE:
+        if max_age is None or age < max_age:
+            return rng.choices(list(mix), weights=list(mix.values()))[0]
+
+# Function to generate dummy orders together with their items; totals are summed as items are drawn
+def generate_dummy_orders(rng, workload, first_id, count, product_prices):
+    realistic = workload["realistic"]
+    first_product = workload["products"][0]
+    customers = rng.choices(workload["customers"], cum_weights=workload["customer_weights"], k=count)
+    order_lines = []
+    item_lines = []
+    for i in range(count):
+        order_id = first_id + i
+        created_at = order_timestamp(rng, workload, order_id)
+        if realistic:
+            item_count = rng.choices(range(1, MAX_ITEMS_PER_ORDER + 1), weights=ITEM_COUNT_WEIGHTS)[0]
+            quantities = rng.choices(range(1, 6), weights=QUANTITY_WEIGHTS, k=item_count)
+        else:
+            item_count = rng.randint(1, MAX_ITEMS_PER_ORDER)
+            quantities = [rng.randint(1, 5) for _ in range(item_count)]
+        products = rng.choices(workload["products"], cum_weights=workload["product_weights"], k=item_count)
+        total = 0
+        for product_id, quantity in zip(products, quantities):
+            price = product_prices[product_id - first_product]
+            total += price * quantity
+            item_lines.append(copy_line((order_id, product_id, quantity, price, created_at)))
+        order_lines.append(copy_line((order_id, customers[i], order_status(rng, workload, created_at),
+                                      round(total, 2), created_at)))
+    return order_lines, item_lines
+
+def init_worker(seed, context):
+    worker_state["seed"] = seed
+    worker_state["vocabulary"] = build_vocabulary(seed)
+    worker_state["conn"] = connect_to_db()
+    if context is not None:
+        product_ids = context["product_ids"]
+        with worker_state["conn"].cursor() as cursor:
+            cursor.execute("SELECT product_id, price FROM products WHERE product_id BETWEEN %s AND %s ORDER BY product_id",
+                           product_ids)
+            worker_state["product_prices"] = [float(price) for _, price in cursor.fetchall()]
+        # Weight tables are rebuilt from the seed in every process rather than pickled into each task
+        worker_state["workload"] = build_workload(context["settings"], context["customer_ids"], product_ids,
+                                                  context["num_orders"])
+
+# Generate one batch in a worker process and COPY it in its own transaction
+def load_batch(task):
+    table, first_id, count = task
+    conn = worker_state["conn"]
+    rng = batch_random(worker_state["seed"], table, first_id)
+    with conn.cursor() as cursor:
+        if table == "products":
+            lines = generate_dummy_products(rng, worker_state["vocabulary"], first_id, count)
+            copy_rows(cursor, "products", ("product_id", "name", "category", "price", "stock_quantity", "description"), lines)
+        elif table == "customers":
+            lines = generate_dummy_customers(rng, worker_state["vocabulary"], first_id, count)
+            copy_rows(cursor, "customers", ("customer_id", "name", "email", "phone", "address", "newsletter_opt_in"), lines)
+        else:
+            order_lines, item_lines = generate_dummy_orders(rng, worker_state["workload"], first_id, count,
+                                                            worker_state["product_prices"])
+            copy_rows(cursor, "orders", ("order_id", "customer_id", "status", "total_amount", "created_at"), order_lines)
+            copy_rows(cursor, "order_items", ("order_id", "product_id", "quantity", "price", "order_created_at"), item_lines)
+    conn.commit()
+    return count
+
+# Reserve a contiguous block of ids from a table's sequence so workers can assign ids themselves
+def reserve_ids(conn, table, id_column, count):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT setval(pg_get_serial_sequence(%s, %s), nextval(pg_get_serial_sequence(%s, %s)) + %s - 1)",
+                       (table, id_column, table, id_column, count))
+        last_id = cursor.fetchone()[0]
+    conn.commit()
+    return last_id - count + 1, last_id
+
+def load_table(table, id_range, seed, workers, context=None):
+    first_id, last_id = id_range
+    tasks = [(table, start, min(BATCH_SIZE, last_id - start + 1)) for start in range(first_id, last_id + 1, BATCH_SIZE)]
+    started = time.monotonic()
+    loaded = 0
+    with Pool(workers, initializer=init_worker, initargs=(seed, context)) as pool:
+        for count in pool.imap_unordered(load_batch, tasks):
+            loaded += count
+    elapsed = time.monotonic() - started
+    print(f"{table}: {loaded} rows in {elapsed:.1f}s ({loaded / elapsed if elapsed else 0:.0f} rows/s)")
+
+# Update order total amounts based on order items, in one set-based statement
+def update_order_totals(conn):
+    with conn.cursor() as cursor:
         cursor.execute("""
-            UPDATE Orders SET total_amount = %s WHERE order_id = %s
-        """, (total_amount, order_id))
-
-# Generate and insert dummy data
-num_products = 10
-num_customers = 10
-num_orders = 20
-
-products = generate_dummy_products(num_products)
-customers = generate_dummy_customers(num_customers)
-orders = generate_dummy_orders(num_orders, num_customers, num_products)
-order_items = generate_dummy_order_items(num_orders, num_products)
-
-insert_dummy_products(products)
-insert_dummy_customers(customers)
-insert_dummy_orders(orders)
-insert_dummy_order_items(order_items)
-update_order_totals(num_orders)
-
-# Close the connection
-cursor.close()
-conn.close()
-
-print("Dummy data inserted successfully!")
+            UPDATE orders o
+            SET total_amount = t.total
+            FROM (SELECT order_id, SUM(price * quantity) AS total FROM order_items GROUP BY order_id) t
+            WHERE o.order_id = t.order_id AND o.total_amount IS DISTINCT FROM t.total
+        """)
+        updated = cursor.rowcount
+    conn.commit()
+    print(f"Recomputed totals for {updated} orders")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load synthetic e-commerce data at a given scale factor.")
+    parser.add_argument("--scale-factor", type=float, default=1.0, help="1 = thousands of rows and ~120k order items, 100 = ~12M order items")
+    parser.add_argument("--seed", type=int, default=42, help="same seed and scale factor produce the same data")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="parallel loader processes")
+    parser.add_argument("--recompute-totals", action="store_true", help="recompute every order total from order_items afterwards")
+    parser.add_argument("--distribution", choices=["realistic", "uniform"], default="realistic",
+                        help="skewed, seasonal workload or flat uniform draws")
+    parser.add_argument("--years", type=float, default=DEFAULT_YEARS, help="span of order history ending at --end-date")
+    parser.add_argument("--end-date", type=datetime.date.fromisoformat, default=datetime.date.today(),
+                        help="last day of order history (YYYY-MM-DD); fix it to reproduce data on a later day")
+    parser.add_argument("--product-skew", type=float, default=DEFAULT_PRODUCT_SKEW,
+                        help="Zipf exponent of product popularity, 0 for uniform")
+    parser.add_argument("--customer-skew", type=float, default=DEFAULT_CUSTOMER_SKEW,
+                        help="Pareto shape of orders per customer, 0 for uniform")
+    args = parser.parse_args()
+
+    num_products = max(1, int(PRODUCTS_PER_SF * args.scale_factor))
+    num_customers = max(1, int(CUSTOMERS_PER_SF * args.scale_factor))
+    num_orders = max(1, int(ORDERS_PER_SF * args.scale_factor))
+
+    conn = connect_to_db()
+    try:
+        product_ids = reserve_ids(conn, "products", "product_id", num_products)
+        customer_ids = reserve_ids(conn, "customers", "customer_id", num_customers)
+        order_ids = reserve_ids(conn, "orders", "order_id", num_orders)
+        load_table("products", product_ids, args.seed, args.workers)
+        load_table("customers", customer_ids, args.seed, args.workers)
+        settings = {
+            "seed": args.seed,
+            "distribution": args.distribution,
+            "years": args.years,
+            "end_date": args.end_date,
+            "product_skew": args.product_skew,
+            "customer_skew": args.customer_skew,
+            "first_order": order_ids[0],
+        }
+        # Partitioned orders only accept months that have a partition, and the window reaches --years back
+        start, end, _ = order_window(settings)
+        created = ensure_partitions(MigrationContext(conn), start.date(), end.date())
+        conn.commit()
+        if created:
+            print(f"Created {created} partition(s) of orders and order_items from {start:%Y-%m} through {end:%Y-%m}")
+        load_table("orders", order_ids, args.seed, args.workers,
+                   context={"settings": settings, "customer_ids": customer_ids, "product_ids": product_ids,
+                            "num_orders": num_orders})
+        if args.recompute_totals:
+            update_order_totals(conn)
+    finally:
+        conn.close()
+
+    print("Dummy data inserted successfully!")
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,1225 @@
 import sys
 from PyQt6.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QTabWidget, QVBoxLayout, QHBoxLayout,
-    QLabel, QLineEdit, QPushButton, QTableWidget, QTableWidgetItem, QMessageBox,
-    QComboBox, QSpinBox, QDoubleSpinBox, QCheckBox, QTextEdit, QFileDialog, QMenuBar, QMenu
+    QApplication, QMainWindow, QWidget, QTabWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
+    QLabel, QLineEdit, QPushButton, QTableWidget, QTableWidgetItem, QTableView, QMessageBox,
+    QComboBox, QSpinBox, QDoubleSpinBox, QCheckBox, QTextEdit, QFileDialog, QMenuBar, QMenu,
+    QProgressBar
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QObject, QRunnable, QThreadPool, QAbstractTableModel, QModelIndex, QTimer, pyqtSignal
 import psycopg2
-from datetime import datetime
+from psycopg2 import pool as pg_pool
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+import collections
+import gzip
+import io
+import os
+import itertools
+import re
+import threading
+import time
 import json
 
+# Database connection details
+DB_CONFIG = {
+    "dbname": "ecommerce_db",
+    "user": "admin",
+    "password": "admin123",
+    "host": "localhost"
+}
+
+# Connection pool sizing
+POOL_MIN_CONNECTIONS = 1
+POOL_MAX_CONNECTIONS = 8
+# Connections that sat idle in the pool longer than this are pinged before reuse
+POOL_HEALTH_CHECK_SECONDS = 30
+# Rows per fetchmany() call by background queries, and per round trip from a server-side cursor
+# when streaming a listing or an export; progress is reported per batch
+FETCH_BATCH_SIZE = 2000
+# Rows per page when browsing Orders/Customers page by page
+PAGE_SIZE = 500
+# Rows sent to the server per COPY during imports
+IMPORT_BATCH_SIZE = 5000
+# Characters read from an import file at a time
+IMPORT_READ_SIZE = 1 << 20
+# Search listings return at most this many rows, best matches first
+SEARCH_RESULT_LIMIT = 500
+# pg_trgm extracts no trigrams from shorter terms, so their matches are not ranked
+TRIGRAM_MIN_LENGTH = 3
+# Quiet time after the last keystroke before a search-as-you-type query runs
+SEARCH_DEBOUNCE_MS = 300
+# Recent search results kept per tab, and for how long they are reused
+SEARCH_CACHE_SIZE = 50
+SEARCH_CACHE_SECONDS = 60
+# Dashboard figures older than this are refreshed in the background while the cached ones stay on screen
+DASHBOARD_MAX_AGE_SECONDS = 60
+# Orders listed under "Recent orders" on the dashboard
+RECENT_ORDERS_LIMIT = 10
+
 class DatabaseManager:
-    def __init__(self):
-        self.conn = psycopg2.connect(
-            dbname="ecommerce_db",
-            user="admin",
-            password="admin123",
-            host="localhost"
-        )
-        self.cur = self.conn.cursor()
+    def __init__(self, minconn=POOL_MIN_CONNECTIONS, maxconn=POOL_MAX_CONNECTIONS):
+        self.pool = pg_pool.ThreadedConnectionPool(minconn, maxconn, **DB_CONFIG)
+        # ThreadedConnectionPool raises when exhausted; the semaphore makes callers wait instead
+        self._slots = threading.BoundedSemaphore(maxconn)
+        # Keyed on the connection itself; its id() could be reused by a replacement connection
+        self._last_used = {}
+        self._workers = set()
+        self._workers_lock = threading.Lock()
+        self._cursor_names = itertools.count(1)
+        self.customer_names = CustomerNameCache(self)
+        self._extensions = {}
 
     def close(self):
-        self.cur.close()
-        self.conn.close()
+        # Stop background work before the connections it is using go away
+        with self._workers_lock:
+            workers = list(self._workers)
+        for worker in workers:
+            worker.cancel()
+        QThreadPool.globalInstance().waitForDone()
+        self.pool.closeall()
 
-    def execute_query(self, query, params=None):
+    def _is_healthy(self, conn):
+        if conn.closed:
+            return False
+        last_used = self._last_used.get(conn)
+        if last_used is not None and time.monotonic() - last_used < POOL_HEALTH_CHECK_SECONDS:
+            return True
         try:
-            self.cur.execute(query, params)
-            self.conn.commit()
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _discard(self, conn):
+        self._last_used.pop(conn, None)
+        self.pool.putconn(conn, close=True)
+
+    @contextmanager
+    def connection(self):
+        # Check out a pooled connection for the duration of one operation
+        self._slots.acquire()
+        conn = None
+        try:
+            conn = self.pool.getconn()
+            # Connections left over from before a server restart fail the ping and are replaced
+            while not self._is_healthy(conn):
+                self._discard(conn)
+                # If getconn raises, finally must not hand the discarded connection back again
+                conn = None
+                conn = self.pool.getconn()
+            yield conn
+        finally:
+            if conn is not None:
+                if conn.closed:
+                    self._discard(conn)
+                else:
+                    if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                        conn.rollback()
+                    self._last_used[conn] = time.monotonic()
+                    self.pool.putconn(conn)
+            self._slots.release()
+
+    @contextmanager
+    def cursor(self):
+        # Short-lived cursor whose statements are committed together, or rolled back on error
+        with self.connection() as conn:
+            cur = conn.cursor()
             try:
-                return self.cur.fetchall()
-            except:
-                return None
+                yield cur
+                conn.commit()
+            except Exception:
+                if not conn.closed:
+                    conn.rollback()
+                raise
+            finally:
+                if not conn.closed:
+                    cur.close()
+
+    def run_query(self, query, params=None):
+        # Like execute_query, but raises instead of reporting errors in a dialog
+        for attempt in range(2):
+            with self.connection() as conn:
+                try:
+                    with conn.cursor() as cur:
+                        cur.execute(query, params)
+                        results = cur.fetchall() if cur.description is not None else None
+                except psycopg2.Error:
+                    # The server went away before anything was committed; retry once on a fresh connection
+                    if conn.closed and attempt == 0:
+                        continue
+                    raise
+                conn.commit()
+                return results
+
+    def execute_query(self, query, params=None):
+        try:
+            return self.run_query(query, params)
         except Exception as e:
             QMessageBox.critical(None, "Database Error", f"Error executing query: {str(e)}")
             return None
 
+    def has_extension(self, name):
+        # Extensions are installed by migrations, not while the panel runs, so the answer is kept
+        if name not in self._extensions:
+            self._extensions[name] = bool(self.run_query("SELECT 1 FROM pg_extension WHERE extname = %s", (name,)))
+        return self._extensions[name]
+
+    def submit(self, query, params=None, stream=False, fetch_size=FETCH_BATCH_SIZE):
+        # Build a worker that runs the query off the GUI thread; start it with QueryProgress.start.
+        # Streaming workers deliver batches through the rows signal as they arrive instead of one result list.
+        if stream:
+            return DatabaseWorker(self, lambda worker, conn: self._stream_task(worker, conn, query, params, fetch_size))
+        def task(worker, conn):
+            with conn.cursor() as cur:
+                cur.execute(query, params)
+                if cur.description is None:
+                    return None
+                results = []
+                while not worker.is_cancelled():
+                    batch = cur.fetchmany(FETCH_BATCH_SIZE)
+                    if not batch:
+                        break
+                    results.extend(batch)
+                    worker.signals.progress.emit(len(results), 0)
+                return results
+        return DatabaseWorker(self, task)
+
+    def submit_task(self, task):
+        # task(worker, conn) runs in one transaction that is committed when it returns
+        return DatabaseWorker(self, task)
+
+    def _stream_task(self, worker, conn, query, params, fetch_size):
+        with conn.cursor(name=f"stream_{next(self._cursor_names)}") as cur:
+            cur.itersize = fetch_size
+            cur.execute(query, params)
+            loaded = 0
+            while not worker.is_cancelled():
+                batch = cur.fetchmany(fetch_size)
+                if not batch:
+                    break
+                loaded += len(batch)
+                worker.signals.rows.emit(batch)
+                worker.signals.progress.emit(loaded, 0)
+            return loaded
+
+class CustomerNameCache:
+    # customer_id -> name lookups shared by every tab; call invalidate() after customers change
+    def __init__(self, db):
+        self.db = db
+        self._names = {}
+        self._lock = threading.Lock()
+
+    def get(self, customer_id):
+        if not customer_id:
+            return "Unknown"
+        with self._lock:
+            name = self._names.get(customer_id)
+        if name is None:
+            result = self.db.run_query("SELECT name FROM customers WHERE customer_id = %s", (customer_id,))
+            name = result[0][0] if result else "Unknown"
+            with self._lock:
+                self._names[customer_id] = name
+        return name
+
+    def update(self, names):
+        # Record (customer_id, name) pairs that arrived with another query
+        with self._lock:
+            self._names.update(names)
+
+    def invalidate(self, customer_id=None):
+        with self._lock:
+            if customer_id is None:
+                self._names.clear()
+            else:
+                self._names.pop(customer_id, None)
+
+class DashboardCache:
+    # Last dashboard figures and when they were loaded. Readers always get the cached values at once;
+    # stale values are revalidated in the background (stale-while-revalidate).
+    def __init__(self, max_age=DASHBOARD_MAX_AGE_SECONDS):
+        self.max_age = max_age
+        self.values = None
+        self.loaded_at = None
+        self._loaded_monotonic = None
+
+    def is_stale(self):
+        return self._loaded_monotonic is None or time.monotonic() - self._loaded_monotonic > self.max_age
+
+    def update(self, values):
+        self.values = values
+        self.loaded_at = datetime.now()
+        self._loaded_monotonic = time.monotonic()
+
+    @staticmethod
+    def load(worker, conn):
+        # A handful of cheap queries: planner row estimates instead of COUNT(*), and sales from the
+        # daily rollup kept by sales_reports.py instead of a SUM over every order
+        with conn.cursor() as cur:
+            values = {"counts": DashboardCache.row_counts(cur, ("orders", "customers", "products"))}
+            values["total_sales"], values["recent_sales"] = DashboardCache.sales(cur)
+            cur.execute("""
+                SELECT o.order_id, c.name, o.status, o.total_amount, o.created_at
+                FROM orders o
+                LEFT JOIN customers c ON o.customer_id = c.customer_id
+                WHERE o.created_at IS NOT NULL
+                ORDER BY o.created_at DESC
+                LIMIT %s
+            """, (RECENT_ORDERS_LIMIT,))
+            values["recent_orders"] = cur.fetchall()
+        return values
+
+    @staticmethod
+    def row_counts(cur, tables):
+        # table -> (rows, estimated). reltuples is summed over the partitions of a partitioned table. A
+        # plain table that was never analyzed has no estimate (-1) and is counted exactly; a partition
+        # without one counts as empty, since autovacuum never analyzes the empty future partitions
+        cur.execute("""
+            SELECT t.name, sum(GREATEST(c.reltuples, 0)), bool_or(c.reltuples < 0 AND c.oid = to_regclass(t.name))
+            FROM unnest(%s::text[]) AS t (name)
+            JOIN pg_class c ON c.relkind = 'r' AND (c.oid = to_regclass(t.name) OR c.oid IN (
+                SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(t.name)))
+            GROUP BY t.name
+        """, (list(tables),))
+        counts = {}
+        for table, estimate, unknown in cur.fetchall():
+            if unknown:
+                cur.execute(f"SELECT count(*) FROM {table}")
+                counts[table] = (cur.fetchone()[0], False)
+            else:
+                counts[table] = (int(estimate or 0), True)
+        return counts
+
+    @staticmethod
+    def sales(cur):
+        # (all-time sales, sales of the last 30 days), cancelled orders excluded
+        cur.execute("SELECT to_regclass('daily_sales_rollup') IS NOT NULL")
+        if not cur.fetchone()[0]:
+            cur.execute("""
+                SELECT COALESCE(sum(total_amount), 0),
+                       COALESCE(sum(total_amount) FILTER (WHERE created_at >= current_date - 29), 0)
+                FROM orders WHERE COALESCE(lower(status), '') <> 'cancelled'
+            """)
+            return cur.fetchone()
+        # Rolled-up days plus the orders placed since the rollup's last refresh
+        cur.execute("""
+            WITH tail AS (
+                SELECT created_at, total_amount FROM orders
+                WHERE order_id > (SELECT last_order_id FROM sales_rollup_state WHERE rollup = 'daily_sales')
+                  AND COALESCE(lower(status), '') <> 'cancelled'
+            )
+            SELECT (SELECT COALESCE(sum(total_sales), 0) FROM daily_sales_rollup)
+                   + (SELECT COALESCE(sum(total_amount), 0) FROM tail),
+                   (SELECT COALESCE(sum(total_sales), 0) FROM daily_sales_rollup WHERE day >= current_date - 29)
+                   + (SELECT COALESCE(sum(total_amount), 0) FROM tail WHERE created_at >= current_date - 29)
+        """)
+        return cur.fetchone()
+
+class WorkerSignals(QObject):
+    progress = pyqtSignal(int, int)  # items done, total (0 when unknown)
+    rows = pyqtSignal(list)  # one batch from a streaming query
+    result = pyqtSignal(object)
+    error = pyqtSignal(str)
+    cancelled = pyqtSignal()
+    finished = pyqtSignal()
+
+class DatabaseWorker(QRunnable):
+    def __init__(self, db, task):
+        super().__init__()
+        self.db = db
+        self.task = task
+        self.signals = WorkerSignals()
+        self._conn = None
+        self._cancelled = False
+        self._lock = threading.Lock()
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def cancel(self):
+        with self._lock:
+            self._cancelled = True
+            # Ask the server to abort the running statement rather than just dropping its result
+            if self._conn is not None:
+                self._conn.cancel()
+
+    def run(self):
+        with self.db._workers_lock:
+            self.db._workers.add(self)
+        try:
+            if self._cancelled:
+                self.signals.cancelled.emit()
+                return
+            with self.db.connection() as conn:
+                with self._lock:
+                    self._conn = conn
+                try:
+                    result = self.task(self, conn)
+                    if self._cancelled:
+                        conn.rollback()
+                    else:
+                        conn.commit()
+                finally:
+                    with self._lock:
+                        self._conn = None
+        except Exception as e:
+            if self._cancelled:
+                self.signals.cancelled.emit()
+            else:
+                self.signals.error.emit(str(e))
+        else:
+            if self._cancelled:
+                self.signals.cancelled.emit()
+            else:
+                self.signals.result.emit(result)
+        finally:
+            with self.db._workers_lock:
+                self.db._workers.discard(self)
+            self.signals.finished.emit()
+
+class RowTableModel(QAbstractTableModel):
+    # Read-only model over the row tuples returned by psycopg2. Cells are formatted only when the
+    # view paints them, values keep their database types for sorting, and the trailing "Select"
+    # column is backed by a set of checked row keys instead of one checkbox item per row.
+    def __init__(self, headers, columns=None, formatters=None, key_column=0, parent=None):
+        super().__init__(parent)
+        self.headers = headers
+        self.select_column = len(headers) - 1
+        # columns[i] is the tuple index shown in view column i
+        self.columns = columns or list(range(self.select_column))
+        self.formatters = formatters or {}
+        self.key_column = key_column
+        self.rows = []
+        self.checked = set()
+        # Set to a KeysetPager to let the view pull further pages as it scrolls
+        self.pager = None
+        # (column, order) of the active sort, kept so rows streamed in later land in order, and the
+        # sort keys of self.rows for data columns
+        self._sort = None
+        self._sort_keys = None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.headers[section]
+        return super().headerData(section, orientation, role)
+
+    def flags(self, index):
+        flags = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        if index.column() == self.select_column:
+            flags |= Qt.ItemFlag.ItemIsUserCheckable
+        return flags
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if index.column() == self.select_column:
+            if role == Qt.ItemDataRole.CheckStateRole:
+                key = self.key(index.row())
+                return Qt.CheckState.Checked if key in self.checked else Qt.CheckState.Unchecked
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.display(index.row(), index.column())
+        if role == Qt.ItemDataRole.UserRole:
+            return self.value(index.row(), index.column())
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if index.column() != self.select_column or role != Qt.ItemDataRole.CheckStateRole:
+            return False
+        key = self.key(index.row())
+        if Qt.CheckState(value) == Qt.CheckState.Checked:
+            self.checked.add(key)
+        else:
+            self.checked.discard(key)
+        self.dataChanged.emit(index, index, [role])
+        return True
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.pager is not None and self.pager.has_more()
+
+    def fetchMore(self, parent=QModelIndex()):
+        if self.pager is not None:
+            self.pager.fetch_more()
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        # column -1 (sortByColumn(-1, ...)) turns sorting off; the rows keep their current order
+        self._sort = (column, order) if column >= 0 else None
+        self._sort_keys = None
+        if self._sort is not None and self.rows:
+            self._reorder()
+
+    def _sort_key(self, column):
+        if column == self.select_column:
+            return lambda row: row[self.key_column] in self.checked
+        position = self.columns[column]
+        formatter = self.formatters.get(column, str)
+        def sort_key(row):
+            value = row[position]
+            # NULLs sort after every value; JSONB objects and arrays have no ordering, so they sort by their text
+            if value is None:
+                return (True, 0)
+            if isinstance(value, (dict, list)):
+                return (False, formatter(value))
+            return (False, value)
+        return sort_key
+
+    def _reorder(self):
+        column, order = self._sort
+        sort_key = self._sort_key(column)
+        keys = self._sort_keys
+        keys = list(map(sort_key, self.rows)) if keys is None else keys + list(map(sort_key, self.rows[len(keys):]))
+        # The already sorted rows form one run, so timsort merges a new batch in linear time
+        positions = sorted(range(len(self.rows)), key=keys.__getitem__, reverse=order == Qt.SortOrder.DescendingOrder)
+        self.layoutAboutToBeChanged.emit()
+        self.rows = [self.rows[i] for i in positions]
+        moved_to = [0] * len(positions)
+        for new, old in enumerate(positions):
+            moved_to[old] = new
+        indexes = self.persistentIndexList()
+        self.changePersistentIndexList(indexes, [self.index(moved_to[index.row()], index.column()) for index in indexes])
+        self.layoutChanged.emit()
+        # Checked state changes under the Select column, so its keys are not reused
+        self._sort_keys = None if column == self.select_column else [keys[i] for i in positions]
+
+    def clear(self):
+        self.beginResetModel()
+        self.rows = []
+        self._sort_keys = None
+        self.checked.clear()
+        self.endResetModel()
+
+    def append_rows(self, rows):
+        if not rows:
+            return
+        first = len(self.rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self.rows.extend(rows)
+        self.endInsertRows()
+        if self._sort is not None:
+            self._reorder()
+
+    def key(self, row):
+        return self.rows[row][self.key_column]
+
+    def value(self, row, column):
+        return self.rows[row][self.columns[column]]
+
+    def display(self, row, column):
+        value = self.value(row, column)
+        formatter = self.formatters.get(column)
+        return formatter(value) if formatter else str(value)
+
+    def checked_keys(self):
+        return list(self.checked)
+
+    def set_all_checked(self, checked):
+        # Applies to the rows loaded so far
+        if checked:
+            self.checked.update(row[self.key_column] for row in self.rows)
+        else:
+            self.checked.clear()
+        if self.rows:
+            self.dataChanged.emit(self.index(0, self.select_column), self.index(len(self.rows) - 1, self.select_column),
+                                  [Qt.ItemDataRole.CheckStateRole])
+
+class KeysetPager(QObject):
+    # Walks a listing one page at a time with "WHERE (keys) > (last keys)" instead of OFFSET, so every
+    # page is an index range scan, and fetches the next page in the background while the current one
+    # is on screen. The leading key of a compound order (registration_date, created_at) may be NULL,
+    # which would stop the row comparison, so rows with a NULL lead come last, in a second pass
+    # ordered by the remaining keys.
+    page_loaded = pyqtSignal(list)
+    error = pyqtSignal(str)
+
+    def __init__(self, db, select_sql, order_by, key_positions, descending=False, filters=None, params=None,
+                 page_size=PAGE_SIZE):
+        super().__init__()
+        self.db = db
+        self.select_sql = select_sql
+        self.order_by = order_by
+        # Positions of the order_by columns in each result row
+        self.key_positions = key_positions
+        self.descending = descending
+        self.filters = list(filters or [])
+        self.params = list(params or [])
+        self.page_size = page_size
+        self._last_key = None
+        self._null_pass = False
+        self._exhausted = False
+        self._prefetched = None
+        self._wanted = False
+        self._worker = None
+
+    def start(self):
+        self._wanted = True
+        self._fetch()
+
+    def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+
+    def has_more(self):
+        return bool(self._prefetched) or not self._exhausted
+
+    def fetch_more(self):
+        if self._prefetched is not None:
+            self._deliver()
+        else:
+            # Hand the page over as soon as the in-flight fetch completes
+            self._wanted = True
+            if self._worker is None and not self._exhausted:
+                self._fetch()
+
+    def _keys(self):
+        # The order_by columns and their row positions walked by the current pass
+        if len(self.order_by) == 1:
+            return self.order_by, self.key_positions
+        if self._null_pass:
+            return self.order_by[1:], self.key_positions[1:]
+        return self.order_by, self.key_positions
+
+    def _query(self):
+        filters = list(self.filters)
+        params = list(self.params)
+        keys, _ = self._keys()
+        if len(self.order_by) > 1:
+            filters.append(f"{self.order_by[0]} IS {'NULL' if self._null_pass else 'NOT NULL'}")
+        if self._last_key is not None:
+            placeholders = ", ".join(["%s"] * len(keys))
+            filters.append(f"({', '.join(keys)}) {'<' if self.descending else '>'} ({placeholders})")
+            params.extend(self._last_key)
+        where = f" WHERE {' AND '.join(filters)}" if filters else ""
+        direction = " DESC" if self.descending else ""
+        order = ", ".join(column + direction for column in keys)
+        return f"{self.select_sql}{where} ORDER BY {order} LIMIT %s", params + [self.page_size]
+
+    def _fetch(self):
+        query, params = self._query()
+        worker = self.db.submit(query, params)
+        worker.signals.result.connect(lambda rows: self._on_page(worker, rows))
+        worker.signals.error.connect(lambda message: self._on_error(worker, message))
+        self._worker = worker
+        QThreadPool.globalInstance().start(worker)
+
+    def _on_page(self, worker, rows):
+        if worker is not self._worker:
+            return
+        self._worker = None
+        rows = rows or []
+        if rows:
+            self._last_key = tuple(rows[-1][position] for position in self._keys()[1])
+        if len(rows) < self.page_size:
+            if len(self.order_by) > 1 and not self._null_pass:
+                self._null_pass = True
+                self._last_key = None
+            else:
+                self._exhausted = True
+        self._prefetched = rows
+        if self._wanted:
+            self._deliver()
+
+    def _on_error(self, worker, message):
+        if worker is self._worker:
+            self._worker = None
+            self.error.emit(message)
+
+    def _deliver(self):
+        self._wanted = False
+        rows, self._prefetched = self._prefetched, None
+        if rows:
+            self.page_loaded.emit(rows)
+        if not self._exhausted:
+            self._fetch()
+
+# Escapes the LIKE wildcards (and the escape character) in a search term so it matches literally
+LIKE_ESCAPES = str.maketrans({"\\": "\\\\", "%": "\\%", "_": "\\_"})
+
+class SubstringSearch:
+    # Case-insensitive substring search over text columns of a listing query. With pg_trgm installed
+    # (migration 010) ILIKE '%term%' is answered from the trigram GIN indexes and matches are ranked by
+    # word_similarity to the term. Without it, or for terms too short to rank, the first matches found
+    # are returned, so the scan stops at the limit instead of reading the whole table.
+    def __init__(self, db, select_sql, columns, limit=SEARCH_RESULT_LIMIT):
+        self.db = db
+        self.select_sql = select_sql
+        self.columns = columns
+        self.limit = limit
+
+    def query(self, term):
+        pattern = f"%{term.translate(LIKE_ESCAPES)}%"
+        query = f"{self.select_sql} WHERE {' OR '.join(f'{column} ILIKE %s' for column in self.columns)}"
+        params = [pattern] * len(self.columns)
+        if len(term) >= TRIGRAM_MIN_LENGTH and self.db.has_extension("pg_trgm"):
+            ranks = ", ".join(f"word_similarity(%s, {column})" for column in self.columns)
+            query += f" ORDER BY GREATEST({ranks}) DESC"
+            params += [term] * len(self.columns)
+        return query + " LIMIT %s", params + [self.limit]
+
+class LiveSearch(QObject):
+    # Search-as-you-type for a tab's search box. Keystrokes are debounced; the query runs in a background
+    # worker through the tab's QueryProgress, which cancels a superseded query on the server and drops
+    # its results. Recent results are kept in an LRU cache keyed on the query and its parameters, so
+    # retyping or backspacing to an earlier term is answered without a query. Call invalidate() after
+    # the tab's data changes.
+    def __init__(self, db, line_edit, progress, build_query, show_rows, show_all, delay_ms=SEARCH_DEBOUNCE_MS,
+                 cache_size=SEARCH_CACHE_SIZE, max_age=SEARCH_CACHE_SECONDS):
+        super().__init__(line_edit)
+        self.db = db
+        self.line_edit = line_edit
+        self.progress = progress
+        # build_query(term) -> (query, params); show_rows(rows) displays results; show_all() the listing
+        self.build_query = build_query
+        self.show_rows = show_rows
+        self.show_all = show_all
+        self.cache_size = cache_size
+        self.max_age = max_age
+        self._cache = collections.OrderedDict()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self.search)
+        line_edit.textChanged.connect(lambda text: self._timer.start())
+        line_edit.returnPressed.connect(self.search)
+
+    def search(self):
+        self._timer.stop()
+        term = self.line_edit.text().strip()
+        if not term:
+            self.show_all()
+            return
+        query, params = self.build_query(term)
+        key = (query, tuple(params))
+        cached = self._cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] <= self.max_age:
+            self._cache.move_to_end(key)
+            self.progress.cancel()
+            self.show_rows(cached[1])
+            return
+        worker = self.db.submit(query, params)
+        self.progress.start(worker, lambda rows: self._loaded(key, rows), "Searching")
+
+    def _loaded(self, key, rows):
+        self._cache[key] = (time.monotonic(), rows)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        self.show_rows(rows)
+
+    def invalidate(self):
+        self._cache.clear()
+
+class OrderFilter:
+    # Builds the WHERE clause of an order listing from predicates the indexes can serve: exact ids,
+    # status equality and created_at/total_amount ranges (idx_orders_created_at,
+    # idx_orders_status_created_at, idx_orders_customer_id_created_at). A customer given by email or
+    # name is looked up in customers first and its orders matched by customer_id.
+    def __init__(self):
+        self.conditions = []
+        self.params = []
+
+    def add(self, condition, *params):
+        self.conditions.append(condition)
+        self.params.extend(params)
+
+    def where(self):
+        return f" WHERE {' AND '.join(self.conditions)}" if self.conditions else ""
+
+    def customer(self, term):
+        if term.isdigit():
+            self.add("o.customer_id = %s", int(term))
+        elif "@" in term:
+            self.add("o.customer_id IN (SELECT customer_id FROM customers WHERE email = %s)", term)
+        else:
+            self.add("o.customer_id IN (SELECT customer_id FROM customers WHERE name ILIKE %s)",
+                     f"%{term.translate(LIKE_ESCAPES)}%")
+
+    def apply(self, values):
+        # values as stored by OrdersTab.apply_filters
+        if values.get("status") is not None:
+            self.add("o.status = %s", values["status"])
+        if values.get("customer"):
+            self.customer(values["customer"])
+        if values.get("start") is not None:
+            self.add("o.created_at >= %s", values["start"])
+        if values.get("end") is not None:
+            # The end date is inclusive
+            self.add("o.created_at < %s", values["end"] + timedelta(days=1))
+        if values.get("min_total") is not None:
+            self.add("o.total_amount >= %s", values["min_total"])
+        if values.get("max_total") is not None:
+            self.add("o.total_amount <= %s", values["max_total"])
+        return self
+
+# Escapes for COPY's text format; NULL is written as \N
+COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+def copy_value(value):
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return str(value).translate(COPY_ESCAPES)
+
+def import_id(item):
+    # The "ID" of an exported record, or None for a record that should become a new row
+    value = item.get("ID")
+    return int(value) if value not in (None, "") else None
+
+def parse_bool(value):
+    # Accepts real booleans as well as the "True"/"False" strings older exports wrote
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "t", "yes", "y", "1")
+    return bool(value)
+
+JSON_WHITESPACE = re.compile(r"\s*")
+
+def iter_json_records(path, read_size=IMPORT_READ_SIZE):
+    # Yield the records of a JSON array of objects, or of newline-delimited JSON, while holding only
+    # a read_size window of the file in memory
+    decoder = json.JSONDecoder()
+    with open(path, 'r') as f:
+        buffer = f.read(read_size)
+        eof = not buffer
+        position = 0
+        in_array = None
+        while True:
+            position = JSON_WHITESPACE.match(buffer, position).end()
+            if position < len(buffer):
+                char = buffer[position]
+                if in_array is None:
+                    in_array = char == "["
+                    if in_array:
+                        position += 1
+                        continue
+                if in_array and char == ",":
+                    position += 1
+                    continue
+                if in_array and char == "]":
+                    return
+                try:
+                    record, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    end = None
+                # Objects, arrays and strings are self-delimiting; a bare number is only complete once
+                # the character after it has been read
+                if end is not None and (eof or isinstance(record, (dict, list, str))
+                                        or (end < len(buffer) and buffer[end] in " \t\r\n,]")):
+                    yield record
+                    position = end
+                    continue
+            elif eof:
+                return
+            chunk = f.read(read_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+
+class BulkImporter:
+    # Loads converted rows into one table with COPY, in the caller's transaction. Records that fail
+    # conversion are collected in errors instead of stopping the import; a batch the server rejects
+    # is replayed row by row under savepoints so only the offending rows are skipped.
+    def __init__(self, table, columns, convert, batch_size=IMPORT_BATCH_SIZE):
+        self.table = table
+        self.columns = columns
+        self.convert = convert
+        self.batch_size = batch_size
+        self.imported = 0
+        self.errors = []  # (record number, message)
+        self.elapsed = 0.0
+        column_list = ", ".join(columns)
+        self._copy_sql = f"COPY {table} ({column_list}) FROM STDIN"
+        self._insert_sql = f"INSERT INTO {table} ({column_list}) VALUES ({', '.join(['%s'] * len(columns))})"
+
+    @property
+    def rows_per_second(self):
+        return self.imported / self.elapsed if self.elapsed else 0.0
+
+    def run(self, conn, items, worker=None, total=0):
+        started = time.monotonic()
+        batch = []
+        with conn.cursor() as cur:
+            for number, item in enumerate(items, 1):
+                if worker is not None and worker.is_cancelled():
+                    break
+                try:
+                    batch.append((number, self.convert(item)))
+                except Exception as e:
+                    self.errors.append((number, str(e)))
+                if len(batch) >= self.batch_size:
+                    self._flush(cur, batch, worker)
+                    batch = []
+                    if worker is not None:
+                        worker.signals.progress.emit(number, total)
+            if batch and not (worker is not None and worker.is_cancelled()):
+                self._flush(cur, batch, worker)
+        self.elapsed = time.monotonic() - started
+        return self
+
+    def _flush(self, cur, batch, worker):
+        buffer = io.StringIO("".join("\t".join(map(copy_value, row)) + "\n" for _, row in batch))
+        cur.execute("SAVEPOINT import_batch")
+        try:
+            cur.copy_expert(self._copy_sql, buffer)
+        except psycopg2.extensions.QueryCanceledError:
+            raise
+        except psycopg2.Error:
+            cur.execute("ROLLBACK TO SAVEPOINT import_batch")
+            self._flush_rows(cur, batch, worker)
+        else:
+            cur.execute("RELEASE SAVEPOINT import_batch")
+            self.imported += len(batch)
+
+    def _flush_rows(self, cur, batch, worker):
+        for number, row in batch:
+            if worker is not None and worker.is_cancelled():
+                return
+            cur.execute("SAVEPOINT import_row")
+            try:
+                cur.execute(self._insert_sql, row)
+            except psycopg2.extensions.QueryCanceledError:
+                raise
+            except psycopg2.Error as e:
+                cur.execute("ROLLBACK TO SAVEPOINT import_row")
+                self.errors.append((number, (e.pgerror or str(e)).strip()))
+            else:
+                cur.execute("RELEASE SAVEPOINT import_row")
+                self.imported += 1
+
+class UpsertImporter(BulkImporter):
+    # Idempotent import: records are COPYed into a temporary staging table and merged into the target
+    # with INSERT ... ON CONFLICT on a natural key. Staged rows equal to the stored row are dropped
+    # first, so re-running an import or a nightly sync only writes the rows that changed. Of several
+    # records with the same key the last one wins; records without a key are inserted as new rows,
+    # while a blank text key is reported as an error. If the server rejects the merge (an unknown
+    # customer, a created_at without a partition), it is replayed row by row under savepoints and
+    # only the offending records are skipped.
+    # prepare holds statements run against the staging table ({staging}) before the merge.
+    STAGING = "pg_temp.import_staging"
+
+    def __init__(self, table, columns, convert, key, prepare=(), batch_size=IMPORT_BATCH_SIZE):
+        # Staged rows carry their record number, which orders them and names them in errors
+        super().__init__(self.STAGING, tuple(columns) + ("import_record",), convert, batch_size)
+        self.columns = tuple(columns)
+        self.target = table
+        self.key = key
+        self.prepare = prepare
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+
+    def run(self, conn, items, worker=None, total=0):
+        with conn.cursor() as cur:
+            # Same column types as the target, none of its constraints or defaults
+            cur.execute(f"DROP TABLE IF EXISTS {self.STAGING}")
+            cur.execute(f"CREATE TEMP TABLE {self.STAGING} ON COMMIT DROP AS "
+                        f"SELECT {', '.join(self.columns)} FROM {self.target} WITH NO DATA")
+            cur.execute(f"ALTER TABLE {self.STAGING} ADD COLUMN import_record BIGINT")
+        super().run(conn, items, worker, total)
+        if worker is not None and worker.is_cancelled():
+            return self
+        started = time.monotonic()
+        with conn.cursor() as cur:
+            self._merge(cur, worker)
+        self.errors.sort()
+        self.elapsed += time.monotonic() - started
+        return self
+
+    def _flush(self, cur, batch, worker):
+        super()._flush(cur, [(number, row + (number,)) for number, row in batch], worker)
+
+    def _conflict_columns(self, cur):
+        # The unique index that identifies a row by the key: the key itself, or a primary key that
+        # includes it (a partitioned table's primary key also holds the partition key)
+        cur.execute("""
+            SELECT array_agg(a.attname::text ORDER BY k.position)
+            FROM pg_index i
+            CROSS JOIN LATERAL unnest(i.indkey) WITH ORDINALITY AS k (attnum, position)
+            JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+            WHERE i.indrelid = to_regclass(%s) AND i.indisunique AND i.indpred IS NULL AND i.indexprs IS NULL
+            GROUP BY i.indexrelid, i.indisprimary
+            ORDER BY i.indisprimary DESC
+        """, (self.target,))
+        for columns, in cur.fetchall():
+            if self.key in columns and set(columns) <= set(self.columns):
+                return columns
+        raise ValueError(f"{self.target} has no unique index on {self.key}")
+
+    def _merge(self, cur, worker=None):
+        staging, target, key = self.STAGING, self.target, self.key
+        # A blank key would merge every blank record into one row instead of naming a row
+        cur.execute(f"DELETE FROM {staging} WHERE btrim({key}::text) = '' RETURNING import_record")
+        self._reject(cur.fetchall(), f"{key} is blank")
+        cur.execute(f"DELETE FROM {staging} s USING {staging} d "
+                    f"WHERE s.{key} = d.{key} AND s.import_record < d.import_record")
+        for statement in self.prepare:
+            cur.execute(statement.format(staging=staging))
+        # Change detection compares values, so 10.5 and 10.50 or reordered JSON keys are not changes
+        cur.execute(f"""
+            DELETE FROM {staging} s USING {target} t
+            WHERE t.{key} = s.{key}
+              AND ({', '.join(f't.{column}' for column in self.columns)})
+                  IS NOT DISTINCT FROM ({', '.join(f's.{column}' for column in self.columns)})
+        """)
+        self.unchanged = cur.rowcount
+        conflict = self._conflict_columns(cur)
+        cur.execute("SAVEPOINT import_merge")
+        try:
+            inserted, updated = self._merge_rows(cur, conflict)
+        except psycopg2.extensions.QueryCanceledError:
+            raise
+        except psycopg2.Error:
+            cur.execute("ROLLBACK TO SAVEPOINT import_merge")
+            self._merge_each(cur, conflict, worker)
+        else:
+            cur.execute("RELEASE SAVEPOINT import_merge")
+            self.inserted, self.updated = inserted, updated
+        # Explicit ids bypass the key's sequence; move it past them so later inserts do not collide
+        cur.execute("SELECT pg_get_serial_sequence(%s, %s)", (target, key))
+        sequence = cur.fetchone()[0]
+        if sequence:
+            cur.execute(f"""
+                SELECT setval(%s, max({key})) FROM {target}
+                HAVING max({key}) > COALESCE(pg_sequence_last_value(%s::regclass), 0)
+            """, (sequence, sequence))
+
+    def _merge_each(self, cur, conflict, worker):
+        cur.execute(f"SELECT import_record FROM {self.STAGING} ORDER BY import_record")
+        for record, in cur.fetchall():
+            if worker is not None and worker.is_cancelled():
+                return
+            cur.execute("SAVEPOINT import_row")
+            try:
+                inserted, updated = self._merge_rows(cur, conflict, record)
+            except psycopg2.extensions.QueryCanceledError:
+                raise
+            except psycopg2.Error as e:
+                cur.execute("ROLLBACK TO SAVEPOINT import_row")
+                self._reject([(record,)], (e.pgerror or str(e)).strip())
+            else:
+                cur.execute("RELEASE SAVEPOINT import_row")
+                self.inserted += inserted
+                self.updated += updated
+
+    # Merge the staged rows, or only the one of record; returns (inserted, updated)
+    def _merge_rows(self, cur, conflict, record=None):
+        staging, target, key = self.STAGING, self.target, self.key
+        column_list = ", ".join(self.columns)
+        only = "" if record is None else " AND import_record = %(record)s"
+        params = {"record": record}
+        updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in self.columns if column not in conflict)
+        # Every staged row with a stored counterpart left is a change
+        cur.execute(f"SELECT count(*) FROM {staging} s "
+                    f"WHERE EXISTS (SELECT 1 FROM {target} t WHERE t.{key} = s.{key}){only}", params)
+        updated = cur.fetchone()[0]
+        cur.execute(f"""
+            INSERT INTO {target} ({column_list})
+            SELECT {column_list} FROM {staging} WHERE {key} IS NOT NULL{only} ORDER BY import_record
+            ON CONFLICT ({', '.join(conflict)}) DO UPDATE SET {updates}
+        """, params)
+        inserted = cur.rowcount - updated
+        values = ", ".join(column for column in self.columns if column != key)
+        cur.execute(f"INSERT INTO {target} ({values}) SELECT {values} FROM {staging} "
+                    f"WHERE {key} IS NULL{only} ORDER BY import_record", params)
+        return inserted + cur.rowcount, updated
+
+    def _reject(self, records, message):
+        self.errors.extend((record, message) for record, in records)
+        self.imported -= len(records)
+
+# File > Export choices; a trailing .gz on the file name compresses the output
+EXPORT_FILTERS = {
+    "JSON Files (*.json *.json.gz)": "json",
+    "NDJSON Files (*.ndjson *.jsonl *.ndjson.gz *.jsonl.gz)": "ndjson",
+    "CSV Files (*.csv *.csv.gz)": "csv",
+}
+
+def export_format(file_path, selected_filter=None):
+    name = file_path[:-3] if file_path.endswith(".gz") else file_path
+    extension = os.path.splitext(name)[1].lower()
+    if extension in (".ndjson", ".jsonl"):
+        return "ndjson"
+    if extension in (".csv", ".json"):
+        return extension[1:]
+    return EXPORT_FILTERS.get(selected_filter, "json")
+
+class DataExporter:
+    # Streams a query straight from the database to a file. CSV goes through COPY ... TO STDOUT;
+    # JSON and NDJSON are built by the server with row_to_json and read through a server-side
+    # cursor, so values keep their types and memory stays flat whatever the table size.
+    def __init__(self, query, export_format, compress=False, fetch_size=FETCH_BATCH_SIZE):
+        self.query = query
+        self.export_format = export_format
+        self.compress = compress
+        self.fetch_size = fetch_size
+        self.exported = 0
+
+    def run(self, conn, file_path, worker=None):
+        opener = gzip.open if self.compress else open
+        try:
+            with opener(file_path, 'wt', encoding='utf-8', newline='') as f:
+                if self.export_format == "csv":
+                    with conn.cursor() as cur:
+                        cur.copy_expert(f"COPY ({self.query}) TO STDOUT WITH (FORMAT csv, HEADER)", f)
+                        self.exported = cur.rowcount
+                else:
+                    self._write_json(conn, f, worker)
+            if worker is not None and worker.is_cancelled():
+                os.remove(file_path)
+        except Exception:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            raise
+        return self.exported
+
+    def _write_json(self, conn, f, worker):
+        as_array = self.export_format == "json"
+        separator = ",\n" if as_array else "\n"
+        f.write("[\n" if as_array else "")
+        with conn.cursor(name="export") as cur:
+            cur.itersize = self.fetch_size
+            cur.execute(f"SELECT row_to_json(export_row)::text FROM ({self.query}) export_row")
+            while worker is None or not worker.is_cancelled():
+                batch = cur.fetchmany(self.fetch_size)
+                if not batch:
+                    break
+                if self.exported:
+                    f.write(separator)
+                f.write(separator.join(row[0] for row in batch))
+                self.exported += len(batch)
+                if worker is not None:
+                    worker.signals.progress.emit(self.exported, 0)
+        f.write("\n]\n" if as_array else "\n" if self.exported else "")
+
+def show_import_report(parent, tab_name, importer):
+    summary = (f"{tab_name} imported: {importer.imported} rows in {importer.elapsed:.1f}s "
+               f"({importer.rows_per_second:.0f} rows/s).")
+    if isinstance(importer, UpsertImporter):
+        summary += f"\n{importer.inserted} inserted, {importer.updated} updated, {importer.unchanged} unchanged."
+    if not importer.errors:
+        QMessageBox.information(parent, "Success", summary)
+        return
+    box = QMessageBox(parent)
+    box.setIcon(QMessageBox.Icon.Warning)
+    box.setWindowTitle("Import finished with errors")
+    box.setText(f"{summary}\n{len(importer.errors)} records were skipped; see details.")
+    box.setDetailedText("\n".join(f"Record {number}: {message}" for number, message in importer.errors))
+    box.exec()
+
+def apply_to_checked(parent, db, model, noun, action, statements, confirm=False):
+    # Run statements(keys) -> [(query, params)] for every checked row as set-based "= ANY(%s)"
+    # statements in one transaction. Returns (rows affected by the last statement, keys), or None.
+    keys = model.checked_keys()
+    if not keys:
+        QMessageBox.warning(parent, "Warning", f"No {noun} checked!")
+        return None
+    if confirm:
+        reply = QMessageBox.question(parent, f"{action} {noun.title()}",
+                                     f"Are you sure you want to {action.lower()} {len(keys)} {noun}?",
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if reply != QMessageBox.StandardButton.Yes:
+            return None
+    try:
+        with db.cursor() as cur:
+            for query, params in statements(keys):
+                cur.execute(query, params)
+            return cur.rowcount, keys
+    except Exception as e:
+        QMessageBox.critical(parent, "Error", f"Error applying '{action}' to checked {noun}: {str(e)}")
+        return None
+
+def bulk_layout(model, actions):
+    # "Check All"/"Uncheck All" followed by one button per (label, slot) acting on the checked rows
+    layout = QHBoxLayout()
+    layout.addWidget(QLabel("Checked rows:"))
+    for label, slot in [("Check All", lambda: model.set_all_checked(True)),
+                        ("Uncheck All", lambda: model.set_all_checked(False))] + actions:
+        button = QPushButton(label)
+        button.clicked.connect(slot)
+        layout.addWidget(button)
+    return layout
+
+class QueryProgress(QWidget):
+    # Progress bar and cancel button shown while a tab's background query runs
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._worker = None
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.label = QLabel()
+        self.progress_bar = QProgressBar()
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self.cancel)
+        layout.addWidget(self.label)
+        layout.addWidget(self.progress_bar)
+        layout.addWidget(self.cancel_button)
+        self.hide()
+
+    def is_running(self):
+        return self._worker is not None
+
+    def start(self, worker, on_result=None, message="Loading", error_message="Error executing query", on_rows=None,
+              cancelled_message=None):
+        # Only one query per slot at a time; a new request supersedes the running one. Writes pass
+        # cancelled_message so a rolled-back import is not mistaken for one that finished.
+        self.cancel()
+        self._worker = worker
+        self._message = message
+        self._error_message = error_message
+        self.label.setText(f"{message}...")
+        self.progress_bar.setRange(0, 0)
+        worker.signals.progress.connect(lambda done, total: self._on_progress(worker, done, total))
+        if on_rows is not None:
+            worker.signals.rows.connect(lambda rows: self._on_rows(worker, on_rows, rows))
+        worker.signals.result.connect(lambda result: self._on_result(worker, on_result, result))
+        worker.signals.error.connect(lambda message: self._on_error(worker, message))
+        if cancelled_message is not None:
+            worker.signals.cancelled.connect(lambda: QMessageBox.warning(self, "Cancelled", cancelled_message))
+        worker.signals.finished.connect(lambda: self._on_finished(worker))
+        self.show()
+        QThreadPool.globalInstance().start(worker)
+
+    def cancel(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+            self.hide()
+
+    def _on_progress(self, worker, done, total):
+        if worker is not self._worker:
+            return
+        if total:
+            self.progress_bar.setRange(0, total)
+            self.progress_bar.setValue(done)
+        self.label.setText(f"{self._message}... {done} rows")
+
+    def _on_rows(self, worker, on_rows, rows):
+        if worker is self._worker:
+            on_rows(rows)
+
+    def _on_result(self, worker, on_result, result):
+        if worker is self._worker and on_result is not None:
+            on_result(result)
+
+    def _on_error(self, worker, message):
+        if worker is self._worker:
+            QMessageBox.critical(self, "Database Error", f"{self._error_message}: {message}")
+
+    def _on_finished(self, worker):
+        if worker is self._worker:
+            self._worker = None
+            self.hide()
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -50,7 +1235,9 @@ class MainWindow(QMainWindow):
         file_menu = menubar.addMenu("File")
         # Add actions to the menu
         import_action = file_menu.addAction("Import")
-        import_action.triggered.connect(self.import_tab_data)
+        import_action.triggered.connect(lambda: self.import_tab_data())
+        upsert_action = file_menu.addAction("Import (Update Existing)")
+        upsert_action.triggered.connect(lambda: self.import_tab_data(upsert=True))
         export_action = file_menu.addAction("Export")
         export_action.triggered.connect(self.export_tab_data)
         refresh_action = file_menu.addAction("Refresh")
@@ -58,70 +1245,141 @@ class MainWindow(QMainWindow):
         # Create tab widget
         self.tabs = QTabWidget()
         layout.addWidget(self.tabs)
-        # Create tabs for products, customers, and orders
+        # Create tabs for the dashboard, products, customers, and orders
+        self.dashboard_tab = DashboardTab(self.db)
         self.products_tab = ProductsTab(self.db)
         self.customers_tab = CustomersTab(self.db)
         self.orders_tab = OrdersTab(self.db)
+        self.tabs.addTab(self.dashboard_tab, "Dashboard")
         self.tabs.addTab(self.products_tab, "Products")
         self.tabs.addTab(self.customers_tab, "Customers")
         self.tabs.addTab(self.orders_tab, "Orders")
 
     def refresh_tab(self):
-        current_tab_index = self.tabs.currentIndex()
-        if current_tab_index == 0:
-            self.products_tab.load_data()
-        elif current_tab_index == 1:
-            self.customers_tab.load_data()
-        elif current_tab_index == 2:
-            self.orders_tab.load_data()
+        self.tabs.currentWidget().load_data()
 
     def export_tab_data(self):
-        current_tab_index = self.tabs.currentIndex()
-        if current_tab_index == 0:
-            self.export_data(self.products_tab.table, "Products")
-        elif current_tab_index == 1:
-            self.export_data(self.customers_tab.table, "Customers")
-        elif current_tab_index == 2:
-            self.export_data(self.orders_tab.table, "Orders")
-
-    def import_tab_data(self):
-        current_tab_index = self.tabs.currentIndex()
-        if current_tab_index == 0:
-            self.products_tab.import_data()
-        elif current_tab_index == 1:
-            self.customers_tab.import_data()
-        elif current_tab_index == 2:
-            self.orders_tab.import_data()
-
-    def export_data(self, table, tab_name):
-        file_path, _ = QFileDialog.getSaveFileName(self, "Save JSON", "", "JSON Files (*.json)")
+        tab = self.tabs.currentWidget()
+        if hasattr(tab, "EXPORT_QUERY"):
+            self.export_data(tab, self.tabs.tabText(self.tabs.currentIndex()))
+
+    def import_tab_data(self, upsert=False):
+        tab = self.tabs.currentWidget()
+        if hasattr(tab, "import_data"):
+            tab.import_data(upsert)
+
+    def export_data(self, tab, tab_name):
+        # Exports the whole table from the database, not just the rows loaded in the grid
+        file_path, selected_filter = QFileDialog.getSaveFileName(self, "Export", "", ";;".join(EXPORT_FILTERS))
         if file_path:
-            data = []
-            headers = [table.horizontalHeaderItem(i).text() for i in range(table.columnCount())]
-            for row in range(table.rowCount()):
-                row_data = {}
-                for col in range(table.columnCount()):
-                    item = table.item(row, col)
-                    if item:
-                        row_data[headers[col]] = item.text()
-                    else:
-                        row_data[headers[col]] = None
-                data.append(row_data)
-            try:
-                with open(file_path, 'w') as f:
-                    json.dump(data, f, indent=4)
-                QMessageBox.information(self, "Success", f"{tab_name} data exported to {file_path}")
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Error exporting {tab_name} data: {str(e)}")
+            exporter = DataExporter(tab.EXPORT_QUERY, export_format(file_path, selected_filter),
+                                    compress=file_path.endswith(".gz"))
+            worker = self.db.submit_task(lambda worker, conn: exporter.run(conn, file_path, worker))
+            tab.transfer_progress.start(
+                worker,
+                lambda exported: QMessageBox.information(self, "Success", f"{tab_name} data exported to {file_path}"),
+                "Exporting", f"Error exporting {tab_name} data",
+                cancelled_message=f"Export of {tab_name} data cancelled; {file_path} was not written.")
 
     def closeEvent(self, event):
         self.db.close()
         event.accept()
 
+class DashboardTab(QWidget):
+    def __init__(self, db):
+        super().__init__()
+        self.db = db
+        self.cache = DashboardCache()
+        self.setup_ui()
+        # Keep the figures current while the dashboard is on screen
+        self.timer = QTimer(self)
+        self.timer.setInterval(DASHBOARD_MAX_AGE_SECONDS * 1000)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        # KPIs
+        kpi_layout = QGridLayout()
+        self.kpi_labels = {}
+        kpis = [("total_sales", "Total Sales"), ("recent_sales", "Sales, Last 30 Days"), ("orders", "Total Orders"),
+                ("customers", "Total Customers"), ("products", "Total Products")]
+        for column, (key, title) in enumerate(kpis):
+            kpi_layout.addWidget(QLabel(title), 0, column)
+            value_label = QLabel("-")
+            value_label.setStyleSheet("font-size: 18pt; font-weight: bold;")
+            kpi_layout.addWidget(value_label, 1, column)
+            self.kpi_labels[key] = value_label
+        layout.addLayout(kpi_layout)
+        # Recent orders
+        layout.addWidget(QLabel("Recent Orders"))
+        self.recent_orders_table = QTableWidget()
+        self.recent_orders_table.setColumnCount(5)
+        self.recent_orders_table.setHorizontalHeaderLabels(["ID", "Customer", "Status", "Total Amount", "Created At"])
+        layout.addWidget(self.recent_orders_table)
+        status_layout = QHBoxLayout()
+        self.updated_label = QLabel()
+        refresh_button = QPushButton("Refresh")
+        refresh_button.clicked.connect(self.load_data)
+        status_layout.addWidget(self.updated_label)
+        status_layout.addStretch()
+        status_layout.addWidget(refresh_button)
+        layout.addLayout(status_layout)
+        self.query_progress = QueryProgress()
+        layout.addWidget(self.query_progress)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+
+    def load_data(self):
+        self.refresh(force=True)
+
+    def refresh(self, force=False):
+        # Show what is cached right away, and reload it in the background when it is stale
+        if not self.isVisible() and not force:
+            return
+        if self.cache.values is not None:
+            self.show_values()
+        if (force or self.cache.is_stale()) and not self.query_progress.is_running():
+            worker = self.db.submit_task(self.cache.load)
+            self.query_progress.start(worker, self.loaded, "Refreshing", "Error loading the dashboard")
+
+    def loaded(self, values):
+        self.cache.update(values)
+        self.show_values()
+
+    def show_values(self):
+        values = self.cache.values
+        self.kpi_labels["total_sales"].setText(f"{values['total_sales']:,.2f}")
+        self.kpi_labels["recent_sales"].setText(f"{values['recent_sales']:,.2f}")
+        for table, (rows, estimated) in values["counts"].items():
+            self.kpi_labels[table].setText(f"{'~' if estimated else ''}{rows:,}")
+        self.recent_orders_table.setRowCount(len(values["recent_orders"]))
+        for i, (order_id, customer, status, total_amount, created_at) in enumerate(values["recent_orders"]):
+            self.recent_orders_table.setItem(i, 0, QTableWidgetItem(str(order_id)))
+            self.recent_orders_table.setItem(i, 1, QTableWidgetItem(customer if customer is not None else "Unknown"))
+            self.recent_orders_table.setItem(i, 2, QTableWidgetItem(status or ""))
+            self.recent_orders_table.setItem(i, 3, QTableWidgetItem(str(total_amount)))
+            self.recent_orders_table.setItem(i, 4, QTableWidgetItem(str(created_at)))
+        stale = " (refreshing)" if self.cache.is_stale() else ""
+        self.updated_label.setText(f"Updated {self.cache.loaded_at:%H:%M:%S}{stale}; counts marked ~ are estimates")
+
 class ProductsTab(QWidget):
+    IMPORT_COLUMNS = ("name", "category", "price", "stock_quantity", "description", "featured")
+    # Export keys match the ones import_row reads
+    EXPORT_QUERY = """
+        SELECT product_id AS "ID", name AS "Name", category AS "Category", price AS "Price",
+               stock_quantity AS "Stock", description AS "Description", featured AS "Featured"
+        FROM products ORDER BY product_id
+        """
+
     def __init__(self, db):
         super().__init__()
         self.db = db
+        self.search = SubstringSearch(db, """
+            SELECT product_id, name, category, price, stock_quantity, description, featured FROM products
+            """, ["name", "description"])
         self.setup_ui()
         self.load_data()
 
@@ -137,13 +1395,22 @@ class ProductsTab(QWidget):
         search_layout.addWidget(search_button)
         layout.addLayout(search_layout)
         # Table
-        self.table = QTableWidget()
-        self.table.setColumnCount(8)  # Added checkbox column
-        self.table.setHorizontalHeaderLabels([
+        self.model = RowTableModel([
             "ID", "Name", "Category", "Price", "Stock", "Description", "Featured", "Select"
         ])
-        self.table.itemSelectionChanged.connect(self.populate_fields)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setSortingEnabled(True)
+        self.table.selectionModel().selectionChanged.connect(self.populate_fields)
         layout.addWidget(self.table)
+        self.query_progress = QueryProgress()
+        layout.addWidget(self.query_progress)
+        # Imports and exports get their own slot, so listings and searches cannot cancel them
+        self.transfer_progress = QueryProgress()
+        layout.addWidget(self.transfer_progress)
+        self.live_search = LiveSearch(self.db, self.search_input, self.query_progress, self.search.query,
+                                      self.show_search_results, self.load_data)
         # Form for adding/editing
         form_layout = QHBoxLayout()
         self.name_input = QLineEdit()
@@ -176,50 +1443,44 @@ class ProductsTab(QWidget):
         button_layout.addWidget(update_button)
         button_layout.addWidget(delete_button)
         layout.addLayout(button_layout)
+        # Bulk actions take their values from the form above
+        layout.addLayout(bulk_layout(self.model, [
+            ("Delete", self.delete_checked),
+            ("Feature", lambda: self.set_checked_featured(True)),
+            ("Unfeature", lambda: self.set_checked_featured(False)),
+            ("Set Category", self.set_checked_category),
+            ("Set Stock", self.set_checked_stock),
+        ]))
 
     def load_data(self):
-        results = self.db.execute_query("SELECT product_id, name, category, price, stock_quantity, description, featured FROM products")
-        if results:
-            self.table.setRowCount(len(results))
-            for i, row in enumerate(results):
-                for j, value in enumerate(row):
-                    self.table.setItem(i, j, QTableWidgetItem(str(value)))
-                # Add checkbox to the last column
-                checkbox = QTableWidgetItem()
-                checkbox.setCheckState(Qt.CheckState.Unchecked)
-                self.table.setItem(i, 7, checkbox)
-        else:
-            self.table.setRowCount(0)
+        self.live_search.invalidate()
+        self.run_listing("SELECT product_id, name, category, price, stock_quantity, description, featured FROM products")
+
+    def run_listing(self, query, params=None, message="Loading"):
+        # Rows are streamed in batches, so the first ones show up before the query has finished
+        self.model.clear()
+        worker = self.db.submit(query, params, stream=True)
+        self.query_progress.start(worker, message=message, on_rows=self.append_rows)
+
+    def append_rows(self, rows):
+        self.model.append_rows(rows)
 
     def populate_fields(self):
-        selected_row = self.table.currentRow()
+        selected_row = self.table.currentIndex().row()
         if selected_row >= 0:
-            self.name_input.setText(self.table.item(selected_row, 1).text())
-            self.category_input.setText(self.table.item(selected_row, 2).text())
-            self.price_input.setValue(float(self.table.item(selected_row, 3).text()))
-            self.stock_input.setValue(int(self.table.item(selected_row, 4).text()))
-            self.description_input.setText(self.table.item(selected_row, 5).text())
-            self.featured_checkbox.setChecked(self.table.item(selected_row, 6).text().lower() == "true")
+            self.name_input.setText(self.model.display(selected_row, 1))
+            self.category_input.setText(self.model.display(selected_row, 2))
+            self.price_input.setValue(float(self.model.value(selected_row, 3)))
+            self.stock_input.setValue(self.model.value(selected_row, 4) or 0)
+            self.description_input.setText(self.model.display(selected_row, 5))
+            self.featured_checkbox.setChecked(bool(self.model.value(selected_row, 6)))
 
     def search_products(self):
-        search_term = self.search_input.text()
-        query = """
-        SELECT product_id, name, category, price, stock_quantity, description, featured 
-        FROM products 
-        WHERE name ILIKE %s OR description ILIKE %s
-        """
-        results = self.db.execute_query(query, (f'%{search_term}%', f'%{search_term}%'))
-        if results:
-            self.table.setRowCount(len(results))
-            for i, row in enumerate(results):
-                for j, value in enumerate(row):
-                    self.table.setItem(i, j, QTableWidgetItem(str(value)))
-                # Add checkbox to the last column
-                checkbox = QTableWidgetItem()
-                checkbox.setCheckState(Qt.CheckState.Unchecked)
-                self.table.setItem(i, 7, checkbox)
-        else:
-            self.table.setRowCount(0)
+        self.live_search.search()
+
+    def show_search_results(self, rows):
+        self.model.clear()
+        self.append_rows(rows)
 
     def add_product(self):
         query = """
@@ -242,11 +1503,11 @@ class ProductsTab(QWidget):
             QMessageBox.critical(self, "Error", f"Error adding product: {str(e)}")
 
     def update_product(self):
-        selected_row = self.table.currentRow()
+        selected_row = self.table.currentIndex().row()
         if selected_row < 0:
             QMessageBox.warning(self, "Warning", "No product selected!")
             return
-        product_id = self.table.item(selected_row, 0).text()
+        product_id = self.model.value(selected_row, 0)
         query = """
         UPDATE products 
         SET name=%s, category=%s, price=%s, stock_quantity=%s, description=%s, featured=%s
@@ -269,11 +1530,11 @@ class ProductsTab(QWidget):
             QMessageBox.critical(self, "Error", f"Error updating product: {str(e)}")
 
     def delete_product(self):
-        selected_row = self.table.currentRow()
+        selected_row = self.table.currentIndex().row()
         if selected_row < 0:
             QMessageBox.warning(self, "Warning", "No product selected!")
             return
-        product_id = self.table.item(selected_row, 0).text()
+        product_id = self.model.value(selected_row, 0)
         reply = QMessageBox.question(self, "Delete Product", "Are you sure you want to delete this product?",
                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
@@ -286,6 +1547,30 @@ class ProductsTab(QWidget):
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Error deleting product: {str(e)}")
 
+    def update_checked(self, action, assignment, value):
+        result = apply_to_checked(self, self.db, self.model, "products", action, lambda keys: [
+            (f"UPDATE products SET {assignment} WHERE product_id = ANY(%s)", (value, keys))])
+        if result:
+            self.load_data()
+            QMessageBox.information(self, "Success", f"{result[0]} products updated.")
+
+    def set_checked_featured(self, featured):
+        self.update_checked("Feature" if featured else "Unfeature", "featured = %s", featured)
+
+    def set_checked_category(self):
+        self.update_checked("Set category", "category = %s", self.category_input.text())
+
+    def set_checked_stock(self):
+        self.update_checked("Set stock", "stock_quantity = %s", self.stock_input.value())
+
+    def delete_checked(self):
+        result = apply_to_checked(self, self.db, self.model, "products", "Delete", lambda keys: [
+            ("DELETE FROM products WHERE product_id = ANY(%s)", (keys,))], confirm=True)
+        if result:
+            self.load_data()
+            QMessageBox.information(self, "Success", f"{result[0]} products deleted.")
+            self.clear_inputs()
+
     def clear_inputs(self):
         self.name_input.clear()
         self.category_input.clear()
@@ -294,34 +1579,55 @@ class ProductsTab(QWidget):
         self.description_input.clear()
         self.featured_checkbox.setChecked(False)
 
-    def import_data(self):
-        file_path, _ = QFileDialog.getOpenFileName(self, "Open JSON", "", "JSON Files (*.json)")
+    def import_data(self, upsert=False):
+        file_path, _ = QFileDialog.getOpenFileName(self, "Open JSON", "", "JSON Files (*.json *.ndjson *.jsonl)")
         if file_path:
-            try:
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
-                for item in data:
-                    query = """
-                    INSERT INTO products (name, category, price, stock_quantity, description, featured)
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                    """
-                    self.db.execute_query(query, (
-                        item.get("Name", ""),
-                        item.get("Category", ""),
-                        float(item.get("Price", 0)),
-                        int(item.get("Stock", 0)),
-                        item.get("Description", ""),
-                        item.get("Featured", False)
-                    ))
-                self.load_data()
-                QMessageBox.information(self, "Success", "Products imported successfully!")
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Error importing products: {str(e)}")
+            # Records are parsed incrementally inside the worker and fed to COPY batch by batch
+            if upsert:
+                # Keyed on the exported product ID
+                importer = UpsertImporter("products", ("product_id",) + self.IMPORT_COLUMNS,
+                                          lambda item: (import_id(item),) + self.import_row(item), "product_id")
+            else:
+                importer = BulkImporter("products", self.IMPORT_COLUMNS, self.import_row)
+            worker = self.db.submit_task(lambda worker, conn: importer.run(conn, iter_json_records(file_path), worker))
+            self.transfer_progress.start(worker, self.import_finished, "Importing", "Error importing products",
+                                         cancelled_message="Import cancelled; no products were changed.")
+
+    @staticmethod
+    def import_row(item):
+        return (
+            item.get("Name", ""),
+            item.get("Category", ""),
+            float(item.get("Price", 0)),
+            int(item.get("Stock", 0)),
+            item.get("Description", ""),
+            parse_bool(item.get("Featured", False))
+        )
+
+    def import_finished(self, importer):
+        self.load_data()
+        show_import_report(self, "Products", importer)
 
 class CustomersTab(QWidget):
+    IMPORT_COLUMNS = ("name", "email", "phone", "address", "newsletter_opt_in")
+    EXPORT_QUERY = """
+        SELECT customer_id AS "ID", name AS "Name", email AS "Email", phone AS "Phone", address AS "Address",
+               registration_date AS "Registration Date", newsletter_opt_in AS "Newsletter Opt-In"
+        FROM customers ORDER BY customer_id
+        """
+    LISTING_QUERY = "SELECT customer_id, name, email, phone, address, registration_date, newsletter_opt_in FROM customers"
+    # Browse modes: label, keyset columns, their positions in a listing row, descending
+    BROWSE_MODES = [
+        ("All rows", None, None, False),
+        ("Pages by ID", ("customer_id",), (0,), False),
+        ("Pages, newest first", ("registration_date", "customer_id"), (5, 0), True),
+    ]
+
     def __init__(self, db):
         super().__init__()
         self.db = db
+        self.pager = None
+        self.search = SubstringSearch(db, self.LISTING_QUERY, ["name", "email"])
         self.setup_ui()
         self.load_data()
 
@@ -333,17 +1639,30 @@ class CustomersTab(QWidget):
         self.search_input.setPlaceholderText("Search customers...")
         search_button = QPushButton("Search")
         search_button.clicked.connect(self.search_customers)
+        self.browse_combo = QComboBox()
+        self.browse_combo.addItems([mode[0] for mode in self.BROWSE_MODES])
+        self.browse_combo.currentIndexChanged.connect(self.load_data)
         search_layout.addWidget(self.search_input)
         search_layout.addWidget(search_button)
+        search_layout.addWidget(self.browse_combo)
         layout.addLayout(search_layout)
         # Table
-        self.table = QTableWidget()
-        self.table.setColumnCount(8)  # Added checkbox column
-        self.table.setHorizontalHeaderLabels([
+        self.model = RowTableModel([
             "ID", "Name", "Email", "Phone", "Address", "Registration Date", "Newsletter", "Select"
-        ])
-        self.table.itemSelectionChanged.connect(self.populate_fields)
+        ], formatters={4: lambda value: json.dumps(value) if value else str(value)})
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setSortingEnabled(True)
+        self.table.selectionModel().selectionChanged.connect(self.populate_fields)
         layout.addWidget(self.table)
+        self.query_progress = QueryProgress()
+        layout.addWidget(self.query_progress)
+        # Imports and exports get their own slot, so listings and searches cannot cancel them
+        self.transfer_progress = QueryProgress()
+        layout.addWidget(self.transfer_progress)
+        self.live_search = LiveSearch(self.db, self.search_input, self.query_progress, self.search.query,
+                                      self.show_search_results, self.load_data)
         # Form for adding/editing
         form_layout = QHBoxLayout()
         self.name_input = QLineEdit()
@@ -373,55 +1692,61 @@ class CustomersTab(QWidget):
         button_layout.addWidget(update_button)
         button_layout.addWidget(delete_button)
         layout.addLayout(button_layout)
+        layout.addLayout(bulk_layout(self.model, [("Delete", self.delete_checked)]))
 
     def load_data(self):
-        results = self.db.execute_query("SELECT customer_id, name, email, phone, address, registration_date, newsletter_opt_in FROM customers")
-        if results:
-            self.table.setRowCount(len(results))
-            for i, row in enumerate(results):
-                for j, value in enumerate(row):
-                    if j == 4 and value:
-                        self.table.setItem(i, j, QTableWidgetItem(json.dumps(value)))
-                    else:
-                        self.table.setItem(i, j, QTableWidgetItem(str(value)))
-                # Add checkbox to the last column
-                checkbox = QTableWidgetItem()
-                checkbox.setCheckState(Qt.CheckState.Unchecked)
-                self.table.setItem(i, 7, checkbox)
+        self.live_search.invalidate()
+        _, order_by, key_positions, descending = self.BROWSE_MODES[self.browse_combo.currentIndex()]
+        if order_by is None:
+            self.run_listing(self.LISTING_QUERY)
         else:
-            self.table.setRowCount(0)
+            self.run_paged(self.LISTING_QUERY, order_by, key_positions, descending)
+
+    def stop_listing(self):
+        self.query_progress.cancel()
+        if self.pager is not None:
+            self.pager.stop()
+            self.pager = None
+        self.model.pager = None
+        self.model.clear()
+
+    def run_listing(self, query, params=None, message="Loading"):
+        self.stop_listing()
+        self.table.setSortingEnabled(True)
+        worker = self.db.submit(query, params, stream=True)
+        self.query_progress.start(worker, message=message, on_rows=self.append_rows)
+
+    def run_paged(self, query, order_by, key_positions, descending=False, filters=None, params=None):
+        # Later pages are pulled by the view as it scrolls; sorting loaded rows client-side would
+        # scramble the keyset order, so header sorting is off while paging
+        self.stop_listing()
+        self.table.setSortingEnabled(False)
+        self.table.sortByColumn(-1, Qt.SortOrder.AscendingOrder)
+        self.pager = KeysetPager(self.db, query, order_by, key_positions, descending, filters, params)
+        self.pager.page_loaded.connect(self.append_rows)
+        self.pager.error.connect(lambda message: QMessageBox.critical(self, "Database Error", f"Error executing query: {message}"))
+        self.model.pager = self.pager
+        self.pager.start()
+
+    def append_rows(self, rows):
+        self.model.append_rows(rows)
 
     def populate_fields(self):
-        selected_row = self.table.currentRow()
+        selected_row = self.table.currentIndex().row()
         if selected_row >= 0:
-            self.name_input.setText(self.table.item(selected_row, 1).text())
-            self.email_input.setText(self.table.item(selected_row, 2).text())
-            self.phone_input.setText(self.table.item(selected_row, 3).text())
-            self.address_input.setPlainText(self.table.item(selected_row, 4).text())
-            self.newsletter_checkbox.setChecked(self.table.item(selected_row, 6).text().lower() == "true")
+            self.name_input.setText(self.model.display(selected_row, 1))
+            self.email_input.setText(self.model.display(selected_row, 2))
+            self.phone_input.setText(self.model.display(selected_row, 3))
+            self.address_input.setPlainText(self.model.display(selected_row, 4))
+            self.newsletter_checkbox.setChecked(bool(self.model.value(selected_row, 6)))
 
     def search_customers(self):
-        search_term = self.search_input.text()
-        query = """
-        SELECT customer_id, name, email, phone, address, registration_date, newsletter_opt_in
-        FROM customers 
-        WHERE name ILIKE %s OR email ILIKE %s
-        """
-        results = self.db.execute_query(query, (f'%{search_term}%', f'%{search_term}%'))
-        if results:
-            self.table.setRowCount(len(results))
-            for i, row in enumerate(results):
-                for j, value in enumerate(row):
-                    if j == 4 and value:
-                        self.table.setItem(i, j, QTableWidgetItem(json.dumps(value)))
-                    else:
-                        self.table.setItem(i, j, QTableWidgetItem(str(value)))
-                # Add checkbox to the last column
-                checkbox = QTableWidgetItem()
-                checkbox.setCheckState(Qt.CheckState.Unchecked)
-                self.table.setItem(i, 7, checkbox)
-        else:
-            self.table.setRowCount(0)
+        self.live_search.search()
+
+    def show_search_results(self, rows):
+        self.stop_listing()
+        self.table.setSortingEnabled(True)
+        self.append_rows(rows)
 
     def add_customer(self):
         query = """
@@ -437,6 +1762,7 @@ class CustomersTab(QWidget):
                 address_json,
                 self.newsletter_checkbox.isChecked()
             ))
+            self.db.customer_names.invalidate()
             self.load_data()
             QMessageBox.information(self, "Success", "Customer added successfully!")
             self.clear_inputs()
@@ -444,11 +1770,11 @@ class CustomersTab(QWidget):
             QMessageBox.critical(self, "Error", f"Error adding customer: {str(e)}")
 
     def update_customer(self):
-        selected_row = self.table.currentRow()
+        selected_row = self.table.currentIndex().row()
         if selected_row < 0:
             QMessageBox.warning(self, "Warning", "No customer selected!")
             return
-        customer_id = self.table.item(selected_row, 0).text()
+        customer_id = self.model.value(selected_row, 0)
         query = """
         UPDATE customers 
         SET name=%s, email=%s, phone=%s, address=%s, newsletter_opt_in=%s
@@ -464,6 +1790,7 @@ class CustomersTab(QWidget):
                 self.newsletter_checkbox.isChecked(),
                 customer_id
             ))
+            self.db.customer_names.invalidate(int(customer_id))
             self.load_data()
             QMessageBox.information(self, "Success", "Customer updated successfully!")
             self.clear_inputs()
@@ -471,23 +1798,35 @@ class CustomersTab(QWidget):
             QMessageBox.critical(self, "Error", f"Error updating customer: {str(e)}")
 
     def delete_customer(self):
-        selected_row = self.table.currentRow()
+        selected_row = self.table.currentIndex().row()
         if selected_row < 0:
             QMessageBox.warning(self, "Warning", "No customer selected!")
             return
-        customer_id = self.table.item(selected_row, 0).text()
+        customer_id = self.model.value(selected_row, 0)
         reply = QMessageBox.question(self, "Delete Customer", "Are you sure you want to delete this customer?",
                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
             query = "DELETE FROM customers WHERE customer_id = %s"
             try:
                 self.db.execute_query(query, (customer_id,))
+                self.db.customer_names.invalidate(int(customer_id))
                 self.load_data()
                 QMessageBox.information(self, "Success", "Customer deleted successfully!")
                 self.clear_inputs()
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Error deleting customer: {str(e)}")
 
+    def delete_checked(self):
+        # Customers with orders are kept by the foreign key; the whole delete is then rolled back
+        result = apply_to_checked(self, self.db, self.model, "customers", "Delete", lambda keys: [
+            ("DELETE FROM customers WHERE customer_id = ANY(%s)", (keys,))], confirm=True)
+        if result:
+            for customer_id in result[1]:
+                self.db.customer_names.invalidate(customer_id)
+            self.load_data()
+            QMessageBox.information(self, "Success", f"{result[0]} customers deleted.")
+            self.clear_inputs()
+
     def clear_inputs(self):
         self.name_input.clear()
         self.email_input.clear()
@@ -495,33 +1834,79 @@ class CustomersTab(QWidget):
         self.address_input.clear()
         self.newsletter_checkbox.setChecked(False)
 
-    def import_data(self):
-        file_path, _ = QFileDialog.getOpenFileName(self, "Open JSON", "", "JSON Files (*.json)")
+    def import_data(self, upsert=False):
+        file_path, _ = QFileDialog.getOpenFileName(self, "Open JSON", "", "JSON Files (*.json *.ndjson *.jsonl)")
         if file_path:
-            try:
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
-                for item in data:
-                    query = """
-                    INSERT INTO customers (name, email, phone, address, newsletter_opt_in)
-                    VALUES (%s, %s, %s, %s, %s)
-                    """
-                    self.db.execute_query(query, (
-                        item.get("Name", ""),
-                        item.get("Email", ""),
-                        item.get("Phone", ""),
-                        json.dumps(item.get("Address", {})),
-                        item.get("Newsletter Opt-In", False)
-                    ))
-                self.load_data()
-                QMessageBox.information(self, "Success", "Customers imported successfully!")
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Error importing customers: {str(e)}")
+            # Records are parsed incrementally inside the worker and fed to COPY batch by batch
+            if upsert:
+                importer = UpsertImporter("customers", self.IMPORT_COLUMNS, self.import_row, "email")
+            else:
+                importer = BulkImporter("customers", self.IMPORT_COLUMNS, self.import_row)
+            worker = self.db.submit_task(lambda worker, conn: importer.run(conn, iter_json_records(file_path), worker))
+            self.transfer_progress.start(worker, self.import_finished, "Importing", "Error importing customers",
+                                         cancelled_message="Import cancelled; no customers were changed.")
+
+    @staticmethod
+    def import_row(item):
+        address = item.get("Address", {})
+        return (
+            item.get("Name", ""),
+            item.get("Email", ""),
+            item.get("Phone", ""),
+            # Exports carry the address as JSON text already
+            address if isinstance(address, str) else json.dumps(address),
+            parse_bool(item.get("Newsletter Opt-In", False))
+        )
+
+    def import_finished(self, importer):
+        self.db.customer_names.invalidate()
+        self.load_data()
+        show_import_report(self, "Customers", importer)
 
 class OrdersTab(QWidget):
+    # Customer names come from the same query instead of one lookup per order
+    LISTING_QUERY = """
+        SELECT o.order_id, o.customer_id, o.status, o.total_amount, o.created_at, c.name
+        FROM orders o
+        LEFT JOIN customers c ON o.customer_id = c.customer_id
+        """
+    # Browse modes: label, keyset columns, their positions in a listing row, descending
+    BROWSE_MODES = [
+        ("All rows", None, None, False),
+        ("Pages by ID", ("o.order_id",), (0,), False),
+        ("Pages, newest first", ("o.created_at", "o.order_id"), (4, 0), True),
+    ]
+    # Periods limit listings to recent orders; orders is partitioned by month on created_at, so a
+    # period filter only reads the matching partitions
+    PERIODS = [
+        ("All time", None),
+        ("Last 7 days", "7 days"),
+        ("Last 30 days", "30 days"),
+        ("Last 90 days", "90 days"),
+        ("Last 12 months", "12 months"),
+    ]
+    IMPORT_COLUMNS = ("customer_id", "status", "total_amount")
+    # An existing order keeps its created_at: it names the order's partition and is part of the
+    # partitioned primary key. New orders without one are stamped now().
+    UPSERT_PREPARE = (
+        "UPDATE {staging} s SET created_at = o.created_at FROM orders o "
+        "WHERE o.order_id = s.order_id AND s.created_at IS DISTINCT FROM o.created_at",
+        "UPDATE {staging} SET created_at = now() WHERE created_at IS NULL",
+    )
+    EXPORT_QUERY = """
+        SELECT o.order_id AS "ID", o.customer_id AS "Customer ID", c.name AS "Customer", o.status AS "Status",
+               o.total_amount AS "Total Amount", o.created_at AS "Created At"
+        FROM orders o
+        LEFT JOIN customers c ON o.customer_id = c.customer_id
+        ORDER BY o.order_id
+        """
+
     def __init__(self, db):
         super().__init__()
         self.db = db
+        self.pager = None
+        # Filter panel values as of the last Apply
+        self.filters = {}
         self.setup_ui()
         self.load_data()
         self.selected_order_id = None  # To keep track of the order_id when updating or deleting
@@ -531,20 +1916,61 @@ class OrdersTab(QWidget):
         # Search section
         search_layout = QHBoxLayout()
         self.search_input = QLineEdit()
-        self.search_input.setPlaceholderText("Search orders...")
+        self.search_input.setPlaceholderText("Order ID, customer email or name...")
         search_button = QPushButton("Search")
         search_button.clicked.connect(self.search_orders)
+        self.browse_combo = QComboBox()
+        self.browse_combo.addItems([mode[0] for mode in self.BROWSE_MODES])
+        self.browse_combo.currentIndexChanged.connect(self.load_data)
+        self.period_combo = QComboBox()
+        self.period_combo.addItems([period[0] for period in self.PERIODS])
+        self.period_combo.currentIndexChanged.connect(self.load_data)
         search_layout.addWidget(self.search_input)
         search_layout.addWidget(search_button)
+        search_layout.addWidget(self.browse_combo)
+        search_layout.addWidget(self.period_combo)
         layout.addLayout(search_layout)
+        # Filter panel
+        filter_layout = QHBoxLayout()
+        self.status_filter = QComboBox()
+        self.status_filter.addItem("Any status")
+        self.load_statuses_into_combobox()
+        self.customer_filter = QLineEdit()
+        self.customer_filter.setPlaceholderText("Customer ID, email or name")
+        self.start_filter = QLineEdit()
+        self.start_filter.setPlaceholderText("From YYYY-MM-DD")
+        self.end_filter = QLineEdit()
+        self.end_filter.setPlaceholderText("To YYYY-MM-DD")
+        self.min_total_filter = QLineEdit()
+        self.min_total_filter.setPlaceholderText("Min total")
+        self.max_total_filter = QLineEdit()
+        self.max_total_filter.setPlaceholderText("Max total")
+        apply_filters_button = QPushButton("Apply Filters")
+        apply_filters_button.clicked.connect(self.apply_filters)
+        clear_filters_button = QPushButton("Clear Filters")
+        clear_filters_button.clicked.connect(self.clear_filters)
+        for widget in (self.status_filter, self.customer_filter, self.start_filter, self.end_filter,
+                       self.min_total_filter, self.max_total_filter, apply_filters_button, clear_filters_button):
+            filter_layout.addWidget(widget)
+        layout.addLayout(filter_layout)
         # Table
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)  # Added checkbox column
-        self.table.setHorizontalHeaderLabels([
+        # Listing rows are (order_id, customer_id, status, total_amount, created_at, customer name)
+        self.model = RowTableModel([
             "ID", "Customer", "Status", "Total Amount", "Created At", "Select"
-        ])
-        self.table.itemSelectionChanged.connect(self.populate_fields)
+        ], columns=[0, 5, 2, 3, 4], formatters={1: lambda name: name if name is not None else "Unknown"})
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setSortingEnabled(True)
+        self.table.selectionModel().selectionChanged.connect(self.populate_fields)
         layout.addWidget(self.table)
+        self.query_progress = QueryProgress()
+        layout.addWidget(self.query_progress)
+        # Imports and exports get their own slot, so listings and searches cannot cancel them
+        self.transfer_progress = QueryProgress()
+        layout.addWidget(self.transfer_progress)
+        self.live_search = LiveSearch(self.db, self.search_input, self.query_progress, self.search_query,
+                                      self.show_search_results, self.load_data)
         # Form for adding/editing
         form_layout = QHBoxLayout()
         self.customer_combo = QComboBox()
@@ -595,31 +2021,104 @@ class OrdersTab(QWidget):
         button_layout.addWidget(update_button)
         button_layout.addWidget(delete_button)
         layout.addLayout(button_layout)
+        # Set Status takes the status typed in the form above
+        layout.addLayout(bulk_layout(self.model, [
+            ("Delete", self.delete_checked),
+            ("Set Status", self.set_checked_status),
+        ]))
 
     def load_data(self):
-        results = self.db.execute_query("SELECT order_id, customer_id, status, total_amount, created_at FROM orders")
-        if results:
-            self.table.setRowCount(len(results))
-            for i, row in enumerate(results):
-                customer_name = self.get_customer_name(row[1])
-                self.table.setItem(i, 0, QTableWidgetItem(str(row[0])))
-                self.table.setItem(i, 1, QTableWidgetItem(customer_name))
-                self.table.setItem(i, 2, QTableWidgetItem(str(row[2])))
-                self.table.setItem(i, 3, QTableWidgetItem(str(row[3])))
-                self.table.setItem(i, 4, QTableWidgetItem(str(row[4])))
-                # Add checkbox to the last column
-                checkbox = QTableWidgetItem()
-                checkbox.setCheckState(Qt.CheckState.Unchecked)
-                self.table.setItem(i, 5, checkbox)
+        self.live_search.invalidate()
+        _, order_by, key_positions, descending = self.BROWSE_MODES[self.browse_combo.currentIndex()]
+        order_filter = self.order_filter()
+        if order_by is None:
+            self.run_listing(self.LISTING_QUERY + order_filter.where(), order_filter.params)
         else:
-            self.table.setRowCount(0)
+            self.run_paged(self.LISTING_QUERY, order_by, key_positions, descending, order_filter.conditions,
+                           order_filter.params)
+
+    def order_filter(self):
+        # Period selector plus the applied filter panel
+        order_filter = OrderFilter()
+        interval = self.PERIODS[self.period_combo.currentIndex()][1]
+        if interval is not None:
+            order_filter.add("o.created_at >= now() - %s::interval", interval)
+        return order_filter.apply(self.filters)
+
+    def apply_filters(self):
+        try:
+            parse_date = lambda text: datetime.strptime(text, "%Y-%m-%d").date() if text else None
+            parse_amount = lambda text: Decimal(text) if text else None
+            filters = {
+                "status": self.status_filter.currentText() if self.status_filter.currentIndex() > 0 else None,
+                "customer": self.customer_filter.text().strip(),
+                "start": parse_date(self.start_filter.text().strip()),
+                "end": parse_date(self.end_filter.text().strip()),
+                "min_total": parse_amount(self.min_total_filter.text().strip()),
+                "max_total": parse_amount(self.max_total_filter.text().strip()),
+            }
+        except (ValueError, InvalidOperation):
+            QMessageBox.warning(self, "Warning", "Dates must be YYYY-MM-DD and totals numbers.")
+            return
+        self.filters = filters
+        self.search_orders()
+
+    def clear_filters(self):
+        self.status_filter.setCurrentIndex(0)
+        for widget in (self.customer_filter, self.start_filter, self.end_filter, self.min_total_filter,
+                       self.max_total_filter):
+            widget.clear()
+        self.filters = {}
+        self.search_orders()
+
+    def stop_listing(self):
+        self.query_progress.cancel()
+        if self.pager is not None:
+            self.pager.stop()
+            self.pager = None
+        self.model.pager = None
+        self.model.clear()
+
+    def run_listing(self, query, params=None, message="Loading"):
+        self.stop_listing()
+        self.table.setSortingEnabled(True)
+        worker = self.db.submit(query, params, stream=True)
+        self.query_progress.start(worker, message=message, on_rows=self.append_rows)
+
+    def run_paged(self, query, order_by, key_positions, descending=False, filters=None, params=None):
+        self.stop_listing()
+        self.table.setSortingEnabled(False)
+        self.table.sortByColumn(-1, Qt.SortOrder.AscendingOrder)
+        self.pager = KeysetPager(self.db, query, order_by, key_positions, descending, filters, params)
+        self.pager.page_loaded.connect(self.append_rows)
+        self.pager.error.connect(lambda message: QMessageBox.critical(self, "Database Error", f"Error executing query: {message}"))
+        self.model.pager = self.pager
+        self.pager.start()
+
+    def append_rows(self, rows):
+        self.db.customer_names.update((row[1], row[5]) for row in rows if row[5] is not None)
+        self.model.append_rows(rows)
 
     def load_customers_into_combobox(self):
         customers = self.db.execute_query("SELECT customer_id, name FROM customers")
         if customers:
+            self.db.customer_names.update(customers)
             for customer_id, name in customers:
                 self.customer_combo.addItem(name, customer_id)
 
+    def load_statuses_into_combobox(self):
+        # Distinct statuses by skipping through idx_orders_status_created_at, one probe per status
+        statuses = self.db.execute_query("""
+            WITH RECURSIVE s AS (
+                SELECT min(status) AS status FROM orders
+                UNION ALL
+                SELECT (SELECT min(status) FROM orders WHERE status > s.status) FROM s WHERE s.status IS NOT NULL
+            )
+            SELECT status FROM s WHERE status IS NOT NULL
+            """)
+        if statuses:
+            self.status_filter.addItems([status for status, in statuses])
+
     def load_products_into_combobox(self):
         products = self.db.execute_query("SELECT product_id, name, price FROM products")
         if products:
@@ -627,37 +2126,24 @@ class OrdersTab(QWidget):
                 self.product_combo.addItem(name, (product_id, price))
 
     def get_customer_name(self, customer_id):
-        if customer_id:
-            query = "SELECT name FROM customers WHERE customer_id = %s"
-            result = self.db.execute_query(query, (customer_id,))
-            if result:
-                return result[0][0]
-        return "Unknown"
+        return self.db.customer_names.get(customer_id)
 
     def search_orders(self):
-        search_term = self.search_input.text()
-        query = """
-        SELECT o.order_id, o.customer_id, o.status, o.total_amount, o.created_at
-        FROM orders o
-        INNER JOIN customers c ON o.customer_id = c.customer_id
-        WHERE o.order_id::text ILIKE %s OR c.name ILIKE %s OR o.status ILIKE %s
-        """
-        results = self.db.execute_query(query, (f'%{search_term}%', f'%{search_term}%', f'%{search_term}%'))
-        if results:
-            self.table.setRowCount(len(results))
-            for i, row in enumerate(results):
-                customer_name = self.get_customer_name(row[1])
-                self.table.setItem(i, 0, QTableWidgetItem(str(row[0])))
-                self.table.setItem(i, 1, QTableWidgetItem(customer_name))
-                self.table.setItem(i, 2, QTableWidgetItem(str(row[2])))
-                self.table.setItem(i, 3, QTableWidgetItem(str(row[3])))
-                self.table.setItem(i, 4, QTableWidgetItem(str(row[4])))
-                # Add checkbox to the last column
-                checkbox = QTableWidgetItem()
-                checkbox.setCheckState(Qt.CheckState.Unchecked)
-                self.table.setItem(i, 5, checkbox)
+        self.live_search.search()
+
+    def show_search_results(self, rows):
+        self.stop_listing()
+        self.table.setSortingEnabled(True)
+        self.append_rows(rows)
+
+    def search_query(self, search_term):
+        # A number is an order ID; anything else finds the customer by email or name
+        order_filter = self.order_filter()
+        if search_term.isdigit():
+            order_filter.add("o.order_id = %s", int(search_term))
         else:
-            self.table.setRowCount(0)
+            order_filter.customer(search_term)
+        return self.LISTING_QUERY + order_filter.where() + " LIMIT %s", order_filter.params + [SEARCH_RESULT_LIMIT]
 
     def add_order(self):
         selected_customer_index = self.customer_combo.currentIndex()
@@ -682,11 +2168,11 @@ class OrdersTab(QWidget):
             QMessageBox.critical(self, "Error", f"Error adding order: {str(e)}")
 
     def update_order(self):
-        selected_row = self.table.currentRow()
+        selected_row = self.table.currentIndex().row()
         if selected_row < 0:
             QMessageBox.warning(self, "Warning", "Please select an order to update")
             return
-        order_id = self.table.item(selected_row, 0).text()
+        order_id = self.model.value(selected_row, 0)
         selected_customer_index = self.customer_combo.currentIndex()
         if selected_customer_index == 0:
             QMessageBox.warning(self, "Warning", "Please select a customer for the order.")
@@ -711,11 +2197,11 @@ class OrdersTab(QWidget):
             QMessageBox.critical(self, "Error", f"Error updating order: {str(e)}")
 
     def delete_order(self):
-        selected_row = self.table.currentRow()
+        selected_row = self.table.currentIndex().row()
         if selected_row < 0:
             QMessageBox.warning(self, "Warning", "Please select an order to delete")
             return
-        order_id = self.table.item(selected_row, 0).text()
+        order_id = self.model.value(selected_row, 0)
         reply = QMessageBox.question(self, "Delete Order", "Are you sure you want to delete this order?",
                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
@@ -732,12 +2218,33 @@ class OrdersTab(QWidget):
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Error deleting order: {str(e)}")
 
+    def set_checked_status(self):
+        status = self.status_input.text()
+        if not status:
+            QMessageBox.warning(self, "Warning", "Enter the status to set.")
+            return
+        result = apply_to_checked(self, self.db, self.model, "orders", "Set status", lambda keys: [
+            ("UPDATE orders SET status = %s WHERE order_id = ANY(%s)", (status, keys))])
+        if result:
+            self.load_data()
+            QMessageBox.information(self, "Success", f"{result[0]} orders updated.")
+
+    def delete_checked(self):
+        result = apply_to_checked(self, self.db, self.model, "orders", "Delete", lambda keys: [
+            ("DELETE FROM order_items WHERE order_id = ANY(%s)", (keys,)),
+            ("DELETE FROM orders WHERE order_id = ANY(%s)", (keys,)),
+        ], confirm=True)
+        if result:
+            self.load_data()
+            QMessageBox.information(self, "Success", f"{result[0]} orders deleted.")
+            self.clear_inputs()
+
     def add_order_item(self):
-        current_row = self.table.currentRow()
+        current_row = self.table.currentIndex().row()
         if current_row < 0:
             QMessageBox.warning(self, "Warning", "Please select an order to add items to.")
             return
-        order_id = self.table.item(current_row, 0).text()
+        order_id = self.model.value(current_row, 0)
         selected_product_index = self.product_combo.currentIndex()
         if selected_product_index == 0:
             QMessageBox.warning(self, "Warning", "Please select a product.")
@@ -750,11 +2257,12 @@ class OrdersTab(QWidget):
             QMessageBox.warning(self, "Warning", "Quantity and price must be greater than zero.")
             return
         try:
+            # Items carry their order's created_at, which places them in the order's month partition
             query = """
-            INSERT INTO order_items (order_id, product_id, quantity, price)
-            VALUES (%s, %s, %s, %s)
+            INSERT INTO order_items (order_id, product_id, quantity, price, order_created_at)
+            SELECT order_id, %s, %s, %s, created_at FROM orders WHERE order_id = %s
             """
-            self.db.execute_query(query, (order_id, product_id, quantity, price))
+            self.db.execute_query(query, (product_id, quantity, price, order_id))
             self.load_order_items(order_id)
             QMessageBox.information(self, "Success", "Order item added successfully")
         except Exception as e:
@@ -792,12 +2300,12 @@ class OrdersTab(QWidget):
             self.order_items_table.setRowCount(0)
 
     def populate_fields(self):
-        selected_row = self.table.currentRow()
+        selected_row = self.table.currentIndex().row()
         if selected_row >= 0:
-            order_id = self.table.item(selected_row, 0).text()
-            customer_name = self.table.item(selected_row, 1).text()
-            status = self.table.item(selected_row, 2).text()
-            total_amount = float(self.table.item(selected_row, 3).text())
+            order_id = self.model.value(selected_row, 0)
+            customer_name = self.model.display(selected_row, 1)
+            status = self.model.display(selected_row, 2)
+            total_amount = float(self.model.value(selected_row, 3))
             # Set customer combo
             customer_index = self.customer_combo.findText(customer_name)
             if customer_index >= 0:
@@ -809,26 +2317,35 @@ class OrdersTab(QWidget):
             self.load_order_items(order_id)
             self.selected_order_id = order_id
 
-    def import_data(self):
-        file_path, _ = QFileDialog.getOpenFileName(self, "Open JSON", "", "JSON Files (*.json)")
+    def import_data(self, upsert=False):
+        file_path, _ = QFileDialog.getOpenFileName(self, "Open JSON", "", "JSON Files (*.json *.ndjson *.jsonl)")
         if file_path:
-            try:
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
-                for item in data:
-                    query = """
-                    INSERT INTO orders (customer_id, status, total_amount)
-                    VALUES (%s, %s, %s)
-                    """
-                    self.db.execute_query(query, (
-                        item.get("Customer ID", ""),
-                        item.get("Status", ""),
-                        float(item.get("Total Amount", 0))
-                    ))
-                self.load_data()
-                QMessageBox.information(self, "Success", "Orders imported successfully!")
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Error importing orders: {str(e)}")
+            # Records are parsed incrementally inside the worker and fed to COPY batch by batch
+            if upsert:
+                importer = UpsertImporter("orders", ("order_id",) + self.IMPORT_COLUMNS + ("created_at",),
+                                          self.upsert_row, "order_id", self.UPSERT_PREPARE)
+            else:
+                importer = BulkImporter("orders", self.IMPORT_COLUMNS, self.import_row)
+            worker = self.db.submit_task(lambda worker, conn: importer.run(conn, iter_json_records(file_path), worker))
+            self.transfer_progress.start(worker, self.import_finished, "Importing", "Error importing orders",
+                                         cancelled_message="Import cancelled; no orders were changed.")
+
+    @staticmethod
+    def import_row(item):
+        customer_id = item.get("Customer ID")
+        return (
+            int(customer_id) if customer_id not in (None, "") else None,
+            item.get("Status", ""),
+            float(item.get("Total Amount", 0))
+        )
+
+    @classmethod
+    def upsert_row(cls, item):
+        return (import_id(item),) + cls.import_row(item) + (item.get("Created At") or None,)
+
+    def import_finished(self, importer):
+        self.load_data()
+        show_import_report(self, "Orders", importer)
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
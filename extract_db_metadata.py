@@ -1,5 +1,12 @@
+import argparse
+import dataclasses
+import datetime
+import json
+import os
+import sys
+from typing import Dict, List, Optional
+
 import psycopg2
-from psycopg2 import sql
 
 # Database connection parameters
 DB_USER = "admin"
@@ -8,11 +15,15 @@ DB_NAME = "ecommerce_db"
 DB_HOST = "localhost"
 DB_PORT = "5432"
 
+# Snapshots are cached here as <dbname>.json, keyed by the schema fingerprint
+SNAPSHOT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".schema_cache")
+SNAPSHOT_FORMAT = 2
+
 # Function to connect to the database
-def connect_to_db():
+def connect_to_db(dbname=DB_NAME):
     try:
         conn = psycopg2.connect(
-            dbname=DB_NAME,
+            dbname=dbname,
             user=DB_USER,
             password=DB_PASSWORD,
             host=DB_HOST,
@@ -23,82 +34,286 @@ def connect_to_db():
         print(f"Error: {e}")
         return None
 
-# Function to extract schema, tables, and indexes
+@dataclasses.dataclass
+class Column:
+    name: str
+    data_type: str
+    nullable: bool
+    default: Optional[str] = None
+
+@dataclasses.dataclass
+class Constraint:
+    name: str
+    type: str  # primary key, unique, foreign key, check or exclusion
+    columns: List[str]
+    definition: str
+    validated: bool = True
+    referenced_table: Optional[str] = None
+    referenced_columns: List[str] = dataclasses.field(default_factory=list)
+
+@dataclasses.dataclass
+class Index:
+    name: str
+    definition: str
+    method: str
+    columns: List[str]  # key columns in order; expressions as written
+    is_unique: bool
+    is_primary: bool
+    is_valid: bool
+    predicate: Optional[str] = None
+    constraint_name: Optional[str] = None  # set when the index backs a primary key, unique or exclusion constraint
+    size_bytes: int = 0
+
+@dataclasses.dataclass
+class Table:
+    schema: str
+    name: str
+    kind: str  # table or partitioned table
+    row_estimate: int
+    size_bytes: int
+    columns: List[Column]
+    constraints: List[Constraint]
+    indexes: List[Index]
+    partition_key: Optional[str] = None  # e.g. RANGE (created_at), for a partitioned table
+    partitions: Dict[str, str] = dataclasses.field(default_factory=dict)  # partition name -> bound
+
+    @property
+    def qualified_name(self):
+        return f"{self.schema}.{self.name}"
+
+    def column(self, name):
+        return next((column for column in self.columns if column.name == name), None)
+
+    def foreign_keys(self):
+        return [constraint for constraint in self.constraints if constraint.type == "foreign key"]
+
+@dataclasses.dataclass
+class SchemaSnapshot:
+    database: str
+    server_version: int
+    fingerprint: str
+    extracted_at: str
+    schemas: List[str]
+    tables: Dict[str, Table]  # keyed by schema-qualified name
+
+    # Look a table up by qualified or, for the public schema, bare name
+    def table(self, name):
+        return self.tables.get(name) or self.tables.get(f"public.{name}")
+
+    def to_dict(self):
+        return dict(dataclasses.asdict(self), format=SNAPSHOT_FORMAT)
+
+    @classmethod
+    def from_dict(cls, data):
+        tables = {}
+        for key, table in data["tables"].items():
+            tables[key] = Table(**dict(
+                table,
+                columns=[Column(**column) for column in table["columns"]],
+                constraints=[Constraint(**constraint) for constraint in table["constraints"]],
+                indexes=[Index(**index) for index in table["indexes"]],
+            ))
+        return cls(data["database"], data["server_version"], data["fingerprint"], data["extracted_at"],
+                   data["schemas"], tables)
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=1)
+        # Readers never see a half-written cache
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"{path} has snapshot format {data.get('format')}, expected {SNAPSHOT_FORMAT}")
+        return cls.from_dict(data)
+
+USER_NAMESPACES = "n.nspname NOT LIKE 'pg\\_%' AND n.nspname <> 'information_schema'"
+
+# Any DDL rewrites at least one of these catalog rows and so changes its xmin. VACUUM and ANALYZE
+# update pg_class statistics in place, which leaves the fingerprint (and cached row estimates) alone.
+FINGERPRINT_QUERY = f"""
+    SELECT md5(string_agg(entry, ',' ORDER BY entry)) FROM (
+        SELECT 'n' || n.oid || ':' || n.xmin FROM pg_namespace n WHERE {USER_NAMESPACES}
+        UNION ALL
+        SELECT 'c' || c.oid || ':' || c.xmin
+        FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace WHERE {USER_NAMESPACES}
+        UNION ALL
+        SELECT 'a' || a.attrelid || '.' || a.attnum || ':' || a.xmin
+        FROM pg_attribute a JOIN pg_class c ON c.oid = a.attrelid JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE {USER_NAMESPACES} AND a.attnum > 0
+        UNION ALL
+        SELECT 'd' || d.oid || ':' || d.xmin
+        FROM pg_attrdef d JOIN pg_class c ON c.oid = d.adrelid JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE {USER_NAMESPACES}
+        UNION ALL
+        SELECT 'o' || con.oid || ':' || con.xmin
+        FROM pg_constraint con JOIN pg_namespace n ON n.oid = con.connamespace WHERE {USER_NAMESPACES}
+        UNION ALL
+        SELECT 'i' || i.indexrelid || ':' || i.xmin
+        FROM pg_index i JOIN pg_class c ON c.oid = i.indrelid JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE {USER_NAMESPACES}
+    ) AS catalog(entry)
+"""
+
+# The whole snapshot as one JSON document, built in a single round trip
+SNAPSHOT_QUERY = f"""
+    SELECT json_build_object(
+        'schemas', (SELECT COALESCE(json_agg(n.nspname ORDER BY n.nspname), '[]') FROM pg_namespace n
+                    WHERE {USER_NAMESPACES}),
+        'tables', (SELECT COALESCE(json_agg(t ORDER BY t.schema, t.name), '[]') FROM (
+            SELECT n.nspname AS schema, c.relname AS name,
+                   CASE c.relkind WHEN 'p' THEN 'partitioned table' ELSE 'table' END AS kind,
+                   -- A partitioned table holds no rows itself; never analyzed partitions count as empty
+                   CASE WHEN c.relkind = 'p'
+                        THEN (SELECT COALESCE(sum(GREATEST(pc.reltuples, 0)), 0) FROM pg_inherits inh
+                              JOIN pg_class pc ON pc.oid = inh.inhrelid WHERE inh.inhparent = c.oid)
+                        ELSE GREATEST(c.reltuples, 0) END::bigint AS row_estimate,
+                   pg_total_relation_size(c.oid) AS size_bytes,
+                   (SELECT COALESCE(json_agg(json_build_object(
+                               'name', a.attname,
+                               'data_type', format_type(a.atttypid, a.atttypmod),
+                               'nullable', NOT a.attnotnull,
+                               'default', pg_get_expr(d.adbin, d.adrelid)) ORDER BY a.attnum), '[]')
+                    FROM pg_attribute a
+                    LEFT JOIN pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+                    WHERE a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped) AS columns,
+                   (SELECT COALESCE(json_agg(json_build_object(
+                               'name', con.conname,
+                               'type', CASE con.contype WHEN 'p' THEN 'primary key' WHEN 'u' THEN 'unique'
+                                       WHEN 'f' THEN 'foreign key' WHEN 'c' THEN 'check'
+                                       WHEN 'x' THEN 'exclusion' ELSE con.contype::text END,
+                               'columns', ARRAY(SELECT a.attname FROM unnest(con.conkey) WITH ORDINALITY AS k(attnum, ord)
+                                                JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.attnum
+                                                ORDER BY k.ord),
+                               'definition', pg_get_constraintdef(con.oid),
+                               'validated', con.convalidated,
+                               'referenced_table', CASE WHEN con.confrelid <> 0
+                                                   THEN con.confrelid::regclass::text END,
+                               'referenced_columns', ARRAY(SELECT a.attname
+                                                FROM unnest(con.confkey) WITH ORDINALITY AS k(attnum, ord)
+                                                JOIN pg_attribute a ON a.attrelid = con.confrelid AND a.attnum = k.attnum
+                                                ORDER BY k.ord)) ORDER BY con.conname), '[]')
+                    -- Clones of a foreign key referencing a partitioned table (one per partition) are left out
+                    FROM pg_constraint con WHERE con.conrelid = c.oid AND con.conparentid = 0) AS constraints,
+                   (SELECT COALESCE(json_agg(json_build_object(
+                               'name', ic.relname,
+                               'definition', pg_get_indexdef(i.indexrelid),
+                               'method', am.amname,
+                               'columns', ARRAY(SELECT pg_get_indexdef(i.indexrelid, k, true)
+                                                FROM generate_series(1, i.indnkeyatts) AS k ORDER BY k),
+                               'is_unique', i.indisunique,
+                               'is_primary', i.indisprimary,
+                               'is_valid', i.indisvalid,
+                               'predicate', pg_get_expr(i.indpred, i.indrelid),
+                               'constraint_name', (SELECT con.conname FROM pg_constraint con
+                                                   WHERE con.conindid = i.indexrelid AND con.contype IN ('p', 'u', 'x')
+                                                   LIMIT 1),
+                               'size_bytes', pg_relation_size(i.indexrelid)) ORDER BY ic.relname), '[]')
+                    FROM pg_index i
+                    JOIN pg_class ic ON ic.oid = i.indexrelid
+                    JOIN pg_am am ON am.oid = ic.relam
+                    WHERE i.indrelid = c.oid) AS indexes,
+                   CASE WHEN c.relkind = 'p' THEN pg_get_partkeydef(c.oid) END AS partition_key,
+                   (SELECT COALESCE(json_object_agg(pc.relname, pg_get_expr(pc.relpartbound, pc.oid) ORDER BY pc.relname), '{{}}')
+                    FROM pg_inherits inh JOIN pg_class pc ON pc.oid = inh.inhrelid
+                    WHERE inh.inhparent = c.oid) AS partitions
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE c.relkind IN ('r', 'p') AND NOT c.relispartition AND {USER_NAMESPACES}
+        ) AS t),
+        'fingerprint', ({FINGERPRINT_QUERY})
+    )
+"""
+
+def schema_fingerprint(conn):
+    with conn.cursor() as cur:
+        cur.execute(FINGERPRINT_QUERY)
+        fingerprint = cur.fetchone()[0]
+    conn.rollback()
+    return fingerprint
+
+# Function to extract the schema of every user table as a SchemaSnapshot
 def extract_db_metadata(conn):
-    metadata = {
-        'schemas': [],
-        'tables': {},
-        'indexes': {}
-    }
+    with conn.cursor() as cur:
+        cur.execute(SNAPSHOT_QUERY)
+        data = cur.fetchone()[0]
+    conn.rollback()
+    tables = {}
+    for table in data["tables"]:
+        table = Table(
+            schema=table["schema"],
+            name=table["name"],
+            kind=table["kind"],
+            row_estimate=table["row_estimate"],
+            size_bytes=table["size_bytes"],
+            columns=[Column(**column) for column in table["columns"]],
+            constraints=[Constraint(**constraint) for constraint in table["constraints"]],
+            indexes=[Index(**index) for index in table["indexes"]],
+            partition_key=table["partition_key"],
+            partitions=table["partitions"],
+        )
+        tables[table.qualified_name] = table
+    return SchemaSnapshot(conn.info.dbname, conn.server_version, data["fingerprint"],
+                          datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+                          data["schemas"], tables)
 
-    try:
-        with conn.cursor() as cur:
-            # Extract schemas
-            cur.execute("SELECT schema_name FROM information_schema.schemata;")
-            schemas = cur.fetchall()
-            metadata['schemas'] = [schema[0] for schema in schemas]
-
-            # Extract tables and their columns
-            for schema in metadata['schemas']:
-                cur.execute(sql.SQL("""
-                    SELECT table_name, column_name, data_type, is_nullable
-                    FROM information_schema.columns
-                    WHERE table_schema = %s;
-                """), [schema])
-                tables = cur.fetchall()
-                for table in tables:
-                    table_name = table[0]
-                    column_name = table[1]
-                    data_type = table[2]
-                    is_nullable = table[3]
-
-                    if table_name not in metadata['tables']:
-                        metadata['tables'][table_name] = {'columns': []}
-
-                    metadata['tables'][table_name]['columns'].append({
-                        'column_name': column_name,
-                        'data_type': data_type,
-                        'is_nullable': is_nullable
-                    })
-
-            # Extract indexes
-            cur.execute("""
-                SELECT schemaname, tablename, indexname, indexdef
-                FROM pg_indexes
-                WHERE schemaname NOT LIKE 'pg_%';
-            """)
-            indexes = cur.fetchall()
-            for index in indexes:
-                schema_name = index[0]
-                table_name = index[1]
-                index_name = index[2]
-                index_def = index[3]
-
-                if table_name not in metadata['indexes']:
-                    metadata['indexes'][table_name] = []
-
-                metadata['indexes'][table_name].append({
-                    'index_name': index_name,
-                    'index_definition': index_def
-                })
+# Databases of the same name on different servers get their own cache file
+def snapshot_cache_path(conn):
+    host = conn.info.host.strip("/").replace("/", "_")
+    return os.path.join(SNAPSHOT_CACHE_DIR, f"{host}_{conn.info.port}_{conn.info.dbname}.json")
 
-    except Exception as e:
-        print(f"Error: {e}")
-    finally:
-        return metadata
+# Return the cached snapshot when its fingerprint still matches the database, otherwise re-extract
+# and refresh the cache. Only the cheap fingerprint query runs when nothing changed.
+def load_snapshot(conn, cache_path=None, refresh=False):
+    cache_path = cache_path or snapshot_cache_path(conn)
+    if not refresh and os.path.exists(cache_path):
+        try:
+            cached = SchemaSnapshot.load(cache_path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Ignoring unreadable schema cache {cache_path}: {e}", file=sys.stderr)
+        else:
+            if cached.fingerprint == schema_fingerprint(conn):
+                return cached
+    snapshot = extract_db_metadata(conn)
+    try:
+        snapshot.save(cache_path)
+    except OSError as e:
+        print(f"Could not write schema cache {cache_path}: {e}", file=sys.stderr)
+    return snapshot
 
 # Main function
 def main():
-    conn = connect_to_db()
+    parser = argparse.ArgumentParser(description="Extract a schema snapshot of the database.")
+    parser.add_argument("--dbname", default=DB_NAME)
+    parser.add_argument("--json", action="store_true", help="print the full snapshot as JSON")
+    parser.add_argument("--refresh", action="store_true", help="ignore the cached snapshot")
+    args = parser.parse_args()
+
+    conn = connect_to_db(args.dbname)
     if conn:
-        metadata = extract_db_metadata(conn)
-        conn.close()
+        try:
+            snapshot = load_snapshot(conn, refresh=args.refresh)
+        finally:
+            conn.close()
 
-        # Print or process the metadata as needed
-        print("Schemas:", metadata['schemas'])
-        print("Tables:", metadata['tables'])
-        print("Indexes:", metadata['indexes'])
+        if args.json:
+            print(json.dumps(snapshot.to_dict(), indent=1))
+            return
+        print(f"Schemas: {', '.join(snapshot.schemas)}  (fingerprint {snapshot.fingerprint}, {snapshot.extracted_at})")
+        for table in snapshot.tables.values():
+            print(f"\n{table.qualified_name}  ~{table.row_estimate} rows")
+            for column in table.columns:
+                print(f"  {column.name} {column.data_type}{'' if column.nullable else ' NOT NULL'}"
+                      f"{f' DEFAULT {column.default}' if column.default else ''}")
+            for constraint in table.constraints:
+                print(f"  CONSTRAINT {constraint.name} {constraint.definition}")
+            for index in table.indexes:
+                print(f"  {index.definition}")
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,232 @@
+# Index advisor for the e-commerce database
+# pip install psycopg2-binary
+#
+# Usage: python index_advisor.py              full report with suggested DDL
+#        python index_advisor.py --ddl-only   only the DDL, ready to save as migrations/NNN_name.sql
+#
+# Combines the cached schema snapshot from extract_db_metadata with pg_stat_user_indexes,
+# pg_stat_user_tables and, when the extension is installed, pg_stat_statements, to report:
+#   - foreign keys without an index on their columns
+#   - duplicate and redundant (left-prefix) indexes
+#   - indexes never scanned since statistics were last reset
+#   - tables read mostly by sequential scans
+# Index usage statistics are per server and reset on restart or pg_stat_reset(); check the reported
+# reset time, and replicas, before dropping an "unused" index.
+import argparse
+
+from extract_db_metadata import DB_NAME, connect_to_db, load_snapshot
+
+# Tables smaller than this are cheap to scan; their missing indexes and seq scans are not reported
+MIN_TABLE_ROWS = 1000
+TOP_N = 10
+
+def fetch_all(conn, query, params=None):
+    with conn.cursor() as cur:
+        cur.execute(query, params)
+        return cur.fetchall()
+
+def table_stats(conn):
+    rows = fetch_all(conn, """
+        SELECT schemaname || '.' || relname, seq_scan, seq_tup_read, COALESCE(idx_scan, 0), n_live_tup,
+               pg_total_relation_size(relid)
+        FROM pg_stat_user_tables
+    """)
+    return {row[0]: {'seq_scan': row[1], 'seq_tup_read': row[2], 'idx_scan': row[3], 'live_rows': row[4],
+                     'total_bytes': row[5]} for row in rows}
+
+def index_scans(conn):
+    return dict(fetch_all(conn, "SELECT schemaname || '.' || indexrelname, idx_scan FROM pg_stat_user_indexes"))
+
+def stats_reset(conn):
+    rows = fetch_all(conn, "SELECT stats_reset FROM pg_stat_database WHERE datname = current_database()")
+    return rows[0][0] if rows else None
+
+# Top statements by total execution time, or an empty list when pg_stat_statements is not installed
+def top_statements(conn, limit):
+    if not fetch_all(conn, "SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'"):
+        return []
+    # The timing columns were renamed in PostgreSQL 13
+    column = "total_exec_time" if conn.server_version >= 130000 else "total_time"
+    try:
+        return fetch_all(conn, f"""
+            SELECT query, calls, {column}, {column} / GREATEST(calls, 1), rows, shared_blks_read
+            FROM pg_stat_statements
+            WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+            ORDER BY {column} DESC
+            LIMIT %s
+        """, (limit,))
+    except Exception as e:
+        # The extension can be created without being in shared_preload_libraries
+        conn.rollback()
+        print(f"pg_stat_statements is not readable: {e}")
+        return []
+
+def index_name_for(table, columns):
+    return f"idx_{table}_{'_'.join(columns)}"[:63]
+
+# An index supports a foreign key when its leading key columns are exactly the key's columns
+def supports(index, columns):
+    leading = index.columns[:len(columns)]
+    return index.method == 'btree' and index.is_valid and not index.predicate and sorted(leading) == sorted(columns)
+
+def missing_fk_indexes(snapshot, stats):
+    missing = []
+    for table in snapshot.tables.values():
+        for fk in table.foreign_keys():
+            if not any(supports(index, fk.columns) for index in table.indexes):
+                # A partitioned table has no statistics of its own; its estimate sums the partitions
+                rows = table.row_estimate if table.kind == "partitioned table" else \
+                    stats.get(table.qualified_name, {}).get('live_rows', table.row_estimate)
+                missing.append((table, fk, rows))
+    return sorted(missing, key=lambda item: -item[2])
+
+def droppable(index):
+    return index.constraint_name is None
+
+def keep_rank(index):
+    return (not droppable(index), index.is_unique)
+
+# Identical indexes, and plain btree indexes whose columns are a left prefix of another btree index
+def duplicate_indexes(snapshot):
+    findings = []
+    for table in snapshot.tables.values():
+        for index in table.indexes:
+            if not droppable(index):
+                continue
+            for other in table.indexes:
+                # An invalid index serves no queries, so it cannot stand in for the one reported
+                if other is index or not other.is_valid or other.method != index.method or other.predicate != index.predicate:
+                    continue
+                if other.columns == index.columns:
+                    # Of two identical indexes, keep a constraint's over a unique one over a plain one,
+                    # and otherwise the first by name
+                    if keep_rank(other) < keep_rank(index) or (keep_rank(other) == keep_rank(index) and other.name > index.name):
+                        continue
+                    findings.append((table, index, other, "duplicate of"))
+                    break
+                if index.method == 'btree' and not index.is_unique and other.columns[:len(index.columns)] == index.columns:
+                    findings.append((table, index, other, "left prefix of"))
+                    break
+    return findings
+
+def unused_indexes(snapshot, scans):
+    unused = []
+    for table in snapshot.tables.values():
+        for index in table.indexes:
+            if droppable(index) and not index.is_unique and scans.get(f"{table.schema}.{index.name}") == 0:
+                unused.append((table, index))
+    return sorted(unused, key=lambda item: -item[1].size_bytes)
+
+def seq_scan_tables(stats, limit):
+    tables = [(table, s) for table, s in stats.items() if s['seq_scan'] and s['live_rows'] >= MIN_TABLE_ROWS]
+    return sorted(tables, key=lambda item: -item[1]['seq_tup_read'])[:limit]
+
+# A partitioned table cannot be indexed concurrently. As in MigrationContext.create_partitioned_index,
+# its index is created empty with ON ONLY, each partition is indexed concurrently and attached, and the
+# parent index turns valid once all are.
+def create_index_ddl(table, name, columns):
+    column_list = ", ".join(columns)
+    if table.kind != "partitioned table":
+        return [f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table.qualified_name} ({column_list});"]
+    ddl = [f"CREATE INDEX IF NOT EXISTS {name} ON ONLY {table.qualified_name} ({column_list});"]
+    for partition in table.partitions:
+        partition_index = f"{partition}_{'_'.join(columns)}_idx"[:63]
+        ddl.append(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition_index} "
+                   f"ON {table.schema}.{partition} ({column_list});")
+        ddl.append(f"ALTER INDEX {table.schema}.{name} ATTACH PARTITION {table.schema}.{partition_index};")
+    return ddl
+
+# Nor can an index on a partitioned table be dropped concurrently; dropping it locks each partition briefly
+def drop_index_ddl(table, index):
+    concurrently = "" if table.kind == "partitioned table" else "CONCURRENTLY "
+    return f"DROP INDEX {concurrently}IF EXISTS {table.schema}.{index.name};"
+
+def size(num_bytes):
+    for unit in ("B", "kB", "MB", "GB"):
+        if num_bytes < 1024:
+            return f"{num_bytes:.0f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} TB"
+
+def main():
+    parser = argparse.ArgumentParser(description="Suggest index changes from schema metadata and usage statistics.")
+    parser.add_argument("--dbname", default=DB_NAME)
+    parser.add_argument("--ddl-only", action="store_true", help="print only the suggested DDL")
+    parser.add_argument("--top", type=int, default=TOP_N, help="tables and statements to list")
+    parser.add_argument("--include-unused", action="store_true", help="also emit DROP statements for unused indexes")
+    args = parser.parse_args()
+
+    conn = connect_to_db(args.dbname)
+    if not conn:
+        return
+    try:
+        snapshot = load_snapshot(conn)
+        stats = table_stats(conn)
+        scans = index_scans(conn)
+        reset = stats_reset(conn)
+        statements = top_statements(conn, args.top)
+    finally:
+        conn.close()
+
+    missing = [item for item in missing_fk_indexes(snapshot, stats) if item[2] >= MIN_TABLE_ROWS]
+    duplicates = duplicate_indexes(snapshot)
+    unused = unused_indexes(snapshot, scans)
+    ddl = []
+    for table, fk, _ in missing:
+        ddl.extend(create_index_ddl(table, index_name_for(table.name, fk.columns), fk.columns))
+    dropped = set()
+    for table, index, _, _ in duplicates:
+        dropped.add(index.name)
+        ddl.append(drop_index_ddl(table, index))
+    if args.include_unused:
+        for table, index in unused:
+            if index.name not in dropped:
+                ddl.append(drop_index_ddl(table, index))
+
+    if args.ddl_only:
+        if ddl:
+            print("-- migrate:no-transaction")
+            print("\n".join(ddl))
+        return
+
+    print("Foreign keys without a supporting index:")
+    for table, fk, rows in missing:
+        print(f"  {table.name}({', '.join(fk.columns)}) -> {fk.referenced_table}  [{fk.name}, ~{rows} rows]")
+        for statement in statements:
+            if any(column in statement[0] for column in fk.columns):
+                print(f"    used by: {' '.join(statement[0].split())[:100]}")
+    if not missing:
+        print("  none")
+
+    print("\nDuplicate and redundant indexes:")
+    for table, index, other, relation in duplicates:
+        print(f"  {table.name}.{index.name} ({', '.join(index.columns)}) is {relation} "
+              f"{other.name} ({', '.join(other.columns)}); {size(index.size_bytes)}")
+    if not duplicates:
+        print("  none")
+
+    print(f"\nIndexes never scanned since {reset or 'statistics were last reset'}:")
+    for table, index in unused:
+        print(f"  {table.name}.{index.name} ({', '.join(index.columns)}); {size(index.size_bytes)}")
+    if not unused:
+        print("  none")
+
+    print("\nTables with the most rows read by sequential scans:")
+    for table, s in seq_scan_tables(stats, args.top):
+        print(f"  {table}: {s['seq_scan']} seq scans reading {s['seq_tup_read']} rows, {s['idx_scan']} index scans, "
+              f"~{s['live_rows']} rows, {size(s['total_bytes'])}")
+
+    if statements:
+        print("\nTop statements by total execution time:")
+        for query, calls, total_ms, mean_ms, rows, blocks_read in statements:
+            print(f"  {total_ms:10.0f} ms  {calls:8} calls  {mean_ms:8.2f} ms/call  {rows:9} rows  "
+                  f"{' '.join(query.split())[:100]}")
+    else:
+        print("\npg_stat_statements is not installed; add it to shared_preload_libraries and run "
+              "CREATE EXTENSION pg_stat_statements for per-query timings.")
+
+    print("\nSuggested DDL:")
+    print("\n".join(f"  {statement}" for statement in ddl) if ddl else "  none")
+
+if __name__ == "__main__":
+    main()
@@ -1,49 +1,23 @@
+// Schema migrations are owned by migrate.py, which applies migrations/NNN_name.sql|py and records
+// them in schema_migrations. `npm run migrate` hands off to it; the SQL files that used to live next
+// to this script were superseded by migrations/001-006.
 import dotenv from 'dotenv';
 import path from 'path';
+import { spawnSync } from 'child_process';
 
 const envPath = path.resolve(process.cwd(), '.env.local');
 console.log('Loading environment variables from:', envPath);
 dotenv.config({ path: envPath });
 
-console.log('Environment variables:', {
-  DB_USER: process.env.DB_USER,
-  DB_HOST: process.env.DB_HOST,
-  DB_PASSWORD: process.env.DB_PASSWORD ? '*****' : undefined,
-  DB_PORT: process.env.DB_PORT
-});
-
-import { db } from '../db.js';
-import fs from 'fs';
-
-async function runMigrations() {
-  try {
-    const migrationDir = new URL('.', import.meta.url).pathname;
-    const migrationFiles = fs.readdirSync(migrationDir)
-      .filter((file: string) => file.endsWith('.sql'))
-      .sort();
-
-    for (const file of migrationFiles) {
-      const filePath = path.join(migrationDir, file);
-      const sql = fs.readFileSync(filePath, 'utf8');
-      
-      console.log(`Running migration: ${file}`);
-      try {
-        await db.query(sql);
-        console.log(`Migration ${file} completed successfully`);
-      } catch (error: any) {
-        if (error.code === '42P07') { // Table already exists
-          console.log(`Migration ${file} skipped (table already exists)`);
-          continue;
-        }
-        throw error;
-      }
-    }
-  } catch (error) {
-    console.error('Migration failed:', error);
-    process.exit(1);
-  } finally {
-    process.exit(0);
-  }
+// Extra arguments are passed through, e.g. `npm run migrate -- --status`
+const args = [path.resolve(process.cwd(), 'migrate.py'), ...process.argv.slice(2)];
+if (process.env.DB_NAME && !args.includes('--dbname')) {
+  args.push('--dbname', process.env.DB_NAME);
 }
 
-runMigrations();
\ No newline at end of file
+const result = spawnSync(process.env.PYTHON || 'python3', args, { stdio: 'inherit' });
+if (result.error) {
+  console.error('Migration failed:', result.error);
+  process.exit(1);
+}
+process.exit(result.status ?? 1);
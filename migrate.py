@@ -0,0 +1,476 @@
+# Versioned schema migrations for the e-commerce database
+# pip install psycopg2-binary
+#
+# Usage: python migrate.py                 apply every pending migration in migrations/
+#        python migrate.py --dry-run       list what would be applied without touching the schema
+#        python migrate.py --status        show applied and pending migrations
+#        python migrate.py --create-database --dbname ecommerce_test
+#        python migrate.py --online        apply against a live database without stalling writes
+#
+# Migrations are migrations/NNN_name.sql files applied in version order, each in its own transaction,
+# and recorded in schema_migrations with a checksum. Editing an applied migration is an error:
+# add a new one instead.
+#
+# This is the only runner for the schema: `npm run migrate` (lib/migrations/migrate.ts) and
+# POST /api/migrations hand off to it. The SQL files the old runner applied are covered by 001-006;
+# it kept no record of what it ran, so there is no history to import.
+#
+# A SQL migration whose header contains "-- migrate:no-transaction" runs statement by statement in
+# autocommit, which CREATE INDEX CONCURRENTLY requires. A migrations/NNN_name.py file defines
+# upgrade(ctx) and uses MigrationContext helpers (create_index, add_foreign_key, backfill, ...) that
+# avoid long write-blocking locks; it also runs outside a transaction, so it must be safe to re-run.
+#
+# With --online every statement that needs a write-blocking lock runs under lock_timeout and is
+# retried with backoff, so a migration queued behind a long transaction gives way to the storefront
+# instead of blocking every write that queues up behind it.
+import argparse
+import collections
+import hashlib
+import importlib.util
+import os
+import re
+import sys
+import time
+
+import psycopg2
+from psycopg2 import errors, sql
+
+# Database connection details
+DB_NAME = "ecommerce_db"
+DB_USER = "admin"
+DB_PASSWORD = "admin123"
+DB_HOST = "localhost"
+DB_PORT = "5432"
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+MIGRATION_FILE = re.compile(r"^(\d+)_(\w+)\.(sql|py)$")
+NO_TRANSACTION = re.compile(r"^--\s*migrate:no-transaction\s*$", re.MULTILINE)
+# Statements that wait without blocking writes, so they run without lock_timeout
+NON_BLOCKING_DDL = re.compile(r"\bCONCURRENTLY\b|\bVALIDATE\s+CONSTRAINT\b", re.IGNORECASE)
+# Key of the advisory lock that keeps two runners from migrating the same database at once
+MIGRATION_LOCK_KEY = 4250716
+
+# Online mode defaults
+LOCK_TIMEOUT_MS = 2000
+LOCK_RETRIES = 10
+RETRY_DELAY_SECONDS = 0.5
+MAX_RETRY_DELAY_SECONDS = 30
+BACKFILL_BATCH_SIZE = 5000
+
+# kind is "sql", "sql-no-transaction" or "python"
+Migration = collections.namedtuple("Migration", "version name path checksum sql kind")
+
+class MigrationError(Exception):
+    pass
+
+def connect_to_db(dbname=DB_NAME):
+    return psycopg2.connect(
+        dbname=dbname,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        host=DB_HOST,
+        port=DB_PORT
+    )
+
+# Create the database itself, for fresh test and staging environments
+def create_database(dbname):
+    conn = connect_to_db("postgres")
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_database WHERE datname = %s", (dbname,))
+            if cursor.fetchone() is None:
+                cursor.execute(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(dbname)))
+                print(f"Database '{dbname}' created")
+    finally:
+        conn.close()
+
+def checksum(text):
+    return hashlib.sha256(text.replace("\r\n", "\n").encode("utf-8")).hexdigest()
+
+def load_migrations(directory=MIGRATIONS_DIR):
+    migrations = {}
+    for file_name in sorted(os.listdir(directory)):
+        match = MIGRATION_FILE.match(file_name)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise MigrationError(f"Duplicate migration version {version}: {file_name} and {migrations[version].path}")
+        path = os.path.join(directory, file_name)
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        if match.group(3) == "py":
+            kind = "python"
+        elif NO_TRANSACTION.search(text):
+            kind = "sql-no-transaction"
+        else:
+            kind = "sql"
+        migrations[version] = Migration(version, match.group(2), path, checksum(text), text, kind)
+    return [migrations[version] for version in sorted(migrations)]
+
+# Split a SQL script into statements, respecting quotes, comments and dollar-quoted bodies
+def split_statements(text):
+    statements = []
+    start = 0
+    i = 0
+    length = len(text)
+    while i < length:
+        char = text[i]
+        if char == "'" or char == '"':
+            i = text.find(char, i + 1)
+            # A doubled quote is an escaped quote; keep scanning past it
+            while i != -1 and text.startswith(char, i + 1):
+                i = text.find(char, i + 2)
+            i = length if i == -1 else i + 1
+        elif text.startswith("--", i):
+            i = text.find("\n", i)
+            i = length if i == -1 else i + 1
+        elif text.startswith("/*", i):
+            i = text.find("*/", i + 2)
+            i = length if i == -1 else i + 2
+        elif char == "$":
+            tag = re.match(r"\$(?:[A-Za-z_][A-Za-z_0-9]*)?\$", text[i:])
+            if tag:
+                i = text.find(tag.group(0), i + len(tag.group(0)))
+                i = length if i == -1 else i + len(tag.group(0))
+            else:
+                i += 1
+        elif char == ";":
+            statements.append(text[start:i])
+            i += 1
+            start = i
+        else:
+            i += 1
+    statements.append(text[start:])
+    return [s.strip() for s in statements if strip_comments(s).strip()]
+
+def strip_comments(statement):
+    return re.sub(r"--[^\n]*|/\*.*?\*/", "", statement, flags=re.DOTALL)
+
+def retry_delay(attempt):
+    return min(RETRY_DELAY_SECONDS * 2 ** attempt, MAX_RETRY_DELAY_SECONDS)
+
+# Runs migration steps on an autocommit connection; every helper is a no-op when already applied.
+# Statements that take a write-blocking lock run under lock_timeout in online mode and are retried;
+# statements that only block other DDL (concurrent index builds, constraint validation) may wait freely.
+class MigrationContext:
+    def __init__(self, conn, online=False, lock_timeout_ms=LOCK_TIMEOUT_MS, retries=LOCK_RETRIES):
+        self.conn = conn
+        self.online = online
+        self.lock_timeout_ms = lock_timeout_ms
+        self.retries = retries if online else 0
+
+    def execute(self, statement, params=None, blocking=True, fetch=False):
+        for attempt in range(self.retries + 1):
+            try:
+                with self.conn.cursor() as cursor:
+                    timeout = self.lock_timeout_ms if self.online and blocking else 0
+                    cursor.execute("SELECT set_config('lock_timeout', %s, false)", (f"{timeout}ms",))
+                    cursor.execute(statement, params)
+                    return cursor.fetchall() if fetch else cursor.rowcount
+            except errors.LockNotAvailable:
+                if attempt == self.retries:
+                    raise
+                delay = retry_delay(attempt)
+                print(f"  lock timeout, retrying in {delay:.1f}s ({attempt + 1}/{self.retries})")
+                time.sleep(delay)
+
+    def query(self, statement, params=None):
+        with self.conn.cursor() as cursor:
+            cursor.execute(statement, params)
+            return cursor.fetchall()
+
+    def column_exists(self, table, column):
+        return bool(self.query("SELECT 1 FROM pg_attribute WHERE attrelid = to_regclass(%s) AND attname = %s "
+                               "AND NOT attisdropped", (table, column)))
+
+    def constraint_exists(self, table, name):
+        return bool(self.query("SELECT 1 FROM pg_constraint WHERE conrelid = to_regclass(%s) AND conname = %s",
+                               (table, name)))
+
+    # Adding a nullable column or one with a constant default only rewrites the catalog
+    def add_column(self, table, column, definition):
+        if not self.column_exists(table, column):
+            self.execute(sql.SQL("ALTER TABLE {} ADD COLUMN IF NOT EXISTS {} ").format(
+                sql.Identifier(table), sql.Identifier(column)) + sql.SQL(definition))
+
+    def is_partitioned(self, table):
+        return bool(self.query("SELECT 1 FROM pg_class WHERE oid = to_regclass(%s) AND relkind = 'p'", (table,)))
+
+    # using is the index method (btree by default) and opclass an operator class for every column
+    def index_statement(self, name, table, columns, unique=False, where=None, concurrently=True, only=False,
+                        using=None, opclass=None):
+        statement = sql.SQL("CREATE {}INDEX {}IF NOT EXISTS {} ON {}{} {}({})").format(
+            sql.SQL("UNIQUE " if unique else ""), sql.SQL("CONCURRENTLY " if concurrently else ""),
+            sql.Identifier(name), sql.SQL("ONLY " if only else ""), sql.Identifier(table),
+            sql.SQL(f"USING {using} " if using else ""),
+            sql.SQL(", ").join(sql.Identifier(column) + sql.SQL(f" {opclass}" if opclass else "") for column in columns))
+        if where:
+            statement += sql.SQL(" WHERE ") + sql.SQL(where)
+        return statement
+
+    # CREATE INDEX CONCURRENTLY lets writes continue during the build; a build that failed part way
+    # leaves an INVALID index behind, which is dropped and rebuilt
+    def create_index(self, name, table, columns, unique=False, where=None, using=None, opclass=None):
+        if self.is_partitioned(table):
+            self.create_partitioned_index(name, table, columns, unique, where, using, opclass)
+            return
+        rows = self.query("SELECT i.indisvalid FROM pg_index i WHERE i.indexrelid = to_regclass(%s)", (name,))
+        if rows and rows[0][0]:
+            return
+        if rows:
+            self.execute(sql.SQL("DROP INDEX CONCURRENTLY IF EXISTS {}").format(sql.Identifier(name)), blocking=False)
+        self.execute(self.index_statement(name, table, columns, unique, where, using=using, opclass=opclass),
+                     blocking=False)
+
+    # A partitioned table cannot be indexed concurrently. Its index is created empty with ON ONLY, each
+    # partition is indexed concurrently and attached, and the parent index turns valid once all are.
+    # Partitions created later get the index automatically.
+    def create_partitioned_index(self, name, table, columns, unique=False, where=None, using=None, opclass=None):
+        self.execute(self.index_statement(name, table, columns, unique, where, concurrently=False, only=True,
+                                          using=using, opclass=opclass))
+        for (partition,) in self.query("""
+            SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(%s) ORDER BY c.relname
+        """, (table,)):
+            partition_index = f"{partition}_{'_'.join(columns)}_idx"[:63]
+            self.create_index(partition_index, partition, columns, unique, where, using, opclass)
+            if not self.query("SELECT 1 FROM pg_inherits WHERE inhrelid = to_regclass(%s) AND inhparent = to_regclass(%s)",
+                              (partition_index, name)):
+                self.execute(sql.SQL("ALTER INDEX {} ATTACH PARTITION {}").format(
+                    sql.Identifier(name), sql.Identifier(partition_index)))
+
+    # An index on a partitioned table cannot be dropped concurrently; dropping it locks each partition briefly
+    def drop_index(self, name):
+        rows = self.query("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (name,))
+        if not rows:
+            return
+        if rows[0][0] == "I":
+            self.execute(sql.SQL("DROP INDEX IF EXISTS {}").format(sql.Identifier(name)))
+        else:
+            self.execute(sql.SQL("DROP INDEX CONCURRENTLY IF EXISTS {}").format(sql.Identifier(name)), blocking=False)
+
+    # NOT VALID only checks new rows, so the ALTER holds its lock briefly; VALIDATE then scans the
+    # existing rows under a lock that still allows reads and writes
+    def add_foreign_key(self, table, name, columns, ref_table, ref_columns, on_delete=None):
+        if not self.constraint_exists(table, name):
+            statement = sql.SQL("ALTER TABLE {} ADD CONSTRAINT {} FOREIGN KEY ({}) REFERENCES {} ({})").format(
+                sql.Identifier(table), sql.Identifier(name),
+                sql.SQL(", ").join(sql.Identifier(column) for column in columns), sql.Identifier(ref_table),
+                sql.SQL(", ").join(sql.Identifier(column) for column in ref_columns))
+            if on_delete:
+                statement += sql.SQL(" ON DELETE ") + sql.SQL(on_delete)
+            self.execute(statement + sql.SQL(" NOT VALID"))
+        self.validate_constraint(table, name)
+
+    def add_check(self, table, name, expression):
+        if not self.constraint_exists(table, name):
+            self.execute(sql.SQL("ALTER TABLE {} ADD CONSTRAINT {} CHECK ").format(
+                sql.Identifier(table), sql.Identifier(name)) + sql.SQL(f"({expression}) NOT VALID"))
+        self.validate_constraint(table, name)
+
+    def validate_constraint(self, table, name):
+        rows = self.query("SELECT convalidated FROM pg_constraint WHERE conrelid = to_regclass(%s) AND conname = %s",
+                          (table, name))
+        if rows and not rows[0][0]:
+            self.execute(sql.SQL("ALTER TABLE {} VALIDATE CONSTRAINT {}").format(
+                sql.Identifier(table), sql.Identifier(name)), blocking=False)
+
+    # Update rows matching where in batches walked along an integer key, each committed on its own, so row
+    # locks are held briefly and replicas and vacuum keep up; pause gives other traffic room between batches
+    def backfill(self, table, assignments, where, key="id", batch_size=BACKFILL_BATCH_SIZE, pause=0.0):
+        statement = sql.SQL("""
+            UPDATE {table} SET {assignments}
+            WHERE {key} IN (
+                SELECT {key} FROM {table} WHERE {key} > %s AND ({where}) ORDER BY {key} LIMIT %s
+            )
+            RETURNING {key}
+        """).format(table=sql.Identifier(table), assignments=sql.SQL(assignments), key=sql.Identifier(key),
+                    where=sql.SQL(where))
+        last_key = None
+        updated = 0
+        while True:
+            rows = self.execute(statement, (last_key if last_key is not None else -2**63, batch_size), fetch=True)
+            if not rows:
+                break
+            updated += len(rows)
+            last_key = max(row[0] for row in rows)
+            print(f"  {table}: backfilled {updated} rows")
+            if pause:
+                time.sleep(pause)
+        return updated
+
+def load_python_migration(migration):
+    spec = importlib.util.spec_from_file_location(f"migration_{migration.version:03d}", migration.path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    if not hasattr(module, "upgrade"):
+        raise MigrationError(f"{os.path.basename(migration.path)} does not define upgrade(ctx)")
+    return module
+
+def ensure_history_table(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name VARCHAR NOT NULL,
+                checksum VARCHAR NOT NULL,
+                applied_at TIMESTAMP DEFAULT now(),
+                execution_ms INTEGER
+            )
+        """)
+    conn.commit()
+
+def applied_migrations(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT to_regclass('schema_migrations') IS NOT NULL")
+        if not cursor.fetchone()[0]:
+            conn.rollback()
+            return {}
+        cursor.execute("SELECT version, name, checksum, applied_at, execution_ms FROM schema_migrations ORDER BY version")
+        rows = cursor.fetchall()
+    conn.rollback()
+    return {row[0]: row for row in rows}
+
+# Refuse to run when an applied migration has been edited since it was applied
+def verify_checksums(migrations, applied):
+    on_disk = {migration.version: migration for migration in migrations}
+    for version, (_, name, applied_checksum, _, _) in applied.items():
+        migration = on_disk.get(version)
+        if migration is None:
+            print(f"Warning: applied migration {version:03d}_{name} has no file on disk")
+        elif migration.checksum != applied_checksum:
+            raise MigrationError(f"Checksum mismatch for {os.path.basename(migration.path)}: "
+                                 f"it was changed after being applied; add a new migration instead")
+
+def record_migration(cursor, migration, elapsed_ms):
+    cursor.execute("INSERT INTO schema_migrations (version, name, checksum, execution_ms) VALUES (%s, %s, %s, %s)",
+                   (migration.version, migration.name, migration.checksum, elapsed_ms))
+
+# A transactional migration is retried as a whole when it times out waiting for a lock
+def apply_in_transaction(conn, migration, online, lock_timeout_ms, retries):
+    retries = retries if online else 0
+    for attempt in range(retries + 1):
+        started = time.monotonic()
+        try:
+            with conn.cursor() as cursor:
+                if online:
+                    cursor.execute("SELECT set_config('lock_timeout', %s, true)", (f"{lock_timeout_ms}ms",))
+                cursor.execute(migration.sql)
+                elapsed_ms = int((time.monotonic() - started) * 1000)
+                record_migration(cursor, migration, elapsed_ms)
+            conn.commit()
+            return elapsed_ms
+        except errors.LockNotAvailable:
+            conn.rollback()
+            if attempt == retries:
+                raise
+            delay = retry_delay(attempt)
+            print(f"  lock timeout, retrying in {delay:.1f}s ({attempt + 1}/{retries})")
+            time.sleep(delay)
+
+# Non-transactional migrations run step by step in autocommit and are recorded once every step succeeded
+def apply_without_transaction(conn, migration, online, lock_timeout_ms, retries):
+    started = time.monotonic()
+    conn.autocommit = True
+    try:
+        ctx = MigrationContext(conn, online, lock_timeout_ms, retries)
+        if migration.kind == "python":
+            load_python_migration(migration).upgrade(ctx)
+        else:
+            for statement in split_statements(migration.sql):
+                ctx.execute(statement, blocking=not NON_BLOCKING_DDL.search(statement))
+        with conn.cursor() as cursor:
+            cursor.execute("RESET lock_timeout")
+            elapsed_ms = int((time.monotonic() - started) * 1000)
+            record_migration(cursor, migration, elapsed_ms)
+    finally:
+        conn.autocommit = False
+    return elapsed_ms
+
+def apply_migration(conn, migration, online=False, lock_timeout_ms=LOCK_TIMEOUT_MS, retries=LOCK_RETRIES):
+    try:
+        if migration.kind == "sql":
+            return apply_in_transaction(conn, migration, online, lock_timeout_ms, retries)
+        return apply_without_transaction(conn, migration, online, lock_timeout_ms, retries)
+    except psycopg2.Error as e:
+        conn.rollback()
+        raise MigrationError(f"{os.path.basename(migration.path)} failed: {e}") from e
+
+# Apply pending migrations up to target (all of them by default); returns the migrations applied
+def migrate(conn, migrations, target=None, dry_run=False, online=False, lock_timeout_ms=LOCK_TIMEOUT_MS,
+            retries=LOCK_RETRIES):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_KEY,))
+    try:
+        # Read history only once the lock is held, so a concurrent runner's work is seen
+        applied = applied_migrations(conn)
+        verify_checksums(migrations, applied)
+        pending = [m for m in migrations if m.version not in applied and (target is None or m.version <= target)]
+        if not pending:
+            print("Schema is up to date")
+            return []
+        if dry_run:
+            for migration in pending:
+                print(f"Would apply {migration.version:03d}_{migration.name} ({migration.kind})")
+            return pending
+        ensure_history_table(conn)
+        total_started = time.monotonic()
+        for migration in pending:
+            elapsed_ms = apply_migration(conn, migration, online, lock_timeout_ms, retries)
+            print(f"Applied {migration.version:03d}_{migration.name} in {elapsed_ms} ms")
+        print(f"Applied {len(pending)} migration(s) in {(time.monotonic() - total_started) * 1000:.0f} ms")
+        return pending
+    finally:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_KEY,))
+        conn.commit()
+
+def print_status(conn, migrations):
+    applied = applied_migrations(conn)
+    for migration in migrations:
+        row = applied.get(migration.version)
+        if row is None:
+            state = "pending"
+        elif row[2] != migration.checksum:
+            state = "CHANGED since applied"
+        else:
+            state = f"applied {row[3]:%Y-%m-%d %H:%M} ({row[4]} ms)"
+        print(f"{migration.version:03d}_{migration.name:<40} {state}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply versioned schema migrations.")
+    parser.add_argument("--dbname", default=DB_NAME, help="database to migrate")
+    parser.add_argument("--create-database", action="store_true", help="create the database first if it does not exist")
+    parser.add_argument("--dry-run", action="store_true", help="list pending migrations without applying them")
+    parser.add_argument("--status", action="store_true", help="show applied and pending migrations")
+    parser.add_argument("--target", type=int, help="stop after this migration version")
+    parser.add_argument("--online", action="store_true",
+                        help="run write-blocking statements under lock_timeout and retry them with backoff")
+    parser.add_argument("--lock-timeout", type=int, default=LOCK_TIMEOUT_MS, help="lock_timeout in ms for --online")
+    parser.add_argument("--retries", type=int, default=LOCK_RETRIES, help="lock timeout retries for --online")
+    args = parser.parse_args()
+
+    try:
+        migrations = load_migrations()
+        if args.create_database and not args.dry_run:
+            create_database(args.dbname)
+        conn = connect_to_db(args.dbname)
+    except (MigrationError, psycopg2.Error) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    try:
+        if args.status:
+            print_status(conn, migrations)
+        else:
+            migrate(conn, migrations, target=args.target, dry_run=args.dry_run, online=args.online,
+                    lock_timeout_ms=args.lock_timeout, retries=args.retries)
+    except (MigrationError, psycopg2.Error) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
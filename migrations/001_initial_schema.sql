@@ -0,0 +1,53 @@
+-- Core e-commerce schema (was create_db.py)
+CREATE TABLE IF NOT EXISTS products (
+    product_id SERIAL PRIMARY KEY,
+    name VARCHAR NOT NULL,
+    category VARCHAR,
+    price DECIMAL NOT NULL,
+    stock_quantity INTEGER DEFAULT 0,
+    description TEXT,
+    created_at TIMESTAMP DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS idx_products_name ON products (name);
+CREATE INDEX IF NOT EXISTS idx_products_category ON products (category);
+
+CREATE TABLE IF NOT EXISTS customers (
+    customer_id SERIAL PRIMARY KEY,
+    name VARCHAR NOT NULL,
+    email VARCHAR UNIQUE NOT NULL,
+    phone VARCHAR,
+    address JSONB,
+    registration_date TIMESTAMP DEFAULT now(),
+    newsletter_opt_in BOOLEAN DEFAULT FALSE
+);
+CREATE INDEX IF NOT EXISTS idx_customers_email ON customers (email);
+
+CREATE TABLE IF NOT EXISTS logistics_partners (
+    partner_id SERIAL PRIMARY KEY,
+    name VARCHAR NOT NULL,
+    region VARCHAR,
+    contact_details JSONB
+);
+
+CREATE TABLE IF NOT EXISTS orders (
+    order_id SERIAL PRIMARY KEY,
+    customer_id INTEGER REFERENCES customers (customer_id),
+    status VARCHAR,
+    total_amount DECIMAL NOT NULL,
+    created_at TIMESTAMP DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS order_items (
+    order_item_id SERIAL PRIMARY KEY,
+    order_id INTEGER REFERENCES orders (order_id),
+    product_id INTEGER REFERENCES products (product_id),
+    quantity INTEGER NOT NULL,
+    price DECIMAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS sales_reports (
+    report_id SERIAL PRIMARY KEY,
+    date_range JSONB NOT NULL,
+    total_sales DECIMAL,
+    orders_count INTEGER
+);
@@ -0,0 +1,32 @@
+-- Blog service tables (was blog_post_database_update.py)
+CREATE TABLE IF NOT EXISTS blog_categories (
+    category_id SERIAL PRIMARY KEY,
+    name VARCHAR NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS blog_authors (
+    author_id SERIAL PRIMARY KEY,
+    name VARCHAR NOT NULL,
+    email VARCHAR UNIQUE NOT NULL,
+    bio TEXT
+);
+
+CREATE TABLE IF NOT EXISTS blog_posts (
+    post_id SERIAL PRIMARY KEY,
+    title VARCHAR NOT NULL,
+    content TEXT NOT NULL,
+    excerpt TEXT,
+    author_id INTEGER REFERENCES blog_authors (author_id),
+    category_id INTEGER REFERENCES blog_categories (category_id),
+    published_at TIMESTAMP DEFAULT now(),
+    updated_at TIMESTAMP DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS blog_comments (
+    comment_id SERIAL PRIMARY KEY,
+    post_id INTEGER REFERENCES blog_posts (post_id),
+    author_name VARCHAR NOT NULL,
+    author_email VARCHAR NOT NULL,
+    content TEXT NOT NULL,
+    commented_at TIMESTAMP DEFAULT now()
+);
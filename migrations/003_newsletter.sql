@@ -0,0 +1,9 @@
+-- Newsletter subscriptions (was customer_newsletter_database_update.py)
+ALTER TABLE customers ADD COLUMN IF NOT EXISTS subscription_status VARCHAR DEFAULT 'unsubscribed';
+
+CREATE TABLE IF NOT EXISTS subscription_history (
+    history_id SERIAL PRIMARY KEY,
+    customer_id INTEGER REFERENCES customers (customer_id),
+    status VARCHAR NOT NULL,
+    changed_at TIMESTAMP DEFAULT now()
+);
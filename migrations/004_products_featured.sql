@@ -0,0 +1,2 @@
+-- Featured products on the main page (was add_featured_column.py and db_update_table_products.py)
+ALTER TABLE products ADD COLUMN IF NOT EXISTS featured BOOLEAN DEFAULT FALSE;
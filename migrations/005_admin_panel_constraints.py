@@ -0,0 +1,8 @@
+# Foreign keys the admin panel relies on, for databases created without them (was database_admin_panel_patch.py).
+# Each key is added NOT VALID, which holds the write-blocking lock only for the catalog change, and then
+# validated under a lock that lets the storefront keep writing while existing rows are checked.
+
+def upgrade(ctx):
+    ctx.add_foreign_key("orders", "orders_customer_id_fkey", ["customer_id"], "customers", ["customer_id"])
+    ctx.add_foreign_key("order_items", "order_items_order_id_fkey", ["order_id"], "orders", ["order_id"])
+    ctx.add_foreign_key("order_items", "order_items_product_id_fkey", ["product_id"], "products", ["product_id"])
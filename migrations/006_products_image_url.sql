@@ -0,0 +1,4 @@
+-- Product images shown by the web shop
+ALTER TABLE products ADD COLUMN IF NOT EXISTS image_url TEXT;
+-- Databases built by the retired lib/migrations runner already have this index
+CREATE INDEX IF NOT EXISTS idx_products_image_url ON products (image_url);
@@ -0,0 +1,9 @@
+# Index the foreign key columns of orders and order_items. Without them every customer's order
+# history, every order's item list and every ON DELETE check on customers/products scans the table.
+# Built concurrently, so the storefront keeps writing while the indexes build.
+
+def upgrade(ctx):
+    ctx.create_index("idx_orders_customer_id", "orders", ["customer_id"])
+    ctx.create_index("idx_order_items_order_id", "order_items", ["order_id"])
+    ctx.create_index("idx_order_items_product_id", "order_items", ["product_id"])
+    ctx.create_index("idx_subscription_history_customer_id", "subscription_history", ["customer_id"])
@@ -0,0 +1,10 @@
+# Carry each order's created_at on its items. Once orders and order_items are partitioned by month
+# (partition_manager.py convert), an item row has to name its order's partition: the column becomes
+# the partition key of order_items and part of its foreign key to orders.
+
+def upgrade(ctx):
+    ctx.add_column("order_items", "order_created_at", "TIMESTAMP")
+    ctx.backfill("order_items",
+                 "order_created_at = (SELECT o.created_at FROM orders o WHERE o.order_id = order_items.order_id)",
+                 "order_created_at IS NULL AND order_id IS NOT NULL",
+                 key="order_item_id")
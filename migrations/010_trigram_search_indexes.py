@@ -0,0 +1,18 @@
+# Trigram GIN indexes for the admin panel's substring search. ILIKE '%term%' cannot use a btree index,
+# but pg_trgm answers it from these indexes, and ranks matches with similarity().
+#
+# pg_trgm ships in the postgresql-contrib package. Where it is not installed CREATE EXTENSION fails,
+# so the migration stays pending (and later ones wait) until the package is installed; the admin
+# panel keeps searching with plain ILIKE scans meanwhile.
+
+INDEXES = [
+    ("idx_products_name_trgm", "products", "name"),
+    ("idx_products_description_trgm", "products", "description"),
+    ("idx_customers_name_trgm", "customers", "name"),
+    ("idx_customers_email_trgm", "customers", "email"),
+]
+
+def upgrade(ctx):
+    ctx.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table, column in INDEXES:
+        ctx.create_index(name, table, [column], using="gin", opclass="gin_trgm_ops")
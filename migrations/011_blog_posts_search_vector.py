@@ -0,0 +1,31 @@
+# Full-text search over blog posts. search_vector holds the title (weight A), excerpt (B) and content (C)
+# as an English tsvector, kept current by a trigger and indexed with GIN; blog_search.py queries it.
+# blog_post_search_vector() is the one definition of the document, used by the trigger, this backfill
+# and `python blog_search.py reindex`.
+
+def upgrade(ctx):
+    ctx.execute("""
+        CREATE OR REPLACE FUNCTION blog_post_search_vector(title TEXT, excerpt TEXT, content TEXT)
+        RETURNS tsvector AS $$
+            SELECT setweight(to_tsvector('english', COALESCE(title, '')), 'A')
+                || setweight(to_tsvector('english', COALESCE(excerpt, '')), 'B')
+                || setweight(to_tsvector('english', COALESCE(content, '')), 'C')
+        $$ LANGUAGE sql IMMUTABLE
+    """)
+    ctx.add_column("blog_posts", "search_vector", "tsvector")
+    ctx.execute("""
+        CREATE OR REPLACE FUNCTION blog_posts_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := blog_post_search_vector(NEW.title, NEW.excerpt, NEW.content);
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    ctx.execute("DROP TRIGGER IF EXISTS blog_posts_search_vector ON blog_posts")
+    ctx.execute("""
+        CREATE TRIGGER blog_posts_search_vector BEFORE INSERT OR UPDATE OF title, excerpt, content ON blog_posts
+        FOR EACH ROW EXECUTE FUNCTION blog_posts_search_vector_update()
+    """)
+    ctx.backfill("blog_posts", "search_vector = blog_post_search_vector(title, excerpt, content)",
+                 "search_vector IS NULL", key="post_id")
+    ctx.create_index("idx_blog_posts_search_vector", "blog_posts", ["search_vector"], using="gin")
@@ -0,0 +1,8 @@
+# Composite indexes behind the Orders tab filters: status equality and customer lookups, each usually
+# combined with a created_at range. (customer_id, created_at) also serves the customer_id foreign key,
+# so the single-column idx_orders_customer_id from migration 007 becomes redundant and is dropped.
+
+def upgrade(ctx):
+    ctx.create_index("idx_orders_status_created_at", "orders", ["status", "created_at"])
+    ctx.create_index("idx_orders_customer_id_created_at", "orders", ["customer_id", "created_at"])
+    ctx.drop_index("idx_orders_customer_id")
@@ -0,0 +1,5 @@
+# Backs the Customers tab "Pages, newest first" listing, which walks (registration_date, customer_id)
+# in descending order a page at a time; without it every page sorted the whole table.
+
+def upgrade(ctx):
+    ctx.create_index("idx_customers_registration_date_customer_id", "customers", ["registration_date", "customer_id"])
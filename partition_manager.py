@@ -0,0 +1,436 @@
+# Monthly range partitioning of orders and order_items
+# pip install psycopg2-binary
+#
+# Usage: python partition_manager.py convert                 partition the existing tables online
+#        python partition_manager.py create --months-ahead 3  create upcoming monthly partitions
+#        python partition_manager.py create --from 2022-01    also create the months since 2022-01
+#        python partition_manager.py detach --before 2023-01  detach older months into the archive schema
+#        python partition_manager.py list
+#        python partition_manager.py drop-unpartitioned       drop the pre-conversion tables once verified
+#
+# orders is partitioned on created_at and order_items on order_created_at (added by migration 008),
+# so a query over recent orders or their items only touches the matching months. Because a primary
+# key or foreign key on a partitioned table must include the partition key, the keys become
+# orders (order_id, created_at) and order_items (order_item_id, order_created_at), and order_items
+# references orders (order_id, created_at) ON UPDATE CASCADE.
+#
+# There is no default partition, so an order dated in a month without a partition is rejected. The
+# storefront's inserts only keep working because "create" runs daily from cron and keeps partitions a
+# few months ahead; if that job stops, checkout fails once the last month is reached. Data loaded with
+# older dates needs its months first: create --from YYYY-MM adds them, and the dummy data generator
+# does so for its own date window.
+#
+# convert works against a live database: it creates partitioned copies, mirrors every write on the old
+# tables into them with triggers, copies existing rows in short batches and finally swaps the names in
+# one brief transaction under lock_timeout. The old tables stay behind as orders_unpartitioned and
+# order_items_unpartitioned until drop-unpartitioned.
+import argparse
+import datetime
+import re
+import sys
+import time
+
+import psycopg2
+from psycopg2 import sql
+
+from migrate import LOCK_RETRIES, LOCK_TIMEOUT_MS, MigrationContext, connect_to_db, retry_delay
+
+DEFAULT_MONTHS_AHEAD = 3
+COPY_BATCH_SIZE = 10000
+ARCHIVE_SCHEMA = "archive"
+
+# Partitioned table, its partition key, the key column and the temporary name used during convert
+TABLES = {
+    "orders": ("created_at", "order_id", "orders_partitioned"),
+    "order_items": ("order_created_at", "order_item_id", "order_items_partitioned"),
+}
+# Suffix of constraints and indexes on the partitioned copies until they take over the original names
+NEW_SUFFIX = "_part"
+OLD_SUFFIX = "_unpartitioned"
+PARTITION_NAME = re.compile(r"^(orders|order_items)_(\d{4})_(\d{2})$")
+
+class PartitionError(Exception):
+    pass
+
+def month_start(day):
+    return datetime.date(day.year, day.month, 1)
+
+def add_months(day, months):
+    month = day.month - 1 + months
+    return datetime.date(day.year + month // 12, month % 12 + 1, 1)
+
+def partition_name(table, month):
+    return f"{table}_{month:%Y_%m}"
+
+def is_partitioned(ctx, table):
+    rows = ctx.query("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (table,))
+    return bool(rows) and rows[0][0] == "p"
+
+def columns_of(ctx, table):
+    return [row[0] for row in ctx.query("""
+        SELECT attname FROM pg_attribute
+        WHERE attrelid = to_regclass(%s) AND attnum > 0 AND NOT attisdropped
+        ORDER BY attnum
+    """, (table,))]
+
+def create_partition(ctx, table, month, parent=None):
+    name = partition_name(table, month)
+    ctx.execute(sql.SQL("CREATE TABLE IF NOT EXISTS {} PARTITION OF {} FOR VALUES FROM (%s) TO (%s)").format(
+        sql.Identifier(name), sql.Identifier(parent or table)), (month, add_months(month, 1)))
+    return name
+
+# orders partitions are created before order_items ones, which reference them
+def create_partitions(ctx, first_month, last_month, parents=None):
+    month = first_month
+    created = 0
+    while month <= last_month:
+        for table in TABLES:
+            if not ctx.query("SELECT 1 FROM pg_class WHERE oid = to_regclass(%s)", (partition_name(table, month),)):
+                create_partition(ctx, table, month, (parents or {}).get(table))
+                created += 1
+        month = add_months(month, 1)
+    return created
+
+def create_future(ctx, months_ahead, first_month=None):
+    for table in TABLES:
+        if not is_partitioned(ctx, table):
+            raise PartitionError(f"{table} is not partitioned yet; run convert first")
+    this_month = month_start(datetime.date.today())
+    first_month = min(first_month, this_month) if first_month else this_month
+    created = create_partitions(ctx, first_month, add_months(this_month, months_ahead))
+    print(f"Created {created} partition(s); partitions exist from {first_month:%Y-%m} "
+          f"through {add_months(this_month, months_ahead):%Y-%m}")
+
+# Partitions for every month from first_day to last_day, for loaders writing rows outside the months
+# create keeps ready. Nothing to do while the tables are not partitioned.
+def ensure_partitions(ctx, first_day, last_day):
+    if not is_partitioned(ctx, "orders"):
+        return 0
+    return create_partitions(ctx, month_start(first_day), month_start(last_day))
+
+def list_partitions(ctx):
+    for table in TABLES:
+        rows = ctx.query("""
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), GREATEST(c.reltuples, 0)::bigint,
+                   pg_total_relation_size(c.oid)
+            FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(%s)
+            ORDER BY c.relname
+        """, (table,))
+        print(f"{table}: {len(rows)} partition(s)" if rows else f"{table}: not partitioned")
+        for name, bound, row_estimate, size in rows:
+            print(f"  {name:<28} {bound:<70} ~{row_estimate} rows, {size // 1024} kB")
+
+# Items are detached first and lose their foreign key to orders, which is then free to let go of the month
+def detach_before(ctx, cutoff, drop=False, archive_schema=ARCHIVE_SCHEMA):
+    months = sorted({(int(m.group(2)), int(m.group(3))) for m in
+                     (PARTITION_NAME.match(row[0]) for row in ctx.query("""
+                         SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+                         WHERE i.inhparent IN (to_regclass('orders'), to_regclass('order_items'))
+                     """)) if m})
+    months = [datetime.date(year, month, 1) for year, month in months if datetime.date(year, month, 1) < cutoff]
+    if not months:
+        print(f"No partitions before {cutoff:%Y-%m}")
+        return
+    if not drop:
+        ctx.execute(sql.SQL("CREATE SCHEMA IF NOT EXISTS {}").format(sql.Identifier(archive_schema)))
+    for month in months:
+        for table in ("order_items", "orders"):
+            name = partition_name(table, month)
+            if not ctx.query("SELECT 1 FROM pg_inherits WHERE inhrelid = to_regclass(%s)", (name,)):
+                continue
+            # CONCURRENTLY keeps inserts into other months flowing while the detach waits for readers
+            ctx.execute(sql.SQL("ALTER TABLE {} DETACH PARTITION {} CONCURRENTLY").format(
+                sql.Identifier(table), sql.Identifier(name)), blocking=False)
+            for (constraint,) in ctx.query("""
+                SELECT conname FROM pg_constraint
+                WHERE conrelid = to_regclass(%s) AND contype = 'f' AND confrelid = to_regclass('orders')
+            """, (name,)):
+                ctx.execute(sql.SQL("ALTER TABLE {} DROP CONSTRAINT {}").format(
+                    sql.Identifier(name), sql.Identifier(constraint)))
+            if drop:
+                ctx.execute(sql.SQL("DROP TABLE {}").format(sql.Identifier(name)))
+                print(f"Dropped {name}")
+            else:
+                ctx.execute(sql.SQL("ALTER TABLE {} SET SCHEMA {}").format(
+                    sql.Identifier(name), sql.Identifier(archive_schema)))
+                print(f"Detached {name} into {archive_schema}.{name}")
+
+def check_convertible(ctx):
+    for table in TABLES:
+        if is_partitioned(ctx, table):
+            raise PartitionError(f"{table} is already partitioned")
+    if "order_created_at" not in columns_of(ctx, "order_items"):
+        raise PartitionError("order_items.order_created_at is missing; run python migrate.py first")
+    referencing = ctx.query("""
+        SELECT conrelid::regclass::text, conname FROM pg_constraint
+        WHERE contype = 'f' AND confrelid IN (to_regclass('orders'), to_regclass('order_items'))
+          AND conrelid NOT IN (to_regclass('orders'), to_regclass('order_items'))
+    """)
+    if referencing:
+        raise PartitionError("Foreign keys from other tables reference orders or order_items: "
+                             + ", ".join(f"{table}.{name}" for table, name in referencing))
+    if ctx.query("SELECT 1 FROM orders WHERE created_at IS NULL LIMIT 1"):
+        raise PartitionError("Some orders have no created_at; set it before partitioning")
+    if ctx.query("SELECT 1 FROM order_items WHERE order_id IS NULL LIMIT 1"):
+        raise PartitionError("Some order_items have no order_id; delete or fix them before partitioning")
+
+# Plain indexes of the original table, recreated on the partitioned copy under a temporary name
+def copy_indexes(ctx, table, new_table):
+    for name, definition in ctx.query("""
+        SELECT c.relname, pg_get_indexdef(i.indexrelid)
+        FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE i.indrelid = to_regclass(%s)
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint con WHERE con.conindid = i.indexrelid)
+    """, (table,)):
+        if " UNIQUE " in definition:
+            print(f"  skipping unique index {name}: it cannot be enforced across partitions")
+            continue
+        new_definition = re.sub(r"^CREATE INDEX \S+ ON \S+", lambda _: sql.SQL("CREATE INDEX {} ON {}").format(
+            sql.Identifier(name + NEW_SUFFIX), sql.Identifier(new_table)).as_string(ctx.conn), definition)
+        ctx.execute(new_definition)
+
+def create_partitioned_tables(ctx, months_ahead):
+    ctx.execute("""
+        CREATE TABLE orders_partitioned (LIKE orders INCLUDING DEFAULTS INCLUDING STORAGE)
+        PARTITION BY RANGE (created_at)
+    """)
+    ctx.execute("ALTER TABLE orders_partitioned ALTER COLUMN created_at SET NOT NULL")
+    ctx.execute("ALTER TABLE orders_partitioned ADD CONSTRAINT orders_pkey_part PRIMARY KEY (order_id, created_at)")
+    ctx.execute("""
+        ALTER TABLE orders_partitioned ADD CONSTRAINT orders_customer_id_fkey_part
+        FOREIGN KEY (customer_id) REFERENCES customers (customer_id)
+    """)
+    ctx.execute("""
+        CREATE TABLE order_items_partitioned (LIKE order_items INCLUDING DEFAULTS INCLUDING STORAGE)
+        PARTITION BY RANGE (order_created_at)
+    """)
+    ctx.execute("ALTER TABLE order_items_partitioned ALTER COLUMN order_created_at SET NOT NULL")
+    ctx.execute("""
+        ALTER TABLE order_items_partitioned ADD CONSTRAINT order_items_pkey_part
+        PRIMARY KEY (order_item_id, order_created_at)
+    """)
+    # Moving an order to another month moves its items along with it
+    ctx.execute("""
+        ALTER TABLE order_items_partitioned ADD CONSTRAINT order_items_order_id_fkey_part
+        FOREIGN KEY (order_id, order_created_at) REFERENCES orders_partitioned (order_id, created_at)
+        ON UPDATE CASCADE
+    """)
+    ctx.execute("""
+        ALTER TABLE order_items_partitioned ADD CONSTRAINT order_items_product_id_fkey_part
+        FOREIGN KEY (product_id) REFERENCES products (product_id)
+    """)
+    copy_indexes(ctx, "orders", "orders_partitioned")
+    copy_indexes(ctx, "order_items", "order_items_partitioned")
+    first_month = ctx.query("SELECT min(created_at)::date FROM orders")[0][0] or datetime.date.today()
+    this_month = month_start(datetime.date.today())
+    create_partitions(ctx, month_start(first_month), add_months(this_month, months_ahead),
+                      {table: new_table for table, (_, _, new_table) in TABLES.items()})
+
+# Mirror writes on the old tables into the partitioned copies until the swap
+def install_mirror_trigger(ctx, table):
+    _, key, new_table = TABLES[table]
+    columns = columns_of(ctx, table)
+    # An item always takes its order's current created_at, so it matches the order's copy
+    values = [
+        "(SELECT o.created_at FROM orders o WHERE o.order_id = NEW.order_id)" if column == "order_created_at"
+        else f"NEW.{column}" for column in columns
+    ]
+    column_list = ", ".join(columns)
+    value_list = ", ".join(values)
+    ctx.execute(f"""
+        CREATE OR REPLACE FUNCTION {table}_mirror() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO {new_table} ({column_list}) VALUES ({value_list}) ON CONFLICT DO NOTHING;
+            ELSIF TG_OP = 'UPDATE' THEN
+                UPDATE {new_table} SET ({column_list}) = ROW({value_list}) WHERE {key} = OLD.{key};
+            ELSE
+                DELETE FROM {new_table} WHERE {key} = OLD.{key};
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    ctx.execute(f"DROP TRIGGER IF EXISTS {table}_mirror ON {table}")
+    ctx.execute(f"""
+        CREATE TRIGGER {table}_mirror AFTER INSERT OR UPDATE OR DELETE ON {table}
+        FOR EACH ROW EXECUTE FUNCTION {table}_mirror()
+    """)
+
+# Copy existing rows in key order. Each batch locks its source rows, so a concurrent update either
+# lands before the batch reads the row or waits and is then mirrored onto the copied row.
+def copy_rows(ctx, table, batch_size):
+    _, key, new_table = TABLES[table]
+    columns = columns_of(ctx, table)
+    select_list = ", ".join(
+        "o.created_at" if column == "order_created_at" else f"t.{column}"
+        for column in columns)
+    join = "JOIN orders o ON o.order_id = t.order_id" if table == "order_items" else ""
+    statement = f"""
+        WITH batch AS (
+            SELECT {select_list} FROM {table} t {join}
+            WHERE t.{key} > %s ORDER BY t.{key} LIMIT %s FOR UPDATE OF t
+        ), copied AS (
+            INSERT INTO {new_table} ({', '.join(columns)}) SELECT * FROM batch ON CONFLICT DO NOTHING
+        )
+        SELECT max({key}), count(*) FROM batch
+    """
+    last_key = -1
+    total = 0
+    while True:
+        (max_key, count), = ctx.execute(statement, (last_key, batch_size), fetch=True)
+        if not count:
+            break
+        last_key = max_key
+        total += count
+        print(f"  {table}: copied {total} rows")
+    return total
+
+def rename_objects(ctx, cursor, table, new_table):
+    # Original names move to the old table with a suffix, then the partitioned copy takes them over
+    for old_name, new_name, kind in ctx.query("""
+        SELECT left(conname, length(conname) - %s), conname, 'constraint' FROM pg_constraint
+        WHERE conrelid = to_regclass(%s) AND conname LIKE %s
+        UNION ALL
+        SELECT left(c.relname, length(c.relname) - %s), c.relname, 'index'
+        FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE i.indrelid = to_regclass(%s) AND c.relname LIKE %s
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint con WHERE con.conindid = i.indexrelid)
+    """, (len(NEW_SUFFIX), new_table, f"%{NEW_SUFFIX}", len(NEW_SUFFIX), new_table, f"%{NEW_SUFFIX}")):
+        if kind == "constraint":
+            if ctx.query("SELECT 1 FROM pg_constraint WHERE conrelid = to_regclass(%s) AND conname = %s",
+                         (table, old_name)):
+                cursor.execute(sql.SQL("ALTER TABLE {} RENAME CONSTRAINT {} TO {}").format(
+                    sql.Identifier(table), sql.Identifier(old_name), sql.Identifier(old_name + OLD_SUFFIX)))
+            cursor.execute(sql.SQL("ALTER TABLE {} RENAME CONSTRAINT {} TO {}").format(
+                sql.Identifier(new_table), sql.Identifier(new_name), sql.Identifier(old_name)))
+        else:
+            cursor.execute(sql.SQL("ALTER INDEX IF EXISTS {} RENAME TO {}").format(
+                sql.Identifier(old_name), sql.Identifier(old_name + OLD_SUFFIX)))
+            cursor.execute(sql.SQL("ALTER INDEX {} RENAME TO {}").format(
+                sql.Identifier(new_name), sql.Identifier(old_name)))
+
+# Triggers on the old table (other than the mirror) move to the partitioned copy
+def move_triggers(ctx, cursor, table, new_table):
+    for name, definition in ctx.query("""
+        SELECT tgname, pg_get_triggerdef(oid) FROM pg_trigger
+        WHERE tgrelid = to_regclass(%s) AND NOT tgisinternal AND tgname <> %s
+    """, (table, f"{table}_mirror")):
+        cursor.execute(sql.SQL("DROP TRIGGER {} ON {}").format(sql.Identifier(name), sql.Identifier(table)))
+        cursor.execute(re.sub(r" ON \S+ ", lambda _: sql.SQL(" ON {} ").format(
+            sql.Identifier(new_table)).as_string(ctx.conn), definition, count=1))
+
+# The only step that blocks writes: both tables are locked, the triggers dropped or moved and the names
+# swapped. It is retried under lock_timeout so it never queues the storefront behind a long transaction.
+def swap_tables(ctx):
+    conn = ctx.conn
+    conn.autocommit = False
+    try:
+        for attempt in range(ctx.retries + 1):
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT set_config('lock_timeout', %s, true)", (f"{ctx.lock_timeout_ms}ms",))
+                    cursor.execute("LOCK TABLE orders, order_items IN ACCESS EXCLUSIVE MODE")
+                    for table, (_, key, new_table) in TABLES.items():
+                        cursor.execute(f"DROP TRIGGER {table}_mirror ON {table}")
+                        cursor.execute(f"DROP FUNCTION {table}_mirror()")
+                        move_triggers(ctx, cursor, table, new_table)
+                        rename_objects(ctx, cursor, table, new_table)
+                        cursor.execute(sql.SQL("ALTER TABLE {} RENAME TO {}").format(
+                            sql.Identifier(table), sql.Identifier(table + OLD_SUFFIX)))
+                        cursor.execute(sql.SQL("ALTER TABLE {} RENAME TO {}").format(
+                            sql.Identifier(new_table), sql.Identifier(table)))
+                        sequence = ctx.query("SELECT pg_get_serial_sequence(%s, %s)", (table + OLD_SUFFIX, key))[0][0]
+                        if sequence:
+                            cursor.execute(sql.SQL("ALTER SEQUENCE {} OWNED BY {}.{}").format(
+                                sql.SQL(sequence), sql.Identifier(table), sql.Identifier(key)))
+                conn.commit()
+                return
+            except psycopg2.errors.LockNotAvailable:
+                conn.rollback()
+                if attempt == ctx.retries:
+                    raise
+                delay = retry_delay(attempt)
+                print(f"  lock timeout, retrying swap in {delay:.1f}s ({attempt + 1}/{ctx.retries})")
+                time.sleep(delay)
+    finally:
+        conn.autocommit = True
+
+# Both counts come from one statement and so one snapshot; mirrored writes keep them equal
+def verify_counts(ctx):
+    for table, (_, _, new_table) in TABLES.items():
+        old_count, new_count = ctx.query(f"SELECT (SELECT count(*) FROM {table}), (SELECT count(*) FROM {new_table})")[0]
+        if old_count != new_count:
+            raise PartitionError(f"{new_table} has {new_count} rows but {table} has {old_count}; "
+                                 f"rerun convert to resume copying")
+
+def convert(ctx, months_ahead, batch_size):
+    if ctx.query("SELECT to_regclass('orders_partitioned')")[0][0]:
+        print("Resuming: partitioned copies already exist")
+    else:
+        check_convertible(ctx)
+        print("Creating partitioned tables")
+        create_partitioned_tables(ctx, months_ahead)
+    # orders first: mirrored and copied items need their order to exist in the copy already
+    for table in TABLES:
+        install_mirror_trigger(ctx, table)
+        copy_rows(ctx, table, batch_size)
+    verify_counts(ctx)
+    print("Swapping tables")
+    swap_tables(ctx)
+    print("orders and order_items are partitioned; the old tables are kept as orders_unpartitioned and "
+          "order_items_unpartitioned until drop-unpartitioned")
+
+def drop_unpartitioned(ctx):
+    for table in ("order_items", "orders"):
+        ctx.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(table + OLD_SUFFIX)))
+    print("Dropped orders_unpartitioned and order_items_unpartitioned")
+
+def parse_month(value):
+    return datetime.datetime.strptime(value, "%Y-%m").date()
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage monthly partitions of orders and order_items.")
+    parser.add_argument("--dbname", default=None, help="database to manage")
+    parser.add_argument("--lock-timeout", type=int, default=LOCK_TIMEOUT_MS, help="lock_timeout in ms")
+    parser.add_argument("--retries", type=int, default=LOCK_RETRIES, help="retries after a lock timeout")
+    commands = parser.add_subparsers(dest="command", required=True)
+    convert_parser = commands.add_parser("convert", help="partition the existing tables online")
+    convert_parser.add_argument("--months-ahead", type=int, default=DEFAULT_MONTHS_AHEAD)
+    convert_parser.add_argument("--batch-size", type=int, default=COPY_BATCH_SIZE)
+    create_parser = commands.add_parser("create", help="create partitions for the coming months")
+    create_parser.add_argument("--months-ahead", type=int, default=DEFAULT_MONTHS_AHEAD)
+    create_parser.add_argument("--from", dest="first_month", type=parse_month,
+                               help="also create past months from this one, YYYY-MM")
+    detach_parser = commands.add_parser("detach", help="detach months before a cutoff")
+    detach_parser.add_argument("--before", required=True, type=parse_month,
+                               help="first month to keep, YYYY-MM")
+    detach_parser.add_argument("--drop", action="store_true", help="drop detached months instead of archiving them")
+    detach_parser.add_argument("--archive-schema", default=ARCHIVE_SCHEMA)
+    commands.add_parser("list", help="list partitions")
+    commands.add_parser("drop-unpartitioned", help="drop the tables left behind by convert")
+    args = parser.parse_args()
+
+    conn = connect_to_db(args.dbname) if args.dbname else connect_to_db()
+    conn.autocommit = True
+    ctx = MigrationContext(conn, online=True, lock_timeout_ms=args.lock_timeout, retries=args.retries)
+    try:
+        if args.command == "convert":
+            convert(ctx, args.months_ahead, args.batch_size)
+        elif args.command == "create":
+            create_future(ctx, args.months_ahead, args.first_month)
+        elif args.command == "detach":
+            detach_before(ctx, args.before, args.drop, args.archive_schema)
+        elif args.command == "list":
+            list_partitions(ctx)
+        else:
+            drop_unpartitioned(ctx)
+    except (PartitionError, psycopg2.Error) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
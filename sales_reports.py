@@ -0,0 +1,160 @@
+# Sales reports from a daily rollup of orders
+# pip install psycopg2-binary
+#
+# Usage: python sales_reports.py refresh                               bring the rollup up to date
+#        python sales_reports.py report --from 2024-01-01 --to 2024-03-31
+#        python sales_reports.py rebuild                               recompute the rollup from scratch
+#
+# daily_sales_rollup (migration 009) holds one row per day with its order count and sales. refresh only
+# reads what changed since the last run: orders past the order_id watermark in sales_rollup_state, days
+# marked dirty by updates and deletes of older orders, and the last SETTLE_DAYS days, which catch
+# orders whose transaction committed after a higher order_id was already counted. Run it from cron
+# every few minutes; report refreshes first and then sums at most a few hundred rollup rows, and stores
+# the result in sales_reports, where the admin panel lists it.
+#
+# Orders inserted with a created_at older than SETTLE_DAYS by a transaction that was still open during
+# a refresh (a bulk import, say) are not seen by refresh; run rebuild after such loads.
+# Cancelled orders are not counted as sales.
+import argparse
+import datetime
+import json
+import sys
+
+import psycopg2
+
+from migrate import connect_to_db
+
+ROLLUP = "daily_sales"
+SETTLE_DAYS = 2
+COUNTED = "COALESCE(lower(status), '') <> 'cancelled'"
+
+# Serialises refresh, rebuild and report: each runs in one transaction holding the state row
+def lock_state(cursor):
+    cursor.execute("SELECT last_order_id FROM sales_rollup_state WHERE rollup = %s FOR UPDATE", (ROLLUP,))
+    row = cursor.fetchone()
+    if row is None:
+        raise RuntimeError("sales_rollup_state is empty; run `python migrate.py` to apply migration 009")
+    return row[0]
+
+# refresh and rebuild read the watermark and recompute the rollup from one snapshot. Under READ
+# COMMITTED each statement saw newer orders than the watermark read before it, so the tail past the
+# watermark was counted now and again by the next run. The state table is locked before the first
+# query takes the snapshot, so a run that waited for another still sees the watermark it saved.
+def begin_snapshot(cursor):
+    cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+    cursor.execute("LOCK TABLE sales_rollup_state IN SHARE ROW EXCLUSIVE MODE")
+
+def save_state(cursor, last_order_id):
+    cursor.execute("UPDATE sales_rollup_state SET last_order_id = %s, refreshed_at = now() WHERE rollup = %s",
+                   (last_order_id, ROLLUP))
+
+def refresh(conn):
+    with conn, conn.cursor() as cursor:
+        begin_snapshot(cursor)
+        watermark = lock_state(cursor)
+        cursor.execute("SELECT COALESCE(max(order_id), 0) FROM orders")
+        new_watermark = max(cursor.fetchone()[0], watermark)
+        cursor.execute("""
+            WITH cleared AS (
+                DELETE FROM sales_rollup_dirty_days RETURNING day
+            )
+            SELECT day FROM cleared
+            UNION
+            SELECT created_at::date FROM orders WHERE order_id > %s AND order_id <= %s AND created_at IS NOT NULL
+            UNION
+            SELECT generate_series(current_date - %s, current_date, interval '1 day')::date
+        """, (watermark, new_watermark, SETTLE_DAYS))
+        days = [row[0] for row in cursor.fetchall()]
+        # Each day is recomputed from its own created_at range, which idx_orders_created_at (or the
+        # month's partition) serves directly
+        cursor.execute("DELETE FROM daily_sales_rollup WHERE day = ANY(%s)", (days,))
+        cursor.execute(f"""
+            INSERT INTO daily_sales_rollup (day, orders_count, total_sales)
+            SELECT d.day, count(*), sum(o.total_amount)
+            FROM unnest(%s::date[]) AS d (day)
+            JOIN orders o ON o.created_at >= d.day AND o.created_at < d.day + 1
+            WHERE {COUNTED}
+            GROUP BY d.day
+        """, (days,))
+        save_state(cursor, new_watermark)
+    return len(days), new_watermark - watermark
+
+def rebuild(conn):
+    with conn, conn.cursor() as cursor:
+        begin_snapshot(cursor)
+        lock_state(cursor)
+        cursor.execute("SELECT COALESCE(max(order_id), 0) FROM orders")
+        watermark = cursor.fetchone()[0]
+        cursor.execute("DELETE FROM sales_rollup_dirty_days")
+        cursor.execute("DELETE FROM daily_sales_rollup")
+        cursor.execute(f"""
+            INSERT INTO daily_sales_rollup (day, orders_count, total_sales)
+            SELECT created_at::date, count(*), sum(total_amount)
+            FROM orders
+            WHERE created_at IS NOT NULL AND {COUNTED}
+            GROUP BY 1
+        """)
+        days = cursor.rowcount
+        save_state(cursor, watermark)
+    return days
+
+# Sum the rollup over [start, end] and store it in sales_reports, replacing an earlier report of the
+# same range
+def report(conn, start, end):
+    date_range = json.dumps({"start": start.isoformat(), "end": end.isoformat()})
+    with conn, conn.cursor() as cursor:
+        lock_state(cursor)
+        cursor.execute("""
+            SELECT COALESCE(sum(total_sales), 0), COALESCE(sum(orders_count), 0)
+            FROM daily_sales_rollup WHERE day BETWEEN %s AND %s
+        """, (start, end))
+        total_sales, orders_count = cursor.fetchone()
+        cursor.execute("""
+            UPDATE sales_reports SET total_sales = %s, orders_count = %s WHERE date_range = %s::jsonb
+        """, (total_sales, orders_count, date_range))
+        if cursor.rowcount == 0:
+            cursor.execute("""
+                INSERT INTO sales_reports (date_range, total_sales, orders_count) VALUES (%s::jsonb, %s, %s)
+            """, (date_range, total_sales, orders_count))
+    return total_sales, orders_count
+
+def parse_date(value):
+    return datetime.datetime.strptime(value, "%Y-%m-%d").date()
+
+def main():
+    today = datetime.date.today()
+    parser = argparse.ArgumentParser(description="Maintain the daily sales rollup and generate sales reports.")
+    parser.add_argument("--dbname", default=None, help="database to report on")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("refresh", help="roll up orders changed since the last refresh")
+    commands.add_parser("rebuild", help="recompute the whole rollup")
+    report_parser = commands.add_parser("report", help="store a report for a date range in sales_reports")
+    report_parser.add_argument("--from", dest="start", type=parse_date, default=today.replace(day=1),
+                               help="first day, YYYY-MM-DD (default: start of this month)")
+    report_parser.add_argument("--to", dest="end", type=parse_date, default=today,
+                               help="last day, YYYY-MM-DD (default: today)")
+    report_parser.add_argument("--no-refresh", action="store_true", help="report from the rollup as it is")
+    args = parser.parse_args()
+
+    conn = connect_to_db(args.dbname) if args.dbname else connect_to_db()
+    try:
+        if args.command == "rebuild":
+            print(f"Rollup rebuilt: {rebuild(conn)} days")
+        elif args.command == "refresh":
+            days, new_orders = refresh(conn)
+            print(f"Rollup refreshed: {new_orders} new orders, {days} days recomputed")
+        else:
+            if args.end < args.start:
+                parser.error("--to is before --from")
+            if not args.no_refresh:
+                refresh(conn)
+            total_sales, orders_count = report(conn, args.start, args.end)
+            print(f"{args.start} - {args.end}: {orders_count} orders, total sales {total_sales:.2f}")
+    except (RuntimeError, psycopg2.Error) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
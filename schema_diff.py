@@ -0,0 +1,249 @@
+# Compare two database schemas and print the DDL that turns the first into the second
+# pip install psycopg2-binary
+#
+# Usage: python schema_diff.py ecommerce_db ecommerce_staging
+#        python schema_diff.py snapshot.json postgresql://admin@db.example.com/ecommerce_db
+#        python extract_db_metadata.py --json > snapshot.json   (save a snapshot to diff against later)
+#
+# Each side is a saved snapshot file, a database name on the local server or a connection string.
+# Live databases go through load_snapshot, so an unchanged schema is read from the snapshot cache and
+# costs one fingerprint query; the comparison itself runs in memory.
+#
+# Statements that lose data (DROP TABLE, DROP COLUMN, column type changes) are printed commented out
+# unless --allow-drops is given. Renames cannot be told apart from a drop plus an add; review the
+# output before applying it. Partitioned tables are compared by partition key and partition bounds;
+# a table that is partitioned on one side only has to be rebuilt, which is reported as a comment.
+# Exit status is 0 when the schemas match and 1 when they differ.
+import argparse
+import os
+import re
+import sys
+
+import psycopg2
+
+from extract_db_metadata import SchemaSnapshot, connect_to_db, load_snapshot
+
+# Integer columns defaulting to their own sequence are recreated as serial columns
+SERIAL_DEFAULT = re.compile(r"^nextval\('[^']+'::regclass\)$")
+SERIAL_TYPES = {"integer": "serial", "bigint": "bigserial", "smallint": "smallserial"}
+NEXTVAL = re.compile(r"nextval\('([^']+)'::regclass\)")
+
+def open_snapshot(spec):
+    if os.path.isfile(spec):
+        return SchemaSnapshot.load(spec)
+    conn = psycopg2.connect(spec) if "=" in spec or "://" in spec else connect_to_db(spec)
+    if conn is None:
+        sys.exit(2)
+    try:
+        return load_snapshot(conn)
+    finally:
+        conn.close()
+
+def quote(name):
+    return name if re.match(r"^[a-z_][a-z0-9_$]*$", name) else '"' + name.replace('"', '""') + '"'
+
+def qualified(table):
+    return f"{quote(table.schema)}.{quote(table.name)}"
+
+def is_serial(column):
+    return bool(column.default and SERIAL_DEFAULT.match(column.default) and column.data_type in SERIAL_TYPES)
+
+def column_definition(column):
+    data_type = column.data_type
+    if is_serial(column):
+        return f"{quote(column.name)} {SERIAL_TYPES[data_type]}{'' if column.nullable else ' NOT NULL'}"
+    definition = f"{quote(column.name)} {data_type}"
+    if column.default is not None:
+        definition += f" DEFAULT {column.default}"
+    if not column.nullable:
+        definition += " NOT NULL"
+    return definition
+
+# Indexes created implicitly by primary key, unique and exclusion constraints follow their constraint
+def plain_indexes(table):
+    return {index.name: index for index in table.indexes if index.constraint_name is None}
+
+# An index on a partitioned table is defined ON ONLY the parent; recreated without ONLY it is built on
+# every partition too, instead of staying invalid
+def index_definition(index):
+    return index.definition.replace(" ON ONLY ", " ON ", 1)
+
+class SchemaDiff:
+    def __init__(self, source, target, allow_drops=False):
+        self.source = source
+        self.target = target
+        self.allow_drops = allow_drops
+        # Statements are collected per phase so dependencies are satisfied in the output order
+        self.phases = {phase: [] for phase in ("drop_fks", "drop_indexes", "drop_constraints", "drop_partitions",
+                                               "schemas", "tables", "columns", "constraints", "indexes", "fks",
+                                               "drop_tables")}
+
+    def add(self, phase, statement, destructive=False):
+        if destructive and not self.allow_drops:
+            statement = f"-- (drops data, rerun with --allow-drops) {statement}"
+        self.phases[phase].append(statement + ";")
+
+    # Changes there is no DDL for are reported as comments
+    def note(self, phase, text):
+        self.phases[phase].append(f"-- {text}")
+
+    def statements(self):
+        return [statement for phase in self.phases.values() for statement in phase]
+
+    def compare(self):
+        for schema in self.target.schemas:
+            if schema not in self.source.schemas:
+                self.add("schemas", f"CREATE SCHEMA {quote(schema)}")
+        for name, table in self.target.tables.items():
+            old = self.source.tables.get(name)
+            if old is None:
+                self.create_table(table)
+            elif (old.kind, old.partition_key) != (table.kind, table.partition_key):
+                self.note("tables", f"{qualified(table)} is {describe_kind(old)} in the source and "
+                                    f"{describe_kind(table)} in the target; rebuild it, e.g. with "
+                                    f"python partition_manager.py convert")
+            else:
+                self.compare_columns(old, table)
+                self.compare_constraints(old, table)
+                self.compare_indexes(old, table)
+                self.compare_partitions(old, table)
+        for name, table in self.source.tables.items():
+            if name not in self.target.tables:
+                for constraint in table.foreign_keys():
+                    self.drop_constraint(table, constraint)
+                self.add("drop_tables", f"DROP TABLE {qualified(table)}", destructive=True)
+        return self.statements()
+
+    # Snapshots do not list sequences, so a default drawing from one that serial does not create is
+    # preceded by creating the sequence if it is missing
+    def create_sequence(self, phase, column):
+        match = NEXTVAL.search(column.default or "")
+        if match and not is_serial(column):
+            self.add(phase, f"CREATE SEQUENCE IF NOT EXISTS {match.group(1)}")
+
+    def create_table(self, table):
+        for column in table.columns:
+            self.create_sequence("tables", column)
+        lines = [column_definition(column) for column in table.columns]
+        lines += [f"CONSTRAINT {quote(c.name)} {c.definition}" for c in table.constraints if c.type != "foreign key"]
+        partition_by = f" PARTITION BY {table.partition_key}" if table.partition_key else ""
+        self.add("tables", f"CREATE TABLE {qualified(table)} (\n    " + ",\n    ".join(lines) + f"\n){partition_by}")
+        for name, bound in table.partitions.items():
+            self.add_partition(table, name, bound)
+        for index in plain_indexes(table).values():
+            self.add("indexes", index_definition(index))
+        for constraint in table.foreign_keys():
+            self.add_constraint(table, constraint)
+
+    def compare_columns(self, old, new):
+        target = qualified(new)
+        for column in new.columns:
+            before = old.column(column.name)
+            if before is None:
+                self.create_sequence("columns", column)
+                self.add("columns", f"ALTER TABLE {target} ADD COLUMN {column_definition(column)}")
+                continue
+            name = quote(column.name)
+            if before.data_type != column.data_type:
+                self.add("columns", f"ALTER TABLE {target} ALTER COLUMN {name} TYPE {column.data_type} "
+                                    f"USING {name}::{column.data_type}", destructive=True)
+            if before.default != column.default:
+                if column.default is None:
+                    self.add("columns", f"ALTER TABLE {target} ALTER COLUMN {name} DROP DEFAULT")
+                else:
+                    self.set_default(new, column)
+            if before.nullable != column.nullable:
+                change = "DROP NOT NULL" if column.nullable else "SET NOT NULL"
+                self.add("columns", f"ALTER TABLE {target} ALTER COLUMN {name} {change}")
+        for column in old.columns:
+            if new.column(column.name) is None:
+                self.add("columns", f"ALTER TABLE {target} DROP COLUMN {quote(column.name)}", destructive=True)
+
+    # A sequence put in front of existing rows is first moved past their values, or the next insert
+    # would collide with them
+    def set_default(self, table, column):
+        target, name = qualified(table), quote(column.name)
+        match = NEXTVAL.search(column.default)
+        if match:
+            sequence = match.group(1)
+            self.add("columns", f"CREATE SEQUENCE IF NOT EXISTS {sequence}")
+            self.add("columns", f"SELECT setval('{sequence}', max({name})) FROM {target} "
+                                f"HAVING max({name}) > (SELECT last_value FROM {sequence})")
+        self.add("columns", f"ALTER TABLE {target} ALTER COLUMN {name} SET DEFAULT {column.default}")
+
+    def add_constraint(self, table, constraint):
+        phase = "fks" if constraint.type == "foreign key" else "constraints"
+        self.add(phase, f"ALTER TABLE {qualified(table)} ADD CONSTRAINT {quote(constraint.name)} {constraint.definition}")
+
+    def drop_constraint(self, table, constraint):
+        phase = "drop_fks" if constraint.type == "foreign key" else "drop_constraints"
+        self.add(phase, f"ALTER TABLE {qualified(table)} DROP CONSTRAINT {quote(constraint.name)}")
+
+    def compare_constraints(self, old, new):
+        before = {constraint.name: constraint for constraint in old.constraints}
+        after = {constraint.name: constraint for constraint in new.constraints}
+        for name, constraint in after.items():
+            if name not in before:
+                self.add_constraint(new, constraint)
+            elif before[name].definition != constraint.definition:
+                self.drop_constraint(old, before[name])
+                self.add_constraint(new, constraint)
+        for name, constraint in before.items():
+            if name not in after:
+                self.drop_constraint(old, constraint)
+
+    def compare_indexes(self, old, new):
+        before = plain_indexes(old)
+        after = plain_indexes(new)
+        for name, index in after.items():
+            if name in before and before[name].definition == index.definition:
+                continue
+            if name in before:
+                self.add("drop_indexes", f"DROP INDEX {quote(old.schema)}.{quote(name)}")
+            self.add("indexes", index_definition(index))
+        for name in before:
+            if name not in after:
+                self.add("drop_indexes", f"DROP INDEX {quote(old.schema)}.{quote(name)}")
+
+    # Partitions inherit columns, constraints and indexes from their parent, so only their bounds differ
+    def add_partition(self, table, name, bound, destructive=False):
+        self.add("tables", f"CREATE TABLE {quote(table.schema)}.{quote(name)} PARTITION OF {qualified(table)} {bound}",
+                 destructive)
+
+    # Detaching first also removes the clones of foreign keys that reference the partition
+    def drop_partition(self, table, name):
+        self.add("drop_partitions", f"ALTER TABLE {qualified(table)} DETACH PARTITION {quote(table.schema)}.{quote(name)}",
+                 destructive=True)
+        self.add("drop_partitions", f"DROP TABLE {quote(table.schema)}.{quote(name)}", destructive=True)
+
+    def compare_partitions(self, old, new):
+        for name, bound in new.partitions.items():
+            if name not in old.partitions:
+                self.add_partition(new, name, bound)
+            elif old.partitions[name] != bound:
+                # The partition is recreated with the new bound after the old one, and its rows, are gone
+                self.drop_partition(old, name)
+                self.add_partition(new, name, bound, destructive=True)
+        for name in old.partitions:
+            if name not in new.partitions:
+                self.drop_partition(old, name)
+
+def describe_kind(table):
+    return f"partitioned by {table.partition_key}" if table.partition_key else "a plain table"
+
+def main():
+    parser = argparse.ArgumentParser(description="Print the DDL that turns one schema into another.")
+    parser.add_argument("source", help="snapshot file, database name or connection string to change")
+    parser.add_argument("target", help="snapshot file, database name or connection string to match")
+    parser.add_argument("--allow-drops", action="store_true", help="emit statements that drop tables or columns")
+    args = parser.parse_args()
+
+    statements = SchemaDiff(open_snapshot(args.source), open_snapshot(args.target), args.allow_drops).compare()
+    if not statements:
+        print("-- Schemas match")
+        return
+    print("\n".join(statements))
+    sys.exit(1)
+
+if __name__ == "__main__":
+    main()
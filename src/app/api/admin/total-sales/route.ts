@@ -4,10 +4,14 @@ import pool from '../../../../../lib/db';
 export async function GET() {
   try {
     const client = await pool.connect();
+    // Days already rolled up by sales_reports.py plus the orders placed since its last refresh,
+    // instead of aggregating every order item on each call
     const result = await client.query(`
-      SELECT SUM(oi.quantity * p.price) AS total_sales
-      FROM order_items oi
-      JOIN products p ON oi.product_id = p.product_id
+      SELECT (SELECT COALESCE(SUM(total_sales), 0) FROM daily_sales_rollup)
+           + (SELECT COALESCE(SUM(o.total_amount), 0)
+              FROM orders o
+              WHERE o.order_id > (SELECT last_order_id FROM sales_rollup_state WHERE rollup = 'daily_sales')
+                AND COALESCE(LOWER(o.status), '') <> 'cancelled') AS total_sales
     `);
     client.release();
     return NextResponse.json(result.rows[0]);
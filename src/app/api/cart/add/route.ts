@@ -65,9 +65,10 @@ export async function POST(req: Request) {
     // Add item to order
     const result = await db.query(
       `INSERT INTO order_items 
-       (order_id, product_id, quantity, price)
+       (order_id, product_id, quantity, price, order_created_at)
        VALUES ($1, $2, $3, 
-         (SELECT price FROM products WHERE product_id = $2))
+         (SELECT price FROM products WHERE product_id = $2),
+         (SELECT created_at FROM orders WHERE order_id = $1))
        RETURNING *`,
       [orderId, product_id, quantity]
     );
@@ -1,32 +1,29 @@
 import { NextResponse } from 'next/server';
-import { db } from '@/lib/db';
-import fs from 'node:fs';
+import { execFile } from 'node:child_process';
 import path from 'node:path';
+import { promisify } from 'node:util';
 
+const run = promisify(execFile);
+
+// Applies pending migrations through migrate.py, the runner that owns the schema
 export async function POST() {
   try {
-    const migrationDir = path.join(process.cwd(), 'lib/migrations');
-    const migrationFiles = fs.readdirSync(migrationDir)
-      .filter(file => file.endsWith('.sql'))
-      .sort();
-
-    for (const file of migrationFiles) {
-      const filePath = path.join(migrationDir, file);
-      const sql = fs.readFileSync(filePath, 'utf8');
-      
-      console.log(`Running migration: ${file}`);
-      await db.query(sql);
-      console.log(`Migration ${file} completed successfully`);
+    const args = [path.join(process.cwd(), 'migrate.py')];
+    if (process.env.DB_NAME) {
+      args.push('--dbname', process.env.DB_NAME);
     }
+    const { stdout } = await run(process.env.PYTHON || 'python3', args);
+    console.log(stdout);
 
     return NextResponse.json(
-      { message: 'Migrations completed successfully' },
+      { message: 'Migrations completed successfully', output: stdout },
       { status: 200 }
     );
   } catch (error) {
     console.error('Migration failed:', error);
+    const output = error && typeof error === 'object' && 'stdout' in error ? String(error.stdout) : undefined;
     return NextResponse.json(
-      { message: 'Migration failed', error: error instanceof Error ? error.message : 'Unknown error' },
+      { message: 'Migration failed', error: error instanceof Error ? error.message : 'Unknown error', output },
       { status: 500 }
     );
   }